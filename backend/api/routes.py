@@ -1,15 +1,52 @@
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, BackgroundTasks
-from fastapi.responses import FileResponse
-from pydantic import BaseModel
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
 from pathlib import Path
-from typing import Any
+from typing import Any, AsyncIterator, Callable, Literal
+import asyncio
+import json
+import threading
+import time
 import uuid
-import aiofiles
-from backend.core import settings
+from backend.core import (
+    settings,
+    job_scheduler,
+    model_manager,
+    loaded_device,
+    job_store,
+    progress_broker,
+    result_cache,
+    run_stages,
+    JobProgress,
+    JobStatus,
+    QueueFullError,
+    PRIORITY_HIGH,
+    PRIORITY_NORMAL,
+    PRIORITY_LOW,
+    Stage,
+    StageFailedError,
+    tracer,
+    gpu_arbiter,
+    slo_tracker,
+)
 from backend.services import whisper_service, chatterbox_service, opensora_service
+from backend.services.voice_profiles import voice_profiles
+from backend.services.whisper_stream import PcmResampler, iter_audio_chunks, stream_segments
+from backend.utils.upload import stream_upload_to_disk, StoredUpload, UploadLimitError
+from backend.utils.hashing import remember_file_digest
+from backend.utils.media import combine_audio_video
+from backend.utils.mux import MuxMode
+from backend.utils.ffmpeg import FFmpegError, media_runner
+from backend.utils.probe import probe_cache, probe_media_async
+from backend.utils.audio import wav_stream_header
+from backend.utils.delivery import serve_media
 
 router = APIRouter()
 
+PIPELINE_STAGE_WEIGHTS = {"transcribe": 1.0, "video": 8.0, "voiceover": 1.0, "mux": 0.5}
+SSE_KEEPALIVE_SECONDS = 15.0
+
 
 class TranscribeResponse(BaseModel):
     text: str
@@ -20,8 +57,10 @@ class TranscribeResponse(BaseModel):
 class SynthesizeRequest(BaseModel):
     text: str
     voice_reference_id: str | None = None
+    voice_profile_id: str | None = None
     exaggeration: float = 0.5
     language_id: str | None = None
+    use_cache: bool = True
 
 
 class GenerateVideoRequest(BaseModel):
@@ -32,6 +71,29 @@ class GenerateVideoRequest(BaseModel):
     num_steps: int = 50
     guidance_scale: float = 7.5
     reference_image_id: str | None = None
+    use_cache: bool = True
+    quality: Literal["draft", "full"] = "full"
+
+
+class PromoteVideoRequest(BaseModel):
+    resolution: str | None = None
+    num_frames: int | None = None
+    num_steps: int | None = None
+    use_cache: bool = True
+
+
+class VideoBatchItem(BaseModel):
+    prompt: str
+    seed: int | None = None
+    resolution: str | None = None
+    num_frames: int | None = None
+    num_steps: int = 50
+    guidance_scale: float = 7.5
+
+
+class GenerateVideoBatchRequest(BaseModel):
+    items: list[VideoBatchItem] = Field(..., min_length=1, max_length=64)
+    use_cache: bool = True
 
 
 class PipelineRequest(BaseModel):
@@ -39,54 +101,194 @@ class PipelineRequest(BaseModel):
     audio_file_id: str | None = None
     generate_voiceover: bool = True
     voice_reference_id: str | None = None
+    voice_profile_id: str | None = None
     video_resolution: str = "256px"
     video_frames: int = 129
+    mux_voiceover: bool = True
+    mux_mode: MuxMode | None = None
 
 
-class JobStatus(BaseModel):
-    job_id: str
-    status: str
-    progress: float
-    result: dict[str, Any] | None = None
-    error: str | None = None
+async def save_upload_file(
+    file: UploadFile,
+    max_duration_seconds: float | None = None,
+) -> StoredUpload:
+    file_id = str(uuid.uuid4())
+    ext = Path(file.filename).suffix if file.filename else ".bin"
+    file_path = settings.temp_dir / f"{file_id}{ext}"
 
+    try:
+        upload = await stream_upload_to_disk(
+            file,
+            file_path,
+            max_bytes=settings.max_upload_size_mb * 1024 * 1024,
+            max_duration_seconds=max_duration_seconds,
+            chunk_size=settings.upload_chunk_size_bytes,
+        )
+    except UploadLimitError as e:
+        raise HTTPException(status_code=413, detail=str(e))
 
-jobs: dict[str, JobStatus] = {}
+    if max_duration_seconds is not None:
+        try:
+            info = await probe_media_async(upload.path)
+        except FFmpegError:
+            info = None
+        if info is not None and info.duration > max_duration_seconds:
+            upload.path.unlink(missing_ok=True)
+            raise HTTPException(status_code=413, detail=f"Audio exceeds {max_duration_seconds:g} seconds")
 
+    remember_file_digest(upload.path, upload.sha256)
+    return upload
 
-async def save_upload_file(file: UploadFile) -> Path:
-    file_id = str(uuid.uuid4())
-    ext = Path(file.filename).suffix if file.filename else ".bin"
-    file_path = settings.temp_dir / f"{file_id}{ext}"
 
-    async with aiofiles.open(file_path, "wb") as f:
-        content = await file.read()
-        await f.write(content)
+async def call_model(model: str, func: Callable[..., Any], *args: Any, slot: bool = True, **kwargs: Any) -> Any:
+    def call() -> Any:
+        if not slot:
+            return func(*args, **kwargs)
+        with job_scheduler.model_slot(model), gpu_arbiter.interactive(getattr(settings, f"{model}_device")):
+            return func(*args, **kwargs)
+
+    started = time.perf_counter()
+    try:
+        return await run_in_threadpool(call)
+    finally:
+        slo_tracker.observe("interactive", time.perf_counter() - started)
+
 
-    return file_path
+def require_voice_profile(profile_id: str | None) -> None:
+    if profile_id is not None and voice_profiles.get(profile_id) is None:
+        raise HTTPException(status_code=404, detail="Voice profile not found")
+
+
+async def submit_job(
+    job_id: str,
+    func: Callable[[], None],
+    device: str,
+    models: tuple[str, ...] = (),
+    priority: int = PRIORITY_NORMAL,
+) -> None:
+    await run_in_threadpool(job_store.create, JobStatus(job_id=job_id, status="pending", progress=0.0))
+    submitted = time.perf_counter()
+
+    def run() -> None:
+        try:
+            func()
+        finally:
+            slo_tracker.observe("batch", time.perf_counter() - submitted)
+
+    try:
+        job_scheduler.submit(run, device=device, job_id=job_id, priority=priority, models=models)
+    except QueueFullError as e:
+        await run_in_threadpool(job_store.delete, job_id)
+        raise HTTPException(
+            status_code=429,
+            detail={"message": str(e), "queue_depth": e.depth},
+            headers={"Retry-After": "30"},
+        )
 
 
 @router.post("/transcribe", response_model=TranscribeResponse)
 async def transcribe_audio(
     file: UploadFile = File(...),
     language: str | None = Form(None),
+    use_cache: bool = Form(True),
 ):
-    file_path = await save_upload_file(file)
+    upload = await save_upload_file(file, settings.max_audio_duration_seconds)
+    file_path = upload.path
     try:
-        result = whisper_service.transcribe(
+        result = await call_model(
+            "whisper",
+            whisper_service.transcribe,
+            slot=not settings.whisper_batch_enabled,
             audio_path=file_path,
             language=language,
+            use_cache=use_cache,
         )
         return TranscribeResponse(**result)
     finally:
         file_path.unlink(missing_ok=True)
 
 
+@router.post("/transcribe/stream")
+async def transcribe_audio_stream(
+    file: UploadFile = File(...),
+    language: str | None = Form(None),
+):
+    upload = await save_upload_file(file, settings.max_audio_duration_seconds)
+
+    def events():
+        try:
+            audio = whisper_service.load_audio(upload.path)
+            transcriber = whisper_service.streaming_transcriber(language)
+            for segment in stream_segments(transcriber, iter_audio_chunks(audio)):
+                yield json.dumps({"type": "segment", **segment}) + "\n"
+            yield json.dumps({
+                "type": "done",
+                "text": transcriber.text,
+                "language": transcriber.detected_language,
+            }) + "\n"
+        except Exception as e:
+            yield json.dumps({"type": "error", "error": str(e)}) + "\n"
+        finally:
+            upload.path.unlink(missing_ok=True)
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+@router.websocket("/transcribe/live")
+async def transcribe_live(
+    websocket: WebSocket,
+    language: str | None = None,
+    sample_rate: int = 16000,
+):
+    if sample_rate <= 0:
+        denial = JSONResponse(status_code=400, content={"detail": f"Invalid sample rate: {sample_rate}"})
+        if "websocket.http.response" in websocket.scope.get("extensions", {}):
+            await websocket.send_denial_response(denial)
+        else:
+            await websocket.close(code=1008)
+        return
+
+    await websocket.accept()
+    transcriber = whisper_service.streaming_transcriber(language)
+    resampler = PcmResampler(sample_rate)
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+
+            if message.get("bytes"):
+                samples = resampler.feed(message["bytes"])
+                segments = await run_in_threadpool(transcriber.feed, samples)
+                finished = False
+            elif message.get("text") == "end":
+                segments = await run_in_threadpool(transcriber.flush)
+                finished = True
+            else:
+                continue
+
+            for segment in segments:
+                await websocket.send_json({"type": "segment", **segment})
+
+            if finished:
+                await websocket.send_json({
+                    "type": "done",
+                    "text": transcriber.text,
+                    "language": transcriber.detected_language,
+                })
+                await websocket.close()
+                return
+    except WebSocketDisconnect:
+        return
+
+
 @router.post("/detect-language")
 async def detect_language(file: UploadFile = File(...)):
-    file_path = await save_upload_file(file)
+    upload = await save_upload_file(file, settings.max_audio_duration_seconds)
+    file_path = upload.path
     try:
-        probs = whisper_service.detect_language(file_path)
+        probs = await call_model("whisper", whisper_service.detect_language, file_path)
         return {"languages": probs}
     finally:
         file_path.unlink(missing_ok=True)
@@ -96,101 +298,322 @@ async def detect_language(file: UploadFile = File(...)):
 async def synthesize_speech(request: SynthesizeRequest):
     output_id = str(uuid.uuid4())
     output_path = settings.temp_dir / f"{output_id}.wav"
+    require_voice_profile(request.voice_profile_id)
 
     voice_ref = None
     if request.voice_reference_id:
         voice_ref = settings.temp_dir / request.voice_reference_id
 
-    chatterbox_service.synthesize(
+    await call_model(
+        "chatterbox",
+        chatterbox_service.synthesize,
         text=request.text,
         output_path=output_path,
         voice_reference=voice_ref,
         exaggeration=request.exaggeration,
         language_id=request.language_id,
+        use_cache=request.use_cache,
+        voice_profile_id=request.voice_profile_id,
     )
 
     return {"audio_id": output_id, "path": str(output_path)}
 
 
-@router.get("/audio/{audio_id}")
-async def get_audio(audio_id: str):
+class SynthesizeStreamRequest(SynthesizeRequest):
+    format: Literal["wav", "pcm"] = "wav"
+    lookahead: int = 1
+
+
+@router.post("/synthesize/stream")
+async def synthesize_speech_stream(request: SynthesizeStreamRequest):
+    require_voice_profile(request.voice_profile_id)
+    voice_ref = None
+    if request.voice_reference_id:
+        voice_ref = settings.temp_dir / request.voice_reference_id
+
+    sample_rate = chatterbox_service.sample_rate
+
+    def frames():
+        if request.format == "wav":
+            yield wav_stream_header(sample_rate)
+        yield from chatterbox_service.synthesize_stream(
+            text=request.text,
+            voice_reference=voice_ref,
+            exaggeration=request.exaggeration,
+            language_id=request.language_id,
+            lookahead=max(0, min(request.lookahead, 4)),
+            voice_profile_id=request.voice_profile_id,
+        )
+
+    return StreamingResponse(
+        frames(),
+        media_type="audio/wav" if request.format == "wav" else f"audio/L16;rate={sample_rate};channels=1",
+        headers={"X-Sample-Rate": str(sample_rate)},
+    )
+
+
+@router.api_route("/audio/{audio_id}", methods=["GET", "HEAD"])
+async def get_audio(audio_id: str, request: Request):
     file_path = settings.temp_dir / f"{audio_id}.wav"
     if not file_path.exists():
         raise HTTPException(status_code=404, detail="Audio not found")
-    return FileResponse(file_path, media_type="audio/wav")
+    return serve_media(request, file_path, "audio/wav")
 
 
 @router.post("/upload-voice-reference")
 async def upload_voice_reference(file: UploadFile = File(...)):
-    file_path = await save_upload_file(file)
-    return {"reference_id": file_path.name}
+    upload = await save_upload_file(file, settings.max_audio_duration_seconds)
+    return {"reference_id": upload.path.name}
+
+
+@router.post("/voice-profiles")
+async def create_voice_profile(file: UploadFile = File(...), name: str | None = Form(None)):
+    upload = await save_upload_file(file, settings.max_audio_duration_seconds)
+    try:
+        profile = await call_model("chatterbox", chatterbox_service.create_voice_profile, upload.path, name)
+    finally:
+        upload.path.unlink(missing_ok=True)
+    return profile.to_dict()
+
+
+@router.get("/voice-profiles")
+async def list_voice_profiles():
+    return {
+        "profiles": [profile.to_dict() for profile in voice_profiles.list_profiles()],
+        "cache": voice_profiles.stats(),
+    }
+
+
+@router.delete("/voice-profiles/{profile_id}")
+async def delete_voice_profile(profile_id: str):
+    if not voice_profiles.delete(profile_id):
+        raise HTTPException(status_code=404, detail="Voice profile not found")
+    return {"deleted": profile_id}
 
 
 @router.get("/voices")
 async def list_voices():
     builtin = chatterbox_service.list_builtin_voices()
-    return {"builtin_voices": builtin}
+    return {
+        "builtin_voices": builtin,
+        "profiles": [profile.to_dict() for profile in voice_profiles.list_profiles()],
+    }
 
 
-@router.post("/generate-video")
-async def generate_video(
-    request: GenerateVideoRequest,
-    background_tasks: BackgroundTasks,
-):
-    job_id = str(uuid.uuid4())
-    output_dir = settings.temp_dir / job_id
+async def submit_video_job(
+    job_id: str,
+    span: str,
+    generate: Callable[[], dict[str, Any]],
+    priority: int = PRIORITY_NORMAL,
+) -> None:
+    def run_generation():
+        job_store.update(job_id, status="running")
+        try:
+            with (
+                tracer.span(span, trace_id=job_id),
+                job_scheduler.model_slot("opensora"),
+                JobProgress(job_id).bind("video"),
+            ):
+                result = generate()
+            job_store.update(job_id, status="completed", progress=1.0, result=result)
+        except Exception as e:
+            job_store.update(job_id, status="failed", error=str(e))
 
-    jobs[job_id] = JobStatus(
-        job_id=job_id,
-        status="pending",
-        progress=0.0,
-    )
+    await submit_job(job_id, run_generation, settings.opensora_device, models=("opensora",), priority=priority)
 
-    async def run_generation():
-        jobs[job_id].status = "running"
-        jobs[job_id].progress = 0.1
 
-        try:
-            ref_image = None
-            if request.reference_image_id:
-                ref_image = settings.temp_dir / request.reference_image_id
+@router.post("/generate-video")
+async def generate_video(request: GenerateVideoRequest):
+    job_id = str(uuid.uuid4())
+    output_dir = settings.temp_dir / job_id
+    ref_image = settings.temp_dir / request.reference_image_id if request.reference_image_id else None
 
-            result = opensora_service.generate_video(
+    def generate() -> dict[str, Any]:
+        if request.quality == "draft":
+            return opensora_service.generate_draft(
                 prompt=request.prompt,
                 output_dir=output_dir,
                 resolution=request.resolution,
                 num_frames=request.num_frames,
                 seed=request.seed,
-                num_steps=request.num_steps,
+                num_steps=request.num_steps if "num_steps" in request.model_fields_set else None,
                 guidance_scale=request.guidance_scale,
                 reference_image=ref_image,
+                use_cache=request.use_cache,
             )
+        return opensora_service.generate_video(
+            prompt=request.prompt,
+            output_dir=output_dir,
+            resolution=request.resolution,
+            num_frames=request.num_frames,
+            seed=request.seed,
+            num_steps=request.num_steps,
+            guidance_scale=request.guidance_scale,
+            reference_image=ref_image,
+            use_cache=request.use_cache,
+        )
+
+    priority = PRIORITY_HIGH if request.quality == "draft" else PRIORITY_NORMAL
+    await submit_video_job(job_id, f"job.generate_video.{request.quality}", generate, priority)
+    return {"job_id": job_id, "quality": request.quality}
+
+
+@router.post("/generate-video/{draft_job_id}/promote")
+async def promote_video(draft_job_id: str, request: PromoteVideoRequest | None = None):
+    request = request or PromoteVideoRequest()
+    draft_job = await run_in_threadpool(job_store.get, draft_job_id)
+    if draft_job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if draft_job.status != "completed" or not draft_job.result:
+        raise HTTPException(status_code=400, detail="Draft not ready")
+    if draft_job.result.get("quality") != "draft":
+        raise HTTPException(status_code=400, detail="Job is not a draft")
+
+    job_id = str(uuid.uuid4())
+    output_dir = settings.temp_dir / job_id
+    draft = draft_job.result
+
+    def generate() -> dict[str, Any]:
+        result = opensora_service.promote(
+            draft,
+            output_dir=output_dir,
+            resolution=request.resolution,
+            num_frames=request.num_frames,
+            num_steps=request.num_steps,
+            use_cache=request.use_cache,
+        )
+        return {**result, "draft_job_id": draft_job_id}
+
+    await submit_video_job(job_id, "job.promote_video", generate)
+    return {"job_id": job_id, "draft_job_id": draft_job_id, "seed": draft["seed"]}
 
-            jobs[job_id].status = "completed"
-            jobs[job_id].progress = 1.0
-            jobs[job_id].result = result
 
+@router.get("/generate-video/stats")
+async def get_generation_stats():
+    return opensora_service.generation_stats()
+
+
+@router.post("/generate-video/batch")
+async def generate_video_batch(request: GenerateVideoBatchRequest):
+    job_id = str(uuid.uuid4())
+    output_dir = settings.temp_dir / job_id
+    total = len(request.items)
+
+    def run_batch():
+        items: list[dict[str, Any] | None] = [None] * total
+        lock = threading.Lock()
+        tracker = JobProgress(job_id)
+
+        def on_item(index: int, item: dict[str, Any]) -> None:
+            with lock:
+                items[index] = item
+                done = sum(1 for value in items if value is not None)
+                job_store.update(job_id, result={"items": list(items)})
+            tracker.update("batch", done / total, f"{done}/{total} videos")
+
+        job_store.update(job_id, status="running", result={"items": items})
+        try:
+            with (
+                tracer.span("job.generate_video_batch", trace_id=job_id, items=total),
+                job_scheduler.model_slot("opensora"),
+            ):
+                result = opensora_service.generate_video_batch(
+                    [item.model_dump() for item in request.items],
+                    output_dir=output_dir,
+                    use_cache=request.use_cache,
+                    on_item=on_item,
+                )
         except Exception as e:
-            jobs[job_id].status = "failed"
-            jobs[job_id].error = str(e)
+            job_store.update(job_id, status="failed", error=str(e))
+            return
 
-    background_tasks.add_task(run_generation)
-    return {"job_id": job_id}
+        status = "failed" if result["failed"] == total else "completed"
+        job_store.update(job_id, status=status, progress=1.0, result=result)
+
+    await submit_job(job_id, run_batch, settings.opensora_device, models=("opensora",), priority=PRIORITY_LOW)
+    return {"job_id": job_id, "items": total}
 
 
 @router.get("/job/{job_id}", response_model=JobStatus)
 async def get_job_status(job_id: str):
-    if job_id not in jobs:
+    job = await run_in_threadpool(job_store.get, job_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
-    return jobs[job_id]
+    return job
+
+
+def format_sse(event: dict[str, Any]) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
 
+def status_event(job: JobStatus) -> str:
+    return format_sse({"type": "status", **job.model_dump()})
 
-@router.get("/video/{job_id}")
-async def get_video(job_id: str):
-    if job_id not in jobs:
+
+@router.get("/job/{job_id}/events")
+async def stream_job_events(job_id: str):
+    queue = progress_broker.subscribe(job_id)
+    job = await run_in_threadpool(job_store.get, job_id)
+    if job is None:
+        progress_broker.unsubscribe(job_id, queue)
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            current = await run_in_threadpool(job_store.get, job_id) or job
+            yield status_event(current)
+            if current.status in ("completed", "failed"):
+                return
+            last = progress_broker.last(job_id)
+            if last is not None:
+                yield format_sse(last)
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    current = await run_in_threadpool(job_store.get, job_id)
+                    if current is None:
+                        return
+                    if current.status in ("completed", "failed"):
+                        yield status_event(current)
+                        return
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_sse(event)
+                if event["type"] == "status" and event.get("status") in ("completed", "failed"):
+                    return
+        finally:
+            progress_broker.unsubscribe(job_id, queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/job/{job_id}/trace")
+async def get_job_trace(job_id: str):
+    spans = tracer.get(job_id)
+    if spans is None:
+        if await run_in_threadpool(job_store.get, job_id) is None:
+            raise HTTPException(status_code=404, detail="Job not found")
+        spans = []
+    return {"job_id": job_id, "spans": spans}
+
+
+@router.get("/jobs", response_model=list[JobStatus])
+async def list_jobs(status: str | None = None, limit: int = 100):
+    return await run_in_threadpool(job_store.list_jobs, status=status, limit=min(limit, 1000))
+
+
+@router.api_route("/video/{job_id}", methods=["GET", "HEAD"])
+async def get_video(job_id: str, request: Request):
+    job = await run_in_threadpool(job_store.get, job_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
 
-    job = jobs[job_id]
     if job.status != "completed" or not job.result:
         raise HTTPException(status_code=400, detail="Video not ready")
 
@@ -198,76 +621,107 @@ async def get_video(job_id: str):
     if not video_path.exists():
         raise HTTPException(status_code=404, detail="Video file not found")
 
-    return FileResponse(video_path, media_type="video/mp4")
+    return serve_media(request, video_path, "video/mp4")
 
 
 @router.post("/pipeline/voice-to-video")
-async def voice_to_video_pipeline(
-    request: PipelineRequest,
-    background_tasks: BackgroundTasks,
-):
+async def voice_to_video_pipeline(request: PipelineRequest):
+    require_voice_profile(request.voice_profile_id)
     job_id = str(uuid.uuid4())
     output_dir = settings.temp_dir / job_id
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    jobs[job_id] = JobStatus(
-        job_id=job_id,
-        status="pending",
-        progress=0.0,
-    )
+    def transcribe(results: dict[str, Any]) -> str:
+        audio_path = settings.temp_dir / request.audio_file_id
+        text = whisper_service.transcribe(audio_path)["text"]
+        if not text:
+            raise ValueError("No text or audio provided")
+        return text
+
+    def generate(results: dict[str, Any]) -> dict[str, Any]:
+        return opensora_service.generate_video(
+            prompt=results.get("transcribe", request.text),
+            output_dir=output_dir / "video",
+            resolution=request.video_resolution,
+            num_frames=request.video_frames,
+        )
 
-    async def run_pipeline():
-        jobs[job_id].status = "running"
+    def voiceover(results: dict[str, Any]) -> Path:
+        voice_ref = None
+        if request.voice_reference_id:
+            voice_ref = settings.temp_dir / request.voice_reference_id
 
-        try:
-            prompt = request.text
-
-            if request.audio_file_id and not prompt:
-                jobs[job_id].progress = 0.1
-                audio_path = settings.temp_dir / request.audio_file_id
-                transcription = whisper_service.transcribe(audio_path)
-                prompt = transcription["text"]
-                jobs[job_id].progress = 0.3
-
-            if not prompt:
-                raise ValueError("No text or audio provided")
-
-            jobs[job_id].progress = 0.4
-            video_result = opensora_service.generate_video(
-                prompt=prompt,
-                output_dir=output_dir / "video",
-                resolution=request.video_resolution,
-                num_frames=request.video_frames,
-            )
-            jobs[job_id].progress = 0.8
-
-            audio_path = None
-            if request.generate_voiceover:
-                voice_ref = None
-                if request.voice_reference_id:
-                    voice_ref = settings.temp_dir / request.voice_reference_id
-
-                audio_path = output_dir / "voiceover.wav"
-                chatterbox_service.synthesize(
-                    text=prompt,
-                    output_path=audio_path,
-                    voice_reference=voice_ref,
-                )
-                jobs[job_id].progress = 0.95
+        return chatterbox_service.synthesize(
+            text=results.get("transcribe", request.text),
+            output_path=output_dir / "voiceover.wav",
+            voice_reference=voice_ref,
+            voice_profile_id=request.voice_profile_id,
+        )
 
-            jobs[job_id].status = "completed"
-            jobs[job_id].progress = 1.0
-            jobs[job_id].result = {
-                "video_path": video_result["video_path"],
-                "audio_path": str(audio_path) if audio_path else None,
-                "prompt": prompt,
-            }
+    def mux(results: dict[str, Any]) -> Path:
+        return combine_audio_video(
+            video_path=results["video"]["video_path"],
+            audio_path=results["voiceover"],
+            output_path=output_dir / "final.mp4",
+            mode=request.mux_mode,
+        )
 
-        except Exception as e:
-            jobs[job_id].status = "failed"
-            jobs[job_id].error = str(e)
+    def run_pipeline():
+        if not request.text and not request.audio_file_id:
+            job_store.update(job_id, status="failed", error="No text or audio provided")
+            return
+
+        stages = []
+        prompt_deps: tuple[str, ...] = ()
+        if request.audio_file_id and not request.text:
+            stages.append(Stage("transcribe", transcribe, model="whisper"))
+            prompt_deps = ("transcribe",)
+        stages.append(Stage("video", generate, deps=prompt_deps, model="opensora"))
+        if request.generate_voiceover:
+            stages.append(Stage("voiceover", voiceover, deps=prompt_deps, model="chatterbox"))
+            if request.mux_voiceover:
+                stages.append(Stage("mux", mux, deps=("video", "voiceover")))
+
+        tracker = JobProgress(job_id, {stage.name: PIPELINE_STAGE_WEIGHTS[stage.name] for stage in stages})
+        stages = [
+            Stage(stage.name, tracker.wrap(stage.name, stage.func), deps=stage.deps, model=stage.model)
+            for stage in stages
+        ]
+        stage_status: dict[str, str] = {}
+        lock = threading.Lock()
+
+        def on_stage(name: str, status: str) -> None:
+            with lock:
+                stage_status[name] = status
+                job_store.update(job_id, stages=dict(stage_status))
+
+        job_store.update(job_id, status="running")
+        try:
+            with tracer.span("job.pipeline", trace_id=job_id, stages=[stage.name for stage in stages]):
+                results = run_stages(stages, on_stage=on_stage)
+        except StageFailedError as e:
+            job_store.update(job_id, status="failed", error=str(e.error))
+            return
+
+        audio_path = results.get("voiceover")
+        job_store.update(
+            job_id,
+            status="completed",
+            progress=1.0,
+            result={
+                "video_path": results["video"]["video_path"],
+                "audio_path": str(audio_path) if audio_path else None,
+                "final_video_path": str(results["mux"]) if "mux" in results else None,
+                "prompt": results.get("transcribe", request.text),
+            },
+        )
 
-    background_tasks.add_task(run_pipeline)
+    models = ("opensora",)
+    if request.audio_file_id and not request.text:
+        models = ("whisper", *models)
+    if request.generate_voiceover:
+        models = (*models, "chatterbox")
+    await submit_job(job_id, run_pipeline, settings.opensora_device, models=models)
     return {"job_id": job_id}
 
 
@@ -276,20 +730,65 @@ async def get_gpu_status():
     return opensora_service.check_gpu_requirements()
 
 
+@router.get("/system/whisper-batching")
+async def get_whisper_batching_status():
+    return {
+        "enabled": settings.whisper_batch_enabled,
+        **whisper_service.batcher.stats(),
+    }
+
+
+@router.get("/system/opensora-worker")
+async def get_opensora_worker_status():
+    return await run_in_threadpool(opensora_service.worker_health)
+
+
 @router.get("/system/models")
 async def get_model_info():
     return {
         "whisper": {
             "model": settings.whisper_model,
-            "device": settings.whisper_device,
+            "device": loaded_device(settings.whisper_device),
         },
         "chatterbox": {
             "model": settings.chatterbox_model,
-            "device": settings.chatterbox_device,
+            "device": loaded_device(settings.chatterbox_device),
         },
         "opensora": {
             "resolution": settings.opensora_resolution,
             "num_frames": settings.opensora_num_frames,
-            "device": settings.opensora_device,
+            "device": loaded_device(settings.opensora_device),
+            "draft": {
+                "resolution": settings.opensora_draft_resolution,
+                "num_frames": settings.opensora_draft_num_frames,
+                "num_steps": settings.opensora_draft_num_steps,
+            },
         },
+        "residency": model_manager.stats(),
     }
+
+
+@router.get("/system/queue")
+async def get_queue_status():
+    return job_scheduler.stats()
+
+
+@router.get("/system/slo")
+async def get_slo_status():
+    return {"classes": slo_tracker.stats(), "arbiter": gpu_arbiter.stats()}
+
+
+@router.get("/system/media")
+async def get_media_status():
+    return {"runner": media_runner.stats(), "probe_cache": probe_cache.stats()}
+
+
+@router.get("/system/cache")
+async def get_cache_status():
+    return result_cache.stats()
+
+
+@router.delete("/system/cache")
+async def clear_cache():
+    result_cache.clear()
+    return result_cache.stats()
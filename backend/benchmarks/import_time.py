@@ -0,0 +1,50 @@
+from pathlib import Path
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ("torch", "torchaudio", "whisper", "chatterbox", "mmengine", "opensora")
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+heavy = sorted(m for m in {heavy!r} if m in sys.modules)
+print(json.dumps({{"seconds": elapsed, "heavy_modules": heavy}}))
+"""
+
+
+def measure_cold_import(module: str = "backend.main") -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        capture_output=True,
+        text=True,
+        cwd=REPO_ROOT,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure cold import time of the API process")
+    parser.add_argument("--module", default="backend.main")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    samples = [measure_cold_import(args.module) for _ in range(args.runs)]
+    seconds = [sample["seconds"] for sample in samples]
+    print(json.dumps({
+        "module": args.module,
+        "runs": args.runs,
+        "median_seconds": round(statistics.median(seconds), 3),
+        "max_seconds": round(max(seconds), 3),
+        "heavy_modules": samples[-1]["heavy_modules"],
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
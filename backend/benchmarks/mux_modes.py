@@ -0,0 +1,95 @@
+from pathlib import Path
+import argparse
+import json
+import subprocess
+import tempfile
+import time
+from backend.utils.mux import MUX_MODES, mux
+from backend.utils.probe import probe_media
+
+
+def make_clip(path: Path, seconds: float, resolution: str = "256x256", fps: int = 24) -> Path:
+    subprocess.run(
+        [
+            "ffmpeg", "-y", "-loglevel", "error",
+            "-f", "lavfi", "-i", f"testsrc=size={resolution}:rate={fps}:duration={seconds}",
+            "-c:v", "libx264", "-pix_fmt", "yuv420p",
+            str(path),
+        ],
+        check=True,
+    )
+    return path
+
+
+def make_voiceover(path: Path, seconds: float, sample_rate: int = 24000) -> Path:
+    subprocess.run(
+        [
+            "ffmpeg", "-y", "-loglevel", "error",
+            "-f", "lavfi", "-i", f"sine=frequency=220:sample_rate={sample_rate}:duration={seconds}",
+            "-c:a", "pcm_s16le",
+            str(path),
+        ],
+        check=True,
+    )
+    return path
+
+
+def legacy_stream_loop(video: Path, audio: Path, output: Path) -> None:
+    video_duration = probe_media(video).duration
+    audio_duration = probe_media(audio).duration
+    loops = int(audio_duration / video_duration) + 1
+    subprocess.run(
+        [
+            "ffmpeg", "-y", "-loglevel", "error",
+            "-stream_loop", str(loops),
+            "-i", str(video), "-i", str(audio),
+            "-c:v", "copy", "-c:a", "aac", "-shortest",
+            str(output),
+        ],
+        check=True,
+    )
+
+
+def run(clip_seconds: float, voiceover_seconds: list[float], repeats: int, fragmented: bool) -> list[dict]:
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        clip = make_clip(tmp / "clip.mp4", clip_seconds)
+        for seconds in voiceover_seconds:
+            audio = make_voiceover(tmp / f"voice_{int(seconds)}.wav", seconds)
+            candidates = {"legacy": lambda out: legacy_stream_loop(clip, audio, out)}
+            for mode in MUX_MODES:
+                candidates[mode] = lambda out, mode=mode: mux(clip, audio, out, mode=mode, fragmented=fragmented)
+
+            for name, func in candidates.items():
+                timings = []
+                output = tmp / f"{name}_{int(seconds)}.mp4"
+                for _ in range(repeats):
+                    started = time.perf_counter()
+                    func(output)
+                    timings.append(time.perf_counter() - started)
+                rows.append({
+                    "mode": name,
+                    "voiceover_seconds": seconds,
+                    "best_seconds": round(min(timings), 3),
+                    "mean_seconds": round(sum(timings) / len(timings), 3),
+                    "output_seconds": round(probe_media(output).duration, 3),
+                    "output_bytes": output.stat().st_size,
+                })
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare mux modes on long voiceovers")
+    parser.add_argument("--clip-seconds", type=float, default=5.0)
+    parser.add_argument("--voiceover-seconds", type=float, nargs="+", default=[30.0, 120.0, 300.0])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--faststart", action="store_true")
+    args = parser.parse_args()
+
+    rows = run(args.clip_seconds, args.voiceover_seconds, args.repeats, fragmented=not args.faststart)
+    print(json.dumps(rows, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterator
+import argparse
+import json
+import math
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+SCENARIOS = ("transcribe", "synthesize", "generate_video", "pipeline", "mux")
+FFMPEG_SCENARIOS = ("generate_video", "pipeline", "mux")
+LOWER_IS_BETTER = ("p50_ms", "p95_ms", "p99_ms", "peak_rss_mb")
+HIGHER_IS_BETTER = ("throughput_rps",)
+JOB_POLL_INTERVAL = 0.02
+JOB_TIMEOUT = 120.0
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    requests: int
+    concurrency: int
+    errors: int
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    throughput_rps: float
+    peak_rss_mb: float
+    first_error: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class Regression:
+    name: str
+    metric: str
+    baseline: float
+    current: float
+    change: float
+
+    def __str__(self) -> str:
+        return f"{self.name}.{self.metric}: {self.baseline:g} -> {self.current:g} ({self.change:+.1%})"
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def _current_rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024**2
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+
+
+@contextmanager
+def sample_rss(interval: float = 0.01) -> Iterator[list[float]]:
+    peak = [_current_rss_mb()]
+    stop = threading.Event()
+
+    def sample() -> None:
+        while not stop.wait(interval):
+            peak[0] = max(peak[0], _current_rss_mb())
+
+    sampler = threading.Thread(target=sample, name="rss-sampler", daemon=True)
+    sampler.start()
+    try:
+        yield peak
+    finally:
+        stop.set()
+        sampler.join()
+        peak[0] = max(peak[0], _current_rss_mb())
+
+
+def run_load(name: str, request: Callable[[int], Any], requests: int, concurrency: int) -> BenchmarkResult:
+    latencies: list[float] = []
+    errors = 0
+    first_error = None
+    lock = threading.Lock()
+
+    def call(index: int) -> None:
+        nonlocal errors, first_error
+        started = time.perf_counter()
+        try:
+            request(index)
+        except Exception as e:
+            with lock:
+                errors += 1
+                first_error = first_error or f"{type(e).__name__}: {e}"
+            return
+        with lock:
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    with sample_rss() as peak_rss:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=f"bench-{name}") as pool:
+            list(pool.map(call, range(requests)))
+        wall = time.perf_counter() - started
+
+    return BenchmarkResult(
+        name=name,
+        requests=requests,
+        concurrency=concurrency,
+        errors=errors,
+        mean_ms=round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+        p50_ms=round(percentile(latencies, 50), 2),
+        p95_ms=round(percentile(latencies, 95), 2),
+        p99_ms=round(percentile(latencies, 99), 2),
+        throughput_rps=round(len(latencies) / wall, 2) if wall else 0.0,
+        peak_rss_mb=round(peak_rss[0], 1),
+        first_error=first_error,
+    )
+
+
+def compare(
+    current: dict[str, dict[str, Any]],
+    baseline: dict[str, dict[str, Any]],
+    threshold: float = 0.2,
+) -> list[Regression]:
+    regressions = []
+    for name, result in current.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        for metric in LOWER_IS_BETTER + HIGHER_IS_BETTER:
+            old, new = reference.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = change > threshold if metric in LOWER_IS_BETTER else change < -threshold
+            if worse:
+                regressions.append(Regression(name, metric, old, new, round(change, 4)))
+        if result.get("errors", 0) > reference.get("errors", 0):
+            regressions.append(Regression(
+                name, "errors", reference.get("errors", 0), result["errors"], float(result["errors"]),
+            ))
+    return regressions
+
+
+def save_baseline(path: str | Path, results: list[BenchmarkResult]) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({
+        "created_at": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "results": {result.name: result.to_dict() for result in results},
+    }, indent=2))
+    return path
+
+
+def load_baseline(path: str | Path) -> dict[str, dict[str, Any]]:
+    return json.loads(Path(path).read_text())["results"]
+
+
+def use_demo_services(demo_seconds: float) -> None:
+    for module in ("whisper_service", "chatterbox_service", "opensora_service"):
+        sys.modules[f"backend.services.{module}"].DEMO_MODE = True
+    sys.modules["backend.services.opensora_service"].DEMO_SECONDS = demo_seconds
+
+
+def _wav_bytes(seconds: float, sample_rate: int = 16000) -> bytes:
+    from backend.utils.audio import demo_tone, write_wav
+
+    with tempfile.TemporaryDirectory() as tmp:
+        return write_wav(Path(tmp) / "bench.wav", demo_tone(int(seconds * sample_rate)), sample_rate).read_bytes()
+
+
+def _wait_for_job(client: Any, job_id: str) -> dict[str, Any]:
+    deadline = time.monotonic() + JOB_TIMEOUT
+    while time.monotonic() < deadline:
+        job = client.get(f"/api/v1/job/{job_id}").json()
+        if job["status"] == "completed":
+            return job
+        if job["status"] == "failed":
+            raise RuntimeError(job["error"])
+        time.sleep(JOB_POLL_INTERVAL)
+    raise TimeoutError(f"Job {job_id} did not finish in {JOB_TIMEOUT:g}s")
+
+
+def api_scenarios(client: Any) -> dict[str, Callable[[int], Any]]:
+    audio = _wav_bytes(2.0)
+
+    def checked(response: Any) -> Any:
+        response.raise_for_status()
+        return response.json()
+
+    def transcribe(index: int) -> Any:
+        return checked(client.post(
+            "/api/v1/transcribe",
+            files={"file": (f"bench_{index}.wav", audio, "audio/wav")},
+            data={"use_cache": "false"},
+        ))
+
+    def synthesize(index: int) -> Any:
+        return checked(client.post(
+            "/api/v1/synthesize",
+            json={"text": f"Benchmark sentence number {index}.", "use_cache": False},
+        ))
+
+    def generate_video(index: int) -> Any:
+        job = checked(client.post(
+            "/api/v1/generate-video",
+            json={"prompt": f"Benchmark shot {index}", "use_cache": False},
+        ))
+        return _wait_for_job(client, job["job_id"])
+
+    def pipeline(index: int) -> Any:
+        job = checked(client.post(
+            "/api/v1/pipeline/voice-to-video",
+            json={"text": f"Benchmark pipeline {index}."},
+        ))
+        return _wait_for_job(client, job["job_id"])
+
+    return {
+        "transcribe": transcribe,
+        "synthesize": synthesize,
+        "generate_video": generate_video,
+        "pipeline": pipeline,
+    }
+
+
+def mux_scenario(workdir: Path) -> Callable[[int], Any]:
+    from backend.benchmarks.mux_modes import make_clip, make_voiceover
+    from backend.utils.media import combine_audio_video
+
+    clip = make_clip(workdir / "clip.mp4", 3.0)
+    voiceover = make_voiceover(workdir / "voiceover.wav", 10.0)
+
+    def mux(index: int) -> Any:
+        return combine_audio_video(clip, voiceover, workdir / f"mux_{index}.mp4")
+
+    return mux
+
+
+def runnable_scenarios(scenarios: list[str]) -> list[str]:
+    if shutil.which("ffmpeg") is not None:
+        return list(scenarios)
+    skipped = [name for name in scenarios if name in FFMPEG_SCENARIOS]
+    if skipped:
+        print(f"Skipping {', '.join(skipped)}: ffmpeg not installed", file=sys.stderr)
+    return [name for name in scenarios if name not in skipped]
+
+
+def run(scenarios: list[str], requests: int, concurrency: int, demo_seconds: float) -> list[BenchmarkResult]:
+    from fastapi.testclient import TestClient
+    from backend.main import app
+
+    use_demo_services(demo_seconds)
+    scenarios = runnable_scenarios(scenarios)
+    results = []
+    with TestClient(app) as client, tempfile.TemporaryDirectory() as tmp:
+        available = api_scenarios(client)
+        if "mux" in scenarios:
+            available["mux"] = mux_scenario(Path(tmp))
+        for name in scenarios:
+            results.append(run_load(name, available[name], requests, concurrency))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test the API and media layer against demo-mode services")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--demo-seconds", type=float, default=0.0)
+    parser.add_argument("--save-baseline", type=Path)
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = run(args.scenarios, args.requests, args.concurrency, args.demo_seconds)
+    print(json.dumps([result.to_dict() for result in results], indent=2))
+
+    if args.save_baseline:
+        print(f"Saved baseline to {save_baseline(args.save_baseline, results)}", file=sys.stderr)
+    if args.baseline:
+        regressions = compare({r.name: r.to_dict() for r in results}, load_baseline(args.baseline), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,51 @@
 from .config import settings
+from .devices import loaded_device, resolve_device
+from .model_manager import model_manager, ModelManager
+from .scheduler import job_scheduler, JobScheduler, QueueFullError, PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW
+from .job_store import job_store, JobStore, JobStatus, InMemoryJobStore, SQLiteJobStore
+from .result_cache import result_cache, ResultCache, CacheEntry
+from .pipeline import Stage, StageCancelledError, StageFailedError, raise_if_cancelled, run_stages
+from .progress import progress_broker, ProgressBroker, JobProgress, report_progress
+from .metrics import metrics, MetricsRegistry
+from .tracing import tracer, Tracer
+from .gpu_arbiter import gpu_arbiter, GpuArbiter
+from .slo import slo_tracker, SloTracker
 
-__all__ = ["settings"]
+__all__ = [
+    "settings",
+    "resolve_device",
+    "loaded_device",
+    "model_manager",
+    "ModelManager",
+    "job_scheduler",
+    "JobScheduler",
+    "QueueFullError",
+    "PRIORITY_HIGH",
+    "PRIORITY_NORMAL",
+    "PRIORITY_LOW",
+    "job_store",
+    "JobStore",
+    "JobStatus",
+    "InMemoryJobStore",
+    "SQLiteJobStore",
+    "result_cache",
+    "ResultCache",
+    "CacheEntry",
+    "Stage",
+    "StageFailedError",
+    "StageCancelledError",
+    "raise_if_cancelled",
+    "run_stages",
+    "progress_broker",
+    "ProgressBroker",
+    "JobProgress",
+    "report_progress",
+    "metrics",
+    "MetricsRegistry",
+    "tracer",
+    "Tracer",
+    "gpu_arbiter",
+    "GpuArbiter",
+    "slo_tracker",
+    "SloTracker",
+]
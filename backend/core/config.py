@@ -1,7 +1,6 @@
 from pydantic_settings import BaseSettings
 from pathlib import Path
 from typing import Literal
-import torch
 
 
 class Settings(BaseSettings):
@@ -13,19 +12,75 @@ class Settings(BaseSettings):
     temp_dir: Path = Path("/tmp/voxvideo")
 
     whisper_model: Literal["tiny", "base", "small", "medium", "large", "turbo"] = "base"
-    whisper_device: str = "cuda" if torch.cuda.is_available() else "cpu"
+    whisper_device: str = "auto"
+    whisper_batch_enabled: bool = False
+    whisper_batch_size: int = 8
+    whisper_batch_window_ms: float = 50.0
+    whisper_stream_window_seconds: float = 15.0
+    whisper_vad: str = "energy"
+    whisper_vad_min_silence_ms: float = 500.0
+    whisper_vad_pad_ms: float = 200.0
 
     chatterbox_model: Literal["turbo", "standard", "multilingual"] = "turbo"
-    chatterbox_device: str = "cuda" if torch.cuda.is_available() else "cpu"
+    chatterbox_device: str = "auto"
 
     opensora_resolution: Literal["256px", "768px"] = "256px"
     opensora_num_frames: int = 129
-    opensora_device: str = "cuda" if torch.cuda.is_available() else "cpu"
+    opensora_device: str = "auto"
     opensora_model_path: Path = Path.home() / ".cache" / "voxvideo" / "Open-Sora-v2"
     opensora_repo_path: Path = Path.home() / ".cache" / "voxvideo" / "Open-Sora-repo"
+    opensora_worker_mode: Literal["subprocess", "persistent"] = "subprocess"
+    opensora_worker_startup_timeout: float = 600.0
+    opensora_worker_health_interval: float = 30.0
+    opensora_batch_size: int = 4
+    opensora_draft_resolution: Literal["256px", "768px"] = "256px"
+    opensora_draft_num_frames: int = 33
+    opensora_draft_num_steps: int = 20
 
     max_audio_duration_seconds: int = 300
     max_video_duration_seconds: int = 10
+    max_upload_size_mb: int = 512
+    upload_chunk_size_bytes: int = 1024 * 1024
+    media_probe_cache_size: int = 256
+    voice_profile_dir: Path | None = None
+    voice_profile_cache_size: int = 16
+    ffmpeg_max_concurrency: int | None = None
+    ffmpeg_timeout_seconds: float = 600.0
+    ffprobe_timeout_seconds: float = 30.0
+    mux_default_mode: Literal["loop", "freeze", "pingpong", "stretch", "shortest"] = "loop"
+    mux_fragmented: bool = True
+    media_chunk_size: int = 256 * 1024
+    media_cache_max_age: int = 3600
+    media_accel_redirect_prefix: str | None = None
+
+    warmup_models: list[Literal["whisper", "chatterbox", "opensora"]] = []
+    warmup_blocking: bool = False
+
+    model_vram_budget_mb: int | None = None
+    model_ram_budget_mb: int | None = None
+    model_footprints_mb: dict[str, int] = {}
+    model_prefetch: bool = True
+
+    scheduler_workers_per_device: int = 1
+    scheduler_max_queue_size: int = 32
+    scheduler_model_concurrency: dict[str, int] = {"whisper": 2, "chatterbox": 1, "opensora": 1}
+    pipeline_stage_workers: int = 4
+    gpu_cooperative_yield: bool = True
+    gpu_max_yield_seconds: float = 30.0
+    slo_targets_ms: dict[str, float] = {"interactive": 2000.0, "batch": 10 * 60 * 1000.0}
+    slo_window: int = 1000
+
+    job_store_backend: Literal["sqlite", "memory"] = "sqlite"
+    job_store_path: Path | None = None
+    job_ttl_seconds: int = 24 * 60 * 60
+    job_eviction_interval_seconds: int = 5 * 60
+
+    result_cache_enabled: bool = True
+    result_cache_dir: Path | None = None
+    result_cache_max_mb: int = 10 * 1024
+
+    metrics_enabled: bool = True
+    trace_max_jobs: int = 1000
 
     cors_origins: list[str] = ["http://localhost:1420", "http://localhost:5173", "http://localhost:3000"]
 
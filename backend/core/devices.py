@@ -0,0 +1,29 @@
+from functools import lru_cache
+import sys
+
+
+@lru_cache(maxsize=1)
+def cuda_available() -> bool:
+    try:
+        import torch
+    except ImportError:
+        return False
+    return torch.cuda.is_available()
+
+
+def resolve_device(device: str) -> str:
+    if device != "auto":
+        return device
+    return "cuda" if cuda_available() else "cpu"
+
+
+def loaded_device(device: str) -> str:
+    if device == "auto" and "torch" not in sys.modules:
+        return device
+    return resolve_device(device)
+
+
+def empty_cuda_cache() -> None:
+    torch = sys.modules.get("torch")
+    if torch is not None and torch.cuda.is_available():
+        torch.cuda.empty_cache()
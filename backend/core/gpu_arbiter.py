@@ -0,0 +1,84 @@
+from contextlib import contextmanager
+from typing import Any, Iterator
+import threading
+import time
+from backend.core.config import settings
+from backend.core.devices import loaded_device
+from backend.core.metrics import gpu_yield_seconds, interactive_active, metrics
+
+
+def device_key(device: str) -> str:
+    device = loaded_device(device)
+    return "cuda:0" if device == "cuda" else device
+
+
+class GpuArbiter:
+    def __init__(self, enabled: bool = True, max_yield_seconds: float = 30.0) -> None:
+        self.enabled = enabled
+        self.max_yield_seconds = max_yield_seconds
+        self.yields = 0
+        self.yield_seconds = 0.0
+        self._interactive: dict[str, int] = {}
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def interactive(self, device: str) -> Iterator[None]:
+        key = device_key(device)
+        with self._condition:
+            self._interactive[key] = self._interactive.get(key, 0) + 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._interactive[key] -= 1
+                if not self._interactive[key]:
+                    del self._interactive[key]
+                self._condition.notify_all()
+
+    def _contended(self, key: str) -> bool:
+        return any(active == key or "auto" in (active, key) for active in self._interactive)
+
+    def should_yield(self, device: str) -> bool:
+        if not self.enabled or not self._interactive:
+            return False
+        key = device_key(device)
+        with self._condition:
+            return self._contended(key)
+
+    def checkpoint(self, device: str) -> float:
+        if not self.should_yield(device):
+            return 0.0
+        key = device_key(device)
+        started = time.monotonic()
+        deadline = started + self.max_yield_seconds
+        with self._condition:
+            while self._contended(key) and (remaining := deadline - time.monotonic()) > 0:
+                self._condition.wait(remaining)
+        waited = time.monotonic() - started
+        self.yields += 1
+        self.yield_seconds += waited
+        gpu_yield_seconds.observe(waited, device=key)
+        return waited
+
+    def stats(self) -> dict[str, Any]:
+        with self._condition:
+            interactive = dict(self._interactive)
+        return {
+            "enabled": self.enabled,
+            "max_yield_seconds": self.max_yield_seconds,
+            "interactive_active": interactive,
+            "yields": self.yields,
+            "yield_seconds": round(self.yield_seconds, 3),
+        }
+
+
+gpu_arbiter = GpuArbiter(settings.gpu_cooperative_yield, settings.gpu_max_yield_seconds)
+
+
+def _collect_arbiter_metrics() -> None:
+    interactive_active.clear()
+    for device, count in gpu_arbiter.stats()["interactive_active"].items():
+        interactive_active.set(count, device=device)
+
+
+metrics.on_collect(_collect_arbiter_metrics)
@@ -0,0 +1,301 @@
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Callable
+import json
+import shutil
+import sqlite3
+import threading
+import time
+from pydantic import BaseModel
+from backend.core.config import settings
+from backend.core.metrics import jobs_finished
+
+FINISHED_STATUSES = ("completed", "failed")
+UNFINISHED_STATUSES = ("pending", "running")
+JOB_FIELDS = ("status", "progress", "result", "error", "stages")
+
+
+class JobStatus(BaseModel):
+    job_id: str
+    status: str
+    progress: float
+    result: dict[str, Any] | None = None
+    error: str | None = None
+    stages: dict[str, str] | None = None
+
+
+class JobStore(ABC):
+    def __init__(self, ttl_seconds: int | None = None, eviction_interval_seconds: int | None = None) -> None:
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.job_ttl_seconds
+        self.eviction_interval_seconds = (
+            eviction_interval_seconds
+            if eviction_interval_seconds is not None
+            else settings.job_eviction_interval_seconds
+        )
+        self._last_eviction = time.time()
+        self._evicting = threading.Lock()
+        self._listeners: list[Callable[[str, dict[str, Any]], None]] = []
+
+    def add_listener(self, listener: Callable[[str, dict[str, Any]], None]) -> None:
+        self._listeners.append(listener)
+
+    def _notify(self, job_id: str, fields: dict[str, Any]) -> None:
+        for listener in self._listeners:
+            listener(job_id, fields)
+
+    @staticmethod
+    def _check_fields(fields: dict[str, Any]) -> None:
+        unknown = set(fields) - set(JOB_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown job fields: {', '.join(sorted(unknown))}")
+
+    @abstractmethod
+    def create(self, job: JobStatus) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get(self, job_id: str) -> JobStatus | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def update(self, job_id: str, **fields: Any) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete(self, job_id: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_jobs(self, status: str | None = None, limit: int = 100) -> list[JobStatus]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _expired_ids(self, cutoff: float) -> list[str]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _unfinished_ids(self) -> list[str]:
+        raise NotImplementedError
+
+    def fail_interrupted(self, error: str = "Interrupted by server restart") -> list[str]:
+        interrupted = self._unfinished_ids()
+        for job_id in interrupted:
+            self.update(job_id, status="failed", error=error)
+        return interrupted
+
+    def evict_expired(self, now: float | None = None) -> list[str]:
+        now = now if now is not None else time.time()
+        self._last_eviction = now
+        expired = self._expired_ids(now - self.ttl_seconds)
+        for job_id in expired:
+            self.delete(job_id)
+            shutil.rmtree(settings.temp_dir / job_id, ignore_errors=True)
+        return expired
+
+    def _evict_in_background(self) -> None:
+        try:
+            self.evict_expired()
+        finally:
+            self._evicting.release()
+
+    def maybe_evict(self) -> None:
+        if time.time() - self._last_eviction < self.eviction_interval_seconds:
+            return
+        if not self._evicting.acquire(blocking=False):
+            return
+        self._last_eviction = time.time()
+        threading.Thread(target=self._evict_in_background, name="job-store-eviction", daemon=True).start()
+
+
+class InMemoryJobStore(JobStore):
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self._jobs: dict[str, JobStatus] = {}
+        self._created: dict[str, float] = {}
+        self._finished: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def create(self, job: JobStatus) -> None:
+        with self._lock:
+            self._jobs[job.job_id] = job.model_copy()
+            self._created[job.job_id] = time.time()
+        self.maybe_evict()
+
+    def get(self, job_id: str) -> JobStatus | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.model_copy() if job else None
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        self._check_fields(fields)
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            self._jobs[job_id] = job.model_copy(update=fields)
+            if fields.get("status") in FINISHED_STATUSES:
+                self._finished[job_id] = time.time()
+        self._notify(job_id, fields)
+
+    def delete(self, job_id: str) -> None:
+        with self._lock:
+            self._jobs.pop(job_id, None)
+            self._created.pop(job_id, None)
+            self._finished.pop(job_id, None)
+
+    def list_jobs(self, status: str | None = None, limit: int = 100) -> list[JobStatus]:
+        with self._lock:
+            ordered = sorted(self._jobs, key=self._created.__getitem__, reverse=True)
+            return [
+                self._jobs[job_id].model_copy()
+                for job_id in ordered
+                if status is None or self._jobs[job_id].status == status
+            ][:limit]
+
+    def _expired_ids(self, cutoff: float) -> list[str]:
+        with self._lock:
+            return [job_id for job_id, finished in self._finished.items() if finished < cutoff]
+
+    def _unfinished_ids(self) -> list[str]:
+        with self._lock:
+            return [job_id for job_id, job in self._jobs.items() if job.status in UNFINISHED_STATUSES]
+
+
+class SQLiteJobStore(JobStore):
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_id TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            progress REAL NOT NULL DEFAULT 0,
+            result TEXT,
+            error TEXT,
+            stages TEXT,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL,
+            finished_at REAL
+        );
+        CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status);
+        CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs (created_at);
+        CREATE INDEX IF NOT EXISTS idx_jobs_finished_at ON jobs (finished_at);
+    """
+    _JSON_COLUMNS = ("result", "stages")
+
+    def __init__(self, path: str | Path, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        conn = self._connection()
+        conn.executescript(self._SCHEMA)
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+        if "stages" not in columns:
+            conn.execute("ALTER TABLE jobs ADD COLUMN stages TEXT")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _to_job(row: sqlite3.Row) -> JobStatus:
+        return JobStatus(
+            job_id=row["job_id"],
+            status=row["status"],
+            progress=row["progress"],
+            result=json.loads(row["result"]) if row["result"] else None,
+            error=row["error"],
+            stages=json.loads(row["stages"]) if row["stages"] else None,
+        )
+
+    def create(self, job: JobStatus) -> None:
+        now = time.time()
+        self._connection().execute(
+            "INSERT OR REPLACE INTO jobs "
+            "(job_id, status, progress, result, error, stages, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                job.job_id,
+                job.status,
+                job.progress,
+                json.dumps(job.result) if job.result is not None else None,
+                job.error,
+                json.dumps(job.stages) if job.stages is not None else None,
+                now,
+                now,
+            ),
+        )
+        self.maybe_evict()
+
+    def get(self, job_id: str) -> JobStatus | None:
+        row = self._connection().execute(
+            "SELECT job_id, status, progress, result, error, stages FROM jobs WHERE job_id = ?",
+            (job_id,),
+        ).fetchone()
+        return self._to_job(row) if row else None
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        self._check_fields(fields)
+        changes = dict(fields)
+        for name in self._JSON_COLUMNS:
+            if fields.get(name) is not None:
+                fields[name] = json.dumps(fields[name])
+
+        now = time.time()
+        assignments = [f"{name} = ?" for name in fields] + ["updated_at = ?"]
+        values = [*fields.values(), now]
+        if fields.get("status") in FINISHED_STATUSES:
+            assignments.append("finished_at = ?")
+            values.append(now)
+
+        self._connection().execute(
+            f"UPDATE jobs SET {', '.join(assignments)} WHERE job_id = ?",
+            (*values, job_id),
+        )
+        self._notify(job_id, changes)
+
+    def delete(self, job_id: str) -> None:
+        self._connection().execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+
+    def list_jobs(self, status: str | None = None, limit: int = 100) -> list[JobStatus]:
+        query = "SELECT job_id, status, progress, result, error, stages FROM jobs"
+        params: tuple[Any, ...] = ()
+        if status is not None:
+            query += " WHERE status = ?"
+            params = (status,)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        rows = self._connection().execute(query, (*params, limit)).fetchall()
+        return [self._to_job(row) for row in rows]
+
+    def _expired_ids(self, cutoff: float) -> list[str]:
+        rows = self._connection().execute(
+            "SELECT job_id FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?",
+            (cutoff,),
+        ).fetchall()
+        return [row["job_id"] for row in rows]
+
+    def _unfinished_ids(self) -> list[str]:
+        rows = self._connection().execute(
+            f"SELECT job_id FROM jobs WHERE status IN ({', '.join('?' for _ in UNFINISHED_STATUSES)})",
+            UNFINISHED_STATUSES,
+        ).fetchall()
+        return [row["job_id"] for row in rows]
+
+
+def create_job_store() -> JobStore:
+    if settings.job_store_backend == "memory":
+        return InMemoryJobStore()
+    return SQLiteJobStore(settings.job_store_path or settings.temp_dir / "jobs.db")
+
+
+def count_finished_jobs(job_id: str, fields: dict[str, Any]) -> None:
+    if fields.get("status") in FINISHED_STATUSES:
+        jobs_finished.inc(status=fields["status"])
+
+
+job_store = create_job_store()
+job_store.add_listener(count_finished_jobs)
@@ -0,0 +1,239 @@
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Callable, Iterator, Sequence
+import math
+import threading
+import time
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+SIZE_BUCKETS = tuple(float(1024 * 4**i) for i in range(12))
+
+LabelValues = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric(ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    @abstractmethod
+    def samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+        return "\n".join(lines + self.samples())
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, description, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            values = dict(self._values)
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(values.items())
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, description, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._counts: dict[LabelValues, list[int]] = {}
+        self._sums: dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts = self._counts.setdefault(key, [0] * len(self.buckets))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            self._sums[key] = self._sums.get(key, 0.0) + value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels: str) -> int:
+        return sum(self._counts.get(self._key(labels), ()))
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            counts = {key: list(value) for key, value in self._counts.items()}
+            sums = dict(self._sums)
+        lines = []
+        for key in sorted(counts):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts[key]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(sums[key])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self, prefix: str = "voxvideo_") -> None:
+        self.prefix = prefix
+        self._metrics: dict[str, _Metric] = {}
+        self._collectors: list[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} is already registered with a different shape")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, description: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(self.prefix + name, description, labelnames))
+
+    def gauge(self, name: str, description: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(self.prefix + name, description, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        description: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(self.prefix + name, description, labelnames, buckets))
+
+    def on_collect(self, collector: Callable[[], None]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in list(self._collectors):
+            try:
+                collector()
+            except Exception:
+                pass
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+metrics = MetricsRegistry()
+
+http_requests = metrics.counter("http_requests_total", "HTTP requests handled", ("method", "route", "status"))
+http_request_seconds = metrics.histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "route")
+)
+http_in_flight = metrics.gauge("http_requests_in_flight", "HTTP requests currently being handled")
+upload_bytes = metrics.histogram("upload_bytes", "Size of streamed uploads", buckets=SIZE_BUCKETS)
+upload_seconds = metrics.histogram("upload_duration_seconds", "Time spent streaming uploads to disk")
+inference_seconds = metrics.histogram(
+    "inference_duration_seconds", "Model inference latency", ("model", "operation")
+)
+model_load_seconds = metrics.histogram("model_load_duration_seconds", "Model load latency", ("model",))
+model_loads = metrics.counter("model_loads_total", "Model loads", ("model",))
+model_evictions = metrics.counter("model_evictions_total", "Model unloads to free memory", ("model",))
+ffmpeg_seconds = metrics.histogram("ffmpeg_duration_seconds", "ffmpeg/ffprobe process latency", ("tool", "outcome"))
+mux_seconds = metrics.histogram("mux_duration_seconds", "Audio/video mux latency", ("mode",))
+jobs_finished = metrics.counter("jobs_finished_total", "Background jobs that reached a final status", ("status",))
+stage_seconds = metrics.histogram(
+    "pipeline_stage_duration_seconds", "Pipeline stage latency", ("stage", "outcome")
+)
+job_queue_wait_seconds = metrics.histogram(
+    "job_queue_wait_seconds", "Time jobs spend queued before a worker picks them up", ("device",)
+)
+model_slot_wait_seconds = metrics.histogram(
+    "model_slot_wait_seconds", "Time spent waiting for a model concurrency slot", ("model",)
+)
+queue_depth = metrics.gauge("job_queue_depth", "Jobs waiting in the scheduler queue", ("device",))
+jobs_running = metrics.gauge("jobs_running", "Jobs currently executing", ("device",))
+model_resident = metrics.gauge("model_resident", "Whether a model is resident in memory", ("model", "device"))
+model_in_use = metrics.gauge("model_in_use", "Calls currently using a model", ("model",))
+memory_pool_used_mb = metrics.gauge("model_memory_used_mb", "Memory attributed to resident models", ("pool",))
+ffmpeg_active = metrics.gauge("ffmpeg_processes_active", "ffmpeg/ffprobe processes currently running")
+videos_generated = metrics.counter("videos_generated_total", "Videos rendered, excluding cache hits", ("quality",))
+video_gpu_seconds = metrics.counter("video_gpu_seconds_total", "Wall-clock GPU time spent rendering videos", ("quality",))
+videos_promoted = metrics.counter("videos_promoted_total", "Drafts promoted to a full-quality render")
+gpu_yield_seconds = metrics.histogram(
+    "gpu_yield_seconds", "Time batch work spent paused for interactive requests", ("device",)
+)
+interactive_active = metrics.gauge("interactive_requests_active", "Interactive model calls in progress", ("device",))
+request_class_seconds = metrics.histogram(
+    "request_class_duration_seconds", "End-to-end latency by priority class", ("class",)
+)
+slo_violations = metrics.counter("slo_violations_total", "Requests that exceeded their class latency target", ("class",))
+whisper_audio_seconds = metrics.counter(
+    "whisper_audio_seconds_total", "Audio submitted for transcription and the speech portion actually decoded", ("kind",)
+)
@@ -0,0 +1,302 @@
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Iterator
+import threading
+import time
+from backend.core.config import settings
+from backend.core.devices import cuda_available, loaded_device, resolve_device
+from backend.core.metrics import (
+    memory_pool_used_mb,
+    metrics,
+    model_evictions,
+    model_in_use,
+    model_load_seconds,
+    model_loads,
+    model_resident,
+)
+from backend.core.tracing import tracer
+
+
+@dataclass(eq=False)
+class ModelRecord:
+    name: str
+    device: str
+    footprint_mb: int
+    load: Callable[[], None]
+    unload: Callable[[], None]
+    is_loaded: Callable[[], bool]
+    measured_mb: int | None = None
+    in_use: int = 0
+    pending: int = 0
+    loading: bool = False
+    last_used: float = 0.0
+    loads: int = 0
+    unloads: int = 0
+    last_load_seconds: float | None = None
+    last_unload_seconds: float | None = None
+    last_error: str | None = None
+    load_lock: threading.Lock = field(default_factory=threading.Lock)
+
+    @property
+    def resolved_device(self) -> str:
+        return resolve_device(self.device)
+
+    @property
+    def pool(self) -> str:
+        return "gpu" if loaded_device(self.device).startswith("cuda") else "cpu"
+
+    @property
+    def size_mb(self) -> int:
+        return self.measured_mb or self.footprint_mb
+
+    @property
+    def resident(self) -> bool:
+        return self.in_use > 0 or self.loading or self.is_loaded()
+
+
+def _detect_vram_budget() -> int | None:
+    if not cuda_available():
+        return None
+    import torch
+
+    total = torch.cuda.get_device_properties(torch.cuda.current_device()).total_memory
+    return int(total / 1024**2 * 0.9)
+
+
+def _cuda_allocated_mb(device: str) -> int | None:
+    if not device.startswith("cuda"):
+        return None
+    import torch
+
+    if not torch.cuda.is_available():
+        return None
+    return int(torch.cuda.memory_allocated(device) / 1024**2)
+
+
+class ModelManager:
+    def __init__(
+        self,
+        vram_budget_mb: int | None = None,
+        ram_budget_mb: int | None = None,
+        prefetch: bool = True,
+    ) -> None:
+        self.budgets: dict[str, int | None] = {"gpu": vram_budget_mb, "cpu": ram_budget_mb}
+        self._vram_detected = vram_budget_mb is not None
+        self.prefetch_enabled = prefetch
+        self.evictions = 0
+        self._records: dict[str, ModelRecord] = {}
+        self._condition = threading.Condition()
+
+    def register(
+        self,
+        name: str,
+        *,
+        device: str,
+        footprint_mb: int,
+        load: Callable[[], None],
+        unload: Callable[[], None],
+        is_loaded: Callable[[], bool],
+    ) -> ModelRecord:
+        record = ModelRecord(
+            name=name,
+            device=device,
+            footprint_mb=settings.model_footprints_mb.get(name, footprint_mb),
+            load=load,
+            unload=unload,
+            is_loaded=is_loaded,
+        )
+        with self._condition:
+            self._records[name] = record
+        return record
+
+    def _used_mb(self, pool: str, exclude: ModelRecord) -> int:
+        return sum(
+            r.size_mb for r in self._records.values()
+            if r is not exclude and r.pool == pool and r.resident
+        )
+
+    def _budget(self, pool: str) -> int | None:
+        if pool == "gpu" and not self._vram_detected:
+            self.budgets["gpu"] = _detect_vram_budget()
+            self._vram_detected = True
+        return self.budgets.get(pool)
+
+    def _fits(self, record: ModelRecord) -> bool:
+        budget = self._budget(record.pool)
+        return budget is None or self._used_mb(record.pool, record) + record.size_mb <= budget
+
+    def _evictable(self, record: ModelRecord, keep_pending: bool = False) -> list[ModelRecord]:
+        candidates = [
+            r for r in self._records.values()
+            if r is not record and r.pool == record.pool
+            and r.in_use == 0 and not r.loading and r.is_loaded()
+            and not (keep_pending and r.pending)
+        ]
+        return sorted(candidates, key=lambda r: (r.pending > 0, r.last_used))
+
+    def _unload(self, record: ModelRecord) -> None:
+        started = time.perf_counter()
+        record.unload()
+        record.unloads += 1
+        record.last_unload_seconds = time.perf_counter() - started
+        self.evictions += 1
+        model_evictions.inc(model=record.name)
+
+    def _make_room(self, record: ModelRecord, keep_pending: bool = False) -> bool:
+        for victim in self._evictable(record, keep_pending):
+            if self._fits(record):
+                break
+            self._unload(victim)
+        return self._fits(record)
+
+    def load(self, name: str) -> None:
+        record = self._records.get(name)
+        if record is None:
+            return
+        with record.load_lock:
+            if record.is_loaded():
+                return
+            with self._condition:
+                self._make_room(record)
+                record.loading = True
+            before = _cuda_allocated_mb(record.resolved_device)
+            started = time.perf_counter()
+            try:
+                with tracer.span("model.load", model=name, device=record.resolved_device):
+                    record.load()
+            except Exception as e:
+                record.last_error = f"{type(e).__name__}: {e}"
+                raise
+            finally:
+                with self._condition:
+                    record.loading = False
+                    self._condition.notify_all()
+            if not record.is_loaded():
+                return
+            record.last_load_seconds = time.perf_counter() - started
+            record.loads += 1
+            model_load_seconds.observe(record.last_load_seconds, model=name)
+            model_loads.inc(model=name)
+            record.last_error = None
+            after = _cuda_allocated_mb(record.resolved_device)
+            if before is not None and after is not None and after > before:
+                record.measured_mb = after - before
+
+    @contextmanager
+    def use(self, name: str) -> Iterator[None]:
+        record = self._records.get(name)
+        if record is None:
+            yield
+            return
+
+        with self._condition:
+            if record.in_use == 0 and not record.is_loaded():
+                while not self._make_room(record):
+                    others_busy = any(
+                        r.in_use or r.loading for r in self._records.values()
+                        if r is not record and r.pool == record.pool
+                    )
+                    if not others_busy:
+                        break
+                    self._condition.wait()
+            record.in_use += 1
+            record.last_used = time.monotonic()
+        try:
+            yield
+        finally:
+            with self._condition:
+                record.in_use -= 1
+                record.last_used = time.monotonic()
+                self._condition.notify_all()
+
+    def expect(self, models: Iterable[str]) -> None:
+        to_prefetch = []
+        with self._condition:
+            for name in models:
+                record = self._records.get(name)
+                if record is None:
+                    continue
+                record.pending += 1
+                if self.prefetch_enabled and not record.resident:
+                    to_prefetch.append(record)
+        for record in to_prefetch:
+            threading.Thread(
+                target=self._prefetch,
+                args=(record,),
+                name=f"model-prefetch-{record.name}",
+                daemon=True,
+            ).start()
+
+    def expect_done(self, models: Iterable[str]) -> None:
+        with self._condition:
+            for name in models:
+                record = self._records.get(name)
+                if record is not None and record.pending > 0:
+                    record.pending -= 1
+
+    def _prefetch(self, record: ModelRecord) -> None:
+        with self._condition:
+            if record.resident or not self._make_room(record, keep_pending=True):
+                return
+        try:
+            self.load(record.name)
+        except Exception:
+            pass
+
+    def evict(self, name: str) -> bool:
+        with self._condition:
+            record = self._records.get(name)
+            if record is None or record.in_use or not record.is_loaded():
+                return False
+            self._unload(record)
+            self._condition.notify_all()
+            return True
+
+    def stats(self) -> dict[str, Any]:
+        with self._condition:
+            now = time.monotonic()
+            models = {
+                name: {
+                    "device": loaded_device(r.device),
+                    "resident": r.resident,
+                    "loaded": r.is_loaded(),
+                    "in_use": r.in_use,
+                    "queued_jobs": r.pending,
+                    "footprint_mb": r.footprint_mb,
+                    "measured_mb": r.measured_mb,
+                    "loads": r.loads,
+                    "unloads": r.unloads,
+                    "last_load_seconds": r.last_load_seconds,
+                    "last_unload_seconds": r.last_unload_seconds,
+                    "idle_seconds": round(now - r.last_used, 3) if r.last_used and not r.in_use else None,
+                    "last_error": r.last_error,
+                }
+                for name, r in self._records.items()
+            }
+            pools = {
+                pool: {
+                    "budget_mb": budget,
+                    "used_mb": sum(r.size_mb for r in self._records.values() if r.pool == pool and r.resident),
+                }
+                for pool, budget in self.budgets.items()
+            }
+        return {"pools": pools, "models": models, "evictions": self.evictions}
+
+
+model_manager = ModelManager(
+    vram_budget_mb=settings.model_vram_budget_mb,
+    ram_budget_mb=settings.model_ram_budget_mb,
+    prefetch=settings.model_prefetch,
+)
+
+
+def _collect_model_metrics() -> None:
+    stats = model_manager.stats()
+    for name, model in stats["models"].items():
+        model_resident.set(int(model["resident"]), model=name, device=model["device"])
+        model_in_use.set(model["in_use"], model=name)
+    for pool, usage in stats["pools"].items():
+        memory_pool_used_mb.set(usage["used_mb"], pool=pool)
+
+
+metrics.on_collect(_collect_model_metrics)
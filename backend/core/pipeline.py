@@ -0,0 +1,130 @@
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass
+from typing import Any, Callable
+import contextvars
+import threading
+import time
+from backend.core.config import settings
+from backend.core.metrics import stage_seconds
+from backend.core.scheduler import job_scheduler
+from backend.core.tracing import tracer
+
+StageCallback = Callable[[str, str], None]
+
+
+@dataclass
+class Stage:
+    name: str
+    func: Callable[[dict[str, Any]], Any]
+    deps: tuple[str, ...] = ()
+    model: str | None = None
+
+
+class StageFailedError(Exception):
+    def __init__(self, stage: str, error: BaseException) -> None:
+        super().__init__(f"Stage '{stage}' failed: {error}")
+        self.stage = stage
+        self.error = error
+
+
+class StageCancelledError(Exception):
+    pass
+
+
+_cancelled: contextvars.ContextVar[threading.Event | None] = contextvars.ContextVar("stage_cancelled", default=None)
+
+
+def raise_if_cancelled() -> None:
+    cancelled = _cancelled.get()
+    if cancelled is not None and cancelled.is_set():
+        raise StageCancelledError("Stage cancelled because a sibling stage failed")
+
+
+def _validate(stages: list[Stage]) -> None:
+    names = [stage.name for stage in stages]
+    if len(names) != len(set(names)):
+        raise ValueError("Stage names must be unique")
+
+    known = set(names)
+    for stage in stages:
+        missing = set(stage.deps) - known
+        if missing:
+            raise ValueError(f"Stage '{stage.name}' depends on unknown stages: {sorted(missing)}")
+
+    resolved: set[str] = set()
+    remaining = list(stages)
+    while remaining:
+        ready = [stage for stage in remaining if set(stage.deps) <= resolved]
+        if not ready:
+            raise ValueError("Stage dependencies contain a cycle")
+        resolved.update(stage.name for stage in ready)
+        remaining = [stage for stage in remaining if stage.name not in resolved]
+
+
+def _run_stage(stage: Stage, results: dict[str, Any]) -> Any:
+    started = time.perf_counter()
+    outcome = "failed"
+    try:
+        with tracer.span(f"stage.{stage.name}", model=stage.model):
+            if stage.model is None:
+                result = stage.func(results)
+            else:
+                with job_scheduler.model_slot(stage.model):
+                    result = stage.func(results)
+        outcome = "completed"
+        return result
+    finally:
+        stage_seconds.observe(time.perf_counter() - started, stage=stage.name, outcome=outcome)
+
+
+def run_stages(
+    stages: list[Stage],
+    executor: Executor | None = None,
+    on_stage: StageCallback | None = None,
+) -> dict[str, Any]:
+    _validate(stages)
+    executor = executor or stage_executor
+    notify = on_stage or (lambda name, status: None)
+
+    results: dict[str, Any] = {}
+    pending = {stage.name: stage for stage in stages}
+    running: dict[Future, str] = {}
+    cancelled = threading.Event()
+
+    for name in pending:
+        notify(name, "pending")
+
+    while pending or running:
+        for name, stage in list(pending.items()):
+            if all(dep in results for dep in stage.deps):
+                del pending[name]
+                notify(name, "running")
+                context = contextvars.copy_context()
+                context.run(_cancelled.set, cancelled)
+                running[executor.submit(context.run, _run_stage, stage, dict(results))] = name
+
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            name = running.pop(future)
+            error = future.exception()
+            if error is not None:
+                notify(name, "failed")
+                cancelled.set()
+                for other in running:
+                    other.cancel()
+                wait(running)
+                for other, other_name in running.items():
+                    notify(other_name, "cancelled")
+                for skipped in pending:
+                    notify(skipped, "skipped")
+                raise StageFailedError(name, error) from error
+            results[name] = future.result()
+            notify(name, "completed")
+
+    return results
+
+
+stage_executor = ThreadPoolExecutor(
+    max_workers=settings.pipeline_stage_workers,
+    thread_name_prefix="pipeline-stage",
+)
@@ -0,0 +1,146 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator
+import asyncio
+import threading
+import time
+from backend.core.job_store import job_store
+
+
+class ProgressBroker:
+    def __init__(self, max_queue_size: int = 256, max_jobs: int = 1024) -> None:
+        self.max_queue_size = max_queue_size
+        self.max_jobs = max_jobs
+        self._subscribers: dict[str, set[tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        self._last: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def subscribe(self, job_id: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queue_size)
+        with self._lock:
+            self._subscribers.setdefault(job_id, set()).add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(job_id, set())
+            subscribers.difference_update({s for s in subscribers if s[1] is queue})
+            if not subscribers:
+                self._subscribers.pop(job_id, None)
+
+    def last(self, job_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            return self._last.get(job_id)
+
+    def publish(self, job_id: str, event: dict[str, Any]) -> None:
+        event = {"job_id": job_id, "timestamp": time.time(), **event}
+        with self._lock:
+            if event["type"] == "progress":
+                self._last[job_id] = event
+                self._last.move_to_end(job_id)
+                while len(self._last) > self.max_jobs:
+                    self._last.popitem(last=False)
+            subscribers = list(self._subscribers.get(job_id, ()))
+
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._offer, queue, event)
+            except RuntimeError:
+                self.unsubscribe(job_id, queue)
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, event: dict[str, Any]) -> None:
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(event)
+
+    def on_job_update(self, job_id: str, fields: dict[str, Any]) -> None:
+        if not fields.keys() - {"progress", "result"}:
+            return
+        self.publish(job_id, {
+            "type": "status",
+            **{key: fields[key] for key in ("status", "progress", "error", "stages") if key in fields},
+        })
+
+
+progress_broker = ProgressBroker()
+job_store.add_listener(progress_broker.on_job_update)
+
+_current: ContextVar[tuple["JobProgress", str] | None] = ContextVar("job_progress", default=None)
+
+
+class JobProgress:
+    def __init__(
+        self,
+        job_id: str,
+        weights: dict[str, float] | None = None,
+        min_store_interval: float = 0.5,
+        broker: ProgressBroker | None = None,
+    ) -> None:
+        self.job_id = job_id
+        self.weights = weights or {}
+        self.min_store_interval = min_store_interval
+        self.broker = broker or progress_broker
+        self.started = time.monotonic()
+        self.fractions: dict[str, float] = {}
+        self._stored_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def overall(self) -> float:
+        weights = self.weights or {stage: 1.0 for stage in self.fractions}
+        total = sum(weights.values())
+        if not total:
+            return 0.0
+        return sum(weight * self.fractions.get(stage, 0.0) for stage, weight in weights.items()) / total
+
+    def eta_seconds(self, overall: float) -> float | None:
+        if overall <= 0 or overall >= 1:
+            return 0.0 if overall >= 1 else None
+        elapsed = time.monotonic() - self.started
+        return round(elapsed * (1 - overall) / overall, 1)
+
+    def update(self, stage: str, fraction: float, message: str | None = None) -> None:
+        fraction = min(max(fraction, 0.0), 1.0)
+        with self._lock:
+            self.fractions[stage] = max(self.fractions.get(stage, 0.0), fraction)
+            overall = round(self.overall, 4)
+            now = time.monotonic()
+            store = overall >= 1 or now - self._stored_at >= self.min_store_interval
+            if store:
+                self._stored_at = now
+
+        if store:
+            job_store.update(self.job_id, progress=overall)
+        self.broker.publish(self.job_id, {
+            "type": "progress",
+            "stage": stage,
+            "stage_progress": round(self.fractions[stage], 4),
+            "progress": overall,
+            "eta_seconds": self.eta_seconds(overall),
+            "elapsed_seconds": round(time.monotonic() - self.started, 1),
+            "message": message,
+        })
+
+    @contextmanager
+    def bind(self, stage: str) -> Iterator[None]:
+        token = _current.set((self, stage))
+        try:
+            yield
+        finally:
+            _current.reset(token)
+        self.update(stage, 1.0)
+
+    def wrap(self, stage: str, func: Callable[..., Any]) -> Callable[..., Any]:
+        def run(*args: Any, **kwargs: Any) -> Any:
+            with self.bind(stage):
+                return func(*args, **kwargs)
+        return run
+
+
+def report_progress(fraction: float, message: str | None = None) -> None:
+    current = _current.get()
+    if current is not None:
+        tracker, stage = current
+        tracker.update(stage, fraction, message)
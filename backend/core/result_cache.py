@@ -0,0 +1,184 @@
+from collections import OrderedDict
+from contextlib import AbstractContextManager, nullcontext
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, BinaryIO, Callable
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+from backend.core.config import settings
+
+META_FILE = "meta.json"
+
+
+@dataclass
+class CacheEntry:
+    key: str
+    path: Path
+    meta: dict[str, Any]
+    lock: AbstractContextManager | None = field(default=None, repr=False)
+    on_restore: Callable[[bool], None] | None = field(default=None, repr=False)
+
+    def _link_or_open(self, source: Path, destination: Path) -> BinaryIO | None:
+        with self.lock or nullcontext():
+            if not source.is_file():
+                raise FileNotFoundError(source)
+            destination.unlink(missing_ok=True)
+            try:
+                os.link(source, destination)
+                return None
+            except OSError:
+                return open(source, "rb")
+
+    def _restored(self, destination: Path | None) -> Path | None:
+        if self.on_restore is not None:
+            self.on_restore(destination is not None)
+        return destination
+
+    def materialize(self, name: str, destination: str | Path) -> Path | None:
+        destination = Path(destination)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            pinned = self._link_or_open(self.path / name, destination)
+            if pinned is not None:
+                with pinned, open(destination, "wb") as target:
+                    shutil.copyfileobj(pinned, target)
+        except OSError:
+            destination.unlink(missing_ok=True)
+            return self._restored(None)
+        return self._restored(destination)
+
+
+class ResultCache:
+    def __init__(self, root: str | Path, max_bytes: int, enabled: bool = True) -> None:
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, int] | None = None
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(kind: str, **parts: Any) -> str:
+        payload = json.dumps({"kind": kind, **parts}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _entry_dir(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    @staticmethod
+    def _dir_size(path: Path) -> int:
+        return sum(f.stat().st_size for f in path.iterdir() if f.is_file())
+
+    def _index(self) -> OrderedDict[str, int]:
+        if self._entries is None:
+            found = []
+            for meta in self.root.glob(f"*/*/{META_FILE}"):
+                entry_dir = meta.parent
+                found.append((meta.stat().st_mtime, entry_dir.name, self._dir_size(entry_dir)))
+            found.sort()
+            self._entries = OrderedDict((key, size) for _, key, size in found)
+            self._total_bytes = sum(self._entries.values())
+        return self._entries
+
+    def _record(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key: str, restore: bool = False) -> CacheEntry | None:
+        entry_dir = self._entry_dir(key)
+        meta_path = entry_dir / META_FILE
+        with self._lock:
+            entries = self._index()
+            try:
+                meta = json.loads(meta_path.read_text())
+            except (OSError, ValueError):
+                self.misses += 1
+                return None
+
+            if not restore:
+                self.hits += 1
+            if key not in entries:
+                entries[key] = self._dir_size(entry_dir)
+                self._total_bytes += entries[key]
+            entries.move_to_end(key)
+            os.utime(meta_path)
+            return CacheEntry(
+                key=key,
+                path=entry_dir,
+                meta=meta,
+                lock=self._lock,
+                on_restore=self._record if restore else None,
+            )
+
+    def put(
+        self,
+        key: str,
+        meta: dict[str, Any],
+        files: dict[str, str | Path] | None = None,
+    ) -> CacheEntry:
+        entry_dir = self._entry_dir(key)
+        staging = self.root / f".staging-{uuid.uuid4().hex}"
+        staging.mkdir(parents=True)
+        try:
+            for name, source in (files or {}).items():
+                shutil.copy2(source, staging / name)
+            (staging / META_FILE).write_text(json.dumps(meta, default=str))
+            size = self._dir_size(staging)
+
+            with self._lock:
+                entries = self._index()
+                if entry_dir.exists():
+                    shutil.rmtree(entry_dir, ignore_errors=True)
+                    self._total_bytes -= entries.pop(key, 0)
+                entry_dir.parent.mkdir(parents=True, exist_ok=True)
+                staging.rename(entry_dir)
+                entries[key] = size
+                self._total_bytes += size
+                self._evict()
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+        return CacheEntry(key=key, path=entry_dir, meta=meta, lock=self._lock)
+
+    def _evict(self) -> None:
+        entries = self._index()
+        while self._total_bytes > self.max_bytes and len(entries) > 1:
+            key, size = entries.popitem(last=False)
+            shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+            self._total_bytes -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            shutil.rmtree(self.root, ignore_errors=True)
+            self._entries = None
+            self._total_bytes = 0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            entries = self._index()
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(entries),
+                "size_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+result_cache = ResultCache(
+    root=settings.result_cache_dir or settings.model_cache_dir / "results",
+    max_bytes=settings.result_cache_max_mb * 1024 * 1024,
+    enabled=settings.result_cache_enabled,
+)
@@ -0,0 +1,200 @@
+from concurrent.futures import Future
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator
+import itertools
+import queue
+import threading
+import time
+from backend.core.config import settings
+from backend.core.metrics import job_queue_wait_seconds, jobs_running, metrics, model_slot_wait_seconds, queue_depth
+from backend.core.model_manager import model_manager
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 10
+PRIORITY_LOW = 20
+
+
+class QueueFullError(Exception):
+    def __init__(self, device: str, depth: int) -> None:
+        super().__init__(f"Job queue for device '{device}' is full ({depth} queued)")
+        self.device = device
+        self.depth = depth
+
+
+@dataclass(order=True)
+class _QueuedJob:
+    priority: int
+    sequence: int
+    job_id: str = field(compare=False)
+    func: Callable[[], Any] = field(compare=False)
+    future: Future = field(compare=False)
+    models: tuple[str, ...] = field(compare=False, default=())
+    enqueued_at: float = field(compare=False, default_factory=time.monotonic)
+
+
+class _DevicePool:
+    def __init__(self, device: str, num_workers: int, max_queue_size: int) -> None:
+        self.device = device
+        self.num_workers = num_workers
+        self.queue: queue.PriorityQueue[_QueuedJob] = queue.PriorityQueue(maxsize=max_queue_size)
+        self.running: set[str] = set()
+        self._workers: list[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def ensure_started(self) -> None:
+        with self._lock:
+            self._workers = [w for w in self._workers if w.is_alive()]
+            while len(self._workers) < self.num_workers:
+                worker = threading.Thread(
+                    target=self._work,
+                    args=(self._stop,),
+                    name=f"scheduler-{self.device}-{len(self._workers)}",
+                    daemon=True,
+                )
+                worker.start()
+                self._workers.append(worker)
+
+    def _work(self, stop: threading.Event) -> None:
+        while not stop.is_set():
+            try:
+                job = self.queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if stop.is_set():
+                self.queue.put(job)
+                self.queue.task_done()
+                return
+
+            try:
+                model_manager.expect_done(job.models)
+                if not job.future.set_running_or_notify_cancel():
+                    continue
+                job_queue_wait_seconds.observe(time.monotonic() - job.enqueued_at, device=self.device)
+                with self._lock:
+                    self.running.add(job.job_id)
+                try:
+                    job.future.set_result(job.func())
+                except BaseException as e:
+                    job.future.set_exception(e)
+                finally:
+                    with self._lock:
+                        self.running.discard(job.job_id)
+            finally:
+                self.queue.task_done()
+
+    def stop(self, wait: bool) -> None:
+        with self._lock:
+            stop, workers = self._stop, self._workers
+            self._stop = threading.Event()
+            self._workers = []
+        stop.set()
+        if wait:
+            for worker in workers:
+                worker.join()
+
+
+class JobScheduler:
+    def __init__(
+        self,
+        workers_per_device: int | None = None,
+        max_queue_size: int | None = None,
+        model_concurrency: dict[str, int] | None = None,
+    ) -> None:
+        self.workers_per_device = workers_per_device or settings.scheduler_workers_per_device
+        self.max_queue_size = max_queue_size or settings.scheduler_max_queue_size
+        concurrency = model_concurrency or settings.scheduler_model_concurrency
+        self._model_slots = {
+            model: threading.BoundedSemaphore(limit)
+            for model, limit in concurrency.items()
+        }
+        self._pools: dict[str, _DevicePool] = {}
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+    def _pool(self, device: str) -> _DevicePool:
+        with self._lock:
+            pool = self._pools.get(device)
+            if pool is None:
+                pool = _DevicePool(device, self.workers_per_device, self.max_queue_size)
+                self._pools[device] = pool
+        pool.ensure_started()
+        return pool
+
+    def submit(
+        self,
+        func: Callable[[], Any],
+        *,
+        device: str,
+        job_id: str,
+        priority: int = PRIORITY_NORMAL,
+        models: tuple[str, ...] = (),
+    ) -> Future:
+        pool = self._pool(device)
+        future: Future = Future()
+        job = _QueuedJob(
+            priority=priority,
+            sequence=next(self._sequence),
+            job_id=job_id,
+            func=func,
+            future=future,
+            models=models,
+        )
+        model_manager.expect(models)
+        try:
+            pool.queue.put_nowait(job)
+        except queue.Full:
+            model_manager.expect_done(models)
+            raise QueueFullError(device, pool.queue.qsize())
+        return future
+
+    @contextmanager
+    def model_slot(self, model: str) -> Iterator[None]:
+        slot = self._model_slots.get(model)
+        started = time.perf_counter()
+        if slot is None:
+            with model_manager.use(model):
+                model_slot_wait_seconds.observe(time.perf_counter() - started, model=model)
+                yield
+            return
+        with slot, model_manager.use(model):
+            model_slot_wait_seconds.observe(time.perf_counter() - started, model=model)
+            yield
+
+    def queue_depth(self, device: str | None = None) -> int:
+        if device is not None:
+            pool = self._pools.get(device)
+            return pool.queue.qsize() if pool else 0
+        return sum(pool.queue.qsize() for pool in self._pools.values())
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "max_queue_size": self.max_queue_size,
+            "devices": {
+                device: {
+                    "workers": pool.num_workers,
+                    "queued": pool.queue.qsize(),
+                    "running": len(pool.running),
+                }
+                for device, pool in self._pools.items()
+            },
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            pools = list(self._pools.values())
+        for pool in pools:
+            pool.stop(wait)
+
+
+job_scheduler = JobScheduler()
+
+
+def _collect_queue_metrics() -> None:
+    for device, pool in job_scheduler.stats()["devices"].items():
+        queue_depth.set(pool["queued"], device=device)
+        jobs_running.set(pool["running"], device=device)
+
+
+metrics.on_collect(_collect_queue_metrics)
@@ -0,0 +1,58 @@
+from collections import deque
+from typing import Any
+import threading
+from backend.core.config import settings
+from backend.core.metrics import request_class_seconds, slo_violations
+
+PRIORITY_CLASSES = ("interactive", "batch")
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    rank = (len(ordered) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+class SloTracker:
+    def __init__(self, targets_ms: dict[str, float], window: int = 1000) -> None:
+        self.targets_ms = dict(targets_ms)
+        self.window = window
+        self._samples: dict[str, deque[float]] = {}
+        self._violations: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, klass: str, seconds: float) -> None:
+        request_class_seconds.observe(seconds, **{"class": klass})
+        target = self.targets_ms.get(klass)
+        violated = target is not None and seconds * 1000 > target
+        if violated:
+            slo_violations.inc(**{"class": klass})
+        with self._lock:
+            self._samples.setdefault(klass, deque(maxlen=self.window)).append(seconds * 1000)
+            if violated:
+                self._violations[klass] = self._violations.get(klass, 0) + 1
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            samples = {klass: sorted(values) for klass, values in self._samples.items()}
+            violations = dict(self._violations)
+
+        result = {}
+        for klass in dict.fromkeys([*PRIORITY_CLASSES, *samples]):
+            ordered = samples.get(klass, [])
+            target = self.targets_ms.get(klass)
+            within = sum(1 for value in ordered if target is None or value <= target)
+            result[klass] = {
+                "target_ms": target,
+                "samples": len(ordered),
+                "p50_ms": round(_percentile(ordered, 50), 2) if ordered else None,
+                "p95_ms": round(_percentile(ordered, 95), 2) if ordered else None,
+                "p99_ms": round(_percentile(ordered, 99), 2) if ordered else None,
+                "attainment": round(within / len(ordered), 4) if ordered else None,
+                "violations": violations.get(klass, 0),
+            }
+        return result
+
+
+slo_tracker = SloTracker(settings.slo_targets_ms, settings.slo_window)
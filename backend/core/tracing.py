@@ -0,0 +1,106 @@
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+import threading
+import time
+import uuid
+from backend.core.config import settings
+from backend.core.metrics import Histogram
+
+
+@dataclass
+class Span:
+    trace_id: str
+    span_id: str
+    name: str
+    parent_id: str | None
+    started_at: float
+    attributes: dict[str, Any] = field(default_factory=dict)
+    duration_seconds: float | None = None
+    status: str = "running"
+    error: str | None = None
+    started: float = field(default_factory=time.perf_counter, repr=False)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_seconds": self.duration_seconds,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+class Tracer:
+    def __init__(self, max_traces: int = 1000, max_spans_per_trace: int = 1000) -> None:
+        self.max_traces = max_traces
+        self.max_spans_per_trace = max_spans_per_trace
+        self._traces: OrderedDict[str, list[Span]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _record(self, span: Span) -> None:
+        with self._lock:
+            spans = self._traces.setdefault(span.trace_id, [])
+            self._traces.move_to_end(span.trace_id)
+            if len(spans) < self.max_spans_per_trace:
+                spans.append(span)
+            while len(self._traces) > self.max_traces:
+                self._traces.popitem(last=False)
+
+    @contextmanager
+    def span(self, name: str, trace_id: str | None = None, **attributes: Any) -> Iterator[Span | None]:
+        parent = _current_span.get()
+        trace_id = trace_id or (parent.trace_id if parent else None)
+        if trace_id is None:
+            yield None
+            return
+
+        span = Span(
+            trace_id=trace_id,
+            span_id=uuid.uuid4().hex[:16],
+            name=name,
+            parent_id=parent.span_id if parent and parent.trace_id == trace_id else None,
+            started_at=time.time(),
+            attributes=attributes,
+        )
+        self._record(span)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        else:
+            span.status = "ok"
+        finally:
+            span.duration_seconds = round(time.perf_counter() - span.started, 6)
+            _current_span.reset(token)
+
+    def get(self, trace_id: str) -> list[dict[str, Any]] | None:
+        with self._lock:
+            spans = self._traces.get(trace_id)
+            return [span.to_dict() for span in spans] if spans is not None else None
+
+    def current_trace_id(self) -> str | None:
+        span = _current_span.get()
+        return span.trace_id if span else None
+
+
+tracer = Tracer(max_traces=settings.trace_max_jobs)
+
+
+@contextmanager
+def timed_span(name: str, histogram: Histogram | None = None, **labels: str) -> Iterator[Span | None]:
+    timer = histogram.time(**labels) if histogram is not None else nullcontext()
+    with timer, tracer.span(name, **labels) as span:
+        yield span
@@ -1,12 +1,34 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+import asyncio
+import time
 from backend.api import router
-from backend.core import settings
+from backend.core import settings, job_scheduler, job_store
+from backend.core.metrics import http_in_flight, http_request_seconds, http_requests, metrics
+from backend.services import opensora_service
+from backend.services.warmup import warmup_state
+from backend.utils.upload import MULTIPART_OVERHEAD_BYTES, RequestSizeLimitMiddleware
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await run_in_threadpool(job_store.fail_interrupted)
+    app.state.warmup = asyncio.create_task(run_in_threadpool(warmup_state.run, settings.warmup_models))
+    if settings.warmup_blocking:
+        await app.state.warmup
+    yield
+    job_scheduler.shutdown(wait=False)
+    opensora_service.unload()
+
 
 app = FastAPI(
     title=settings.app_name,
     version=settings.version,
     debug=settings.debug,
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -17,9 +39,44 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(
+    RequestSizeLimitMiddleware,
+    max_bytes=settings.max_upload_size_mb * 1024 * 1024 + MULTIPART_OVERHEAD_BYTES,
+)
+
 app.include_router(router, prefix="/api/v1")
 
 
+def route_template(request: Request) -> str:
+    route = request.scope.get("route")
+    if route is None:
+        return "unmatched"
+    path = request.scope["path"]
+    for index, char in enumerate(path):
+        if char == "/" and route.path_regex.match(path[index:]):
+            return path[:index] + route.path
+    return route.path
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    if not settings.metrics_enabled:
+        return await call_next(request)
+
+    started = time.perf_counter()
+    http_in_flight.inc()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        http_in_flight.dec()
+        path = route_template(request)
+        http_request_seconds.observe(time.perf_counter() - started, method=request.method, route=path)
+        http_requests.inc(method=request.method, route=path, status=str(status))
+
+
 @app.get("/")
 async def root():
     return {
@@ -34,6 +91,21 @@ async def health():
     return {"status": "healthy"}
 
 
+@app.get("/metrics")
+async def prometheus_metrics():
+    if not settings.metrics_enabled:
+        return PlainTextResponse("metrics disabled\n", status_code=404)
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/ready")
+async def ready():
+    snapshot = warmup_state.snapshot()
+    if snapshot["status"] != "ready":
+        return JSONResponse(status_code=503, content=snapshot)
+    return snapshot
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -1,13 +1,55 @@
 from pathlib import Path
-import torch
-from backend.core import settings
+from typing import TYPE_CHECKING, Any, Iterator
+import itertools
+import queue
+import re
+import threading
+import numpy as np
+from backend.core import settings, job_scheduler, result_cache, model_manager, resolve_device, report_progress
+from backend.core.gpu_arbiter import gpu_arbiter
+from backend.core.devices import empty_cuda_cache
+from backend.core.metrics import inference_seconds
+from backend.core.tracing import timed_span
+from backend.utils.hashing import file_sha256
+from backend.utils.audio import demo_tone, write_wav
+from backend.services.voice_profiles import VoiceProfile, voice_profiles
+
+if TYPE_CHECKING:
+    import torch
 
 DEMO_MODE = False
 
+MODEL_FOOTPRINTS_MB = {"turbo": 2500, "standard": 3500, "multilingual": 4000}
+SAMPLE_RATE = 24000
+
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?;:])\s+")
+_CLAUSE_BOUNDARY = re.compile(r"(?<=,)\s+")
+
+
+def split_sentences(text: str, max_chars: int = 200) -> list[str]:
+    chunks = []
+    for sentence in _SENTENCE_BOUNDARY.split(text.strip()):
+        if len(sentence) <= max_chars:
+            chunks.append(sentence)
+            continue
+
+        current = ""
+        for clause in _CLAUSE_BOUNDARY.split(sentence):
+            if current and len(current) + len(clause) + 1 > max_chars:
+                chunks.append(current)
+                current = clause
+            else:
+                current = f"{current} {clause}" if current else clause
+        if current:
+            chunks.append(current)
+    return [chunk for chunk in chunks if chunk.strip()]
+
 
 class ChatterboxService:
     _instance: "ChatterboxService | None" = None
     _model = None
+    _builtin_conds = None
+    _conds_lock = threading.Lock()
 
     def __new__(cls) -> "ChatterboxService":
         if cls._instance is None:
@@ -24,30 +66,29 @@ class ChatterboxService:
         if settings.chatterbox_model == "turbo":
             from chatterbox.tts_turbo import ChatterboxTurboTTS
             self._model = ChatterboxTurboTTS.from_pretrained(
-                device=settings.chatterbox_device
+                device=resolve_device(settings.chatterbox_device)
             )
         elif settings.chatterbox_model == "multilingual":
             from chatterbox.mtl_tts import ChatterboxMultilingualTTS
             self._model = ChatterboxMultilingualTTS.from_pretrained(
-                device=settings.chatterbox_device
+                device=resolve_device(settings.chatterbox_device)
             )
         else:
             from chatterbox.tts import ChatterboxTTS
             self._model = ChatterboxTTS.from_pretrained(
-                device=settings.chatterbox_device
+                device=resolve_device(settings.chatterbox_device)
             )
+        self._builtin_conds = getattr(self._model, "conds", None)
 
     @property
     def model(self):
         if self._model is None and not DEMO_MODE:
-            self._load_model()
+            model_manager.load("chatterbox")
         return self._model
 
     @property
     def sample_rate(self) -> int:
-        if DEMO_MODE:
-            return 24000
-        return self.model.sr
+        return getattr(self._model, "sr", SAMPLE_RATE)
 
     def synthesize(
         self,
@@ -56,60 +97,224 @@ class ChatterboxService:
         voice_reference: str | Path | None = None,
         exaggeration: float = 0.5,
         language_id: str | None = None,
+        use_cache: bool = True,
+        voice_profile_id: str | None = None,
     ) -> Path:
         output_path = Path(output_path)
+        profile = self.get_voice_profile(voice_profile_id) if voice_profile_id else None
+
+        cache_key = None
+        if use_cache and result_cache.enabled:
+            voice = profile.reference_sha256 if profile else None
+            if voice is None and voice_reference:
+                voice = file_sha256(voice_reference)
+            cache_key = result_cache.key(
+                "chatterbox.synthesize",
+                text=text,
+                voice=voice,
+                model="demo" if DEMO_MODE else settings.chatterbox_model,
+                exaggeration=exaggeration,
+                language_id=language_id,
+            )
+            entry = result_cache.get(cache_key, restore=True)
+            restored = entry.materialize("audio.wav", output_path) if entry is not None else None
+            if restored is not None:
+                return restored
 
+        with timed_span("chatterbox.synthesize", inference_seconds, model="chatterbox", operation="synthesize"):
+            self._synthesize(text, output_path, voice_reference, exaggeration, language_id, voice_profile_id)
+        if cache_key is not None and output_path.exists():
+            result_cache.put(cache_key, {"text": text}, files={"audio.wav": output_path})
+        return output_path
+
+    def _synthesize(
+        self,
+        text: str,
+        output_path: Path,
+        voice_reference: str | Path | None,
+        exaggeration: float,
+        language_id: str | None,
+        voice_profile_id: str | None = None,
+    ) -> Path:
         if DEMO_MODE:
-            import wave
-            import struct
+            num_samples = int(24000 * len(text) * 0.05)
+            return write_wav(output_path, demo_tone(num_samples), 24000)
+
+        report_progress(0.0, "synthesizing")
+        wav = self._generate(text, voice_reference, exaggeration, language_id, voice_profile_id)
+        report_progress(1.0, "synthesized")
+        return write_wav(output_path, self._to_pcm16(wav), self.sample_rate)
+
+    def _generate(
+        self,
+        text: str,
+        voice_reference: str | Path | None,
+        exaggeration: float,
+        language_id: str | None,
+        voice_profile_id: str | None,
+    ) -> "torch.Tensor":
+        if voice_profile_id is None and voice_reference:
+            voice_profile_id = self.create_voice_profile(voice_reference).profile_id
 
-            sample_rate = 24000
-            duration = len(text) * 0.05
-            num_samples = int(sample_rate * duration)
+        kwargs = self._generate_kwargs(exaggeration, language_id)
+        conds = self._builtin_conds
+        if voice_profile_id is not None:
+            conds = voice_profiles.conditionals(voice_profile_id, self._load_conditionals)
+        with self._conds_lock:
+            self.model.conds = conds
+            return self.model.generate(text, **kwargs)
 
-            with wave.open(str(output_path), 'w') as wav_file:
-                wav_file.setnchannels(1)
-                wav_file.setsampwidth(2)
-                wav_file.setframerate(sample_rate)
-                for i in range(num_samples):
-                    value = int(32767 * 0.1 * (i % 100) / 100)
-                    wav_file.writeframes(struct.pack('<h', value))
+    def get_voice_profile(self, profile_id: str) -> VoiceProfile:
+        profile = voice_profiles.get(profile_id)
+        if profile is None:
+            raise KeyError(f"Unknown voice profile: {profile_id}")
+        return profile
 
-            return output_path
+    def create_voice_profile(self, voice_reference: str | Path, name: str | None = None) -> VoiceProfile:
+        digest = file_sha256(voice_reference)
+        model_name = "demo" if DEMO_MODE else settings.chatterbox_model
+        existing = voice_profiles.get(voice_profiles.profile_id(model_name, digest))
+        if existing is not None and (DEMO_MODE or voice_profiles.conditionals_path(existing.profile_id).is_file()):
+            if name is not None and name != existing.name:
+                return voice_profiles.rename(existing.profile_id, name)
+            return existing
 
-        import torchaudio
+        def save_conditionals(path: Path) -> Any:
+            with self._conds_lock, timed_span(
+                "chatterbox.prepare_conditionals", inference_seconds,
+                model="chatterbox", operation="prepare_conditionals",
+            ):
+                self.model.prepare_conditionals(str(voice_reference))
+                conds = self.model.conds
+                self.model.conds = self._builtin_conds
+            conds.save(path)
+            return conds
 
-        kwargs = {}
-        if voice_reference:
-            kwargs["audio_prompt_path"] = str(voice_reference)
+        return voice_profiles.create(model_name, digest, name, None if DEMO_MODE else save_conditionals)
+
+    def _load_conditionals(self, path: Path) -> Any:
+        import importlib
+
+        conditionals = importlib.import_module(type(self.model).__module__).Conditionals
+        return conditionals.load(path, map_location=resolve_device(settings.chatterbox_device))
+
+    def _to_pcm16(self, wav: "torch.Tensor") -> np.ndarray:
+        import torch
+
+        if wav.dtype != torch.float32:
+            wav = wav.float()
+        pcm = (wav.clamp(-1.0, 1.0) * 32767).to(torch.int16)
+        return pcm.squeeze(0).cpu().numpy()
 
+    def _generate_kwargs(self, exaggeration: float, language_id: str | None) -> dict[str, Any]:
+        kwargs: dict[str, Any] = {}
         if hasattr(self.model, "exaggeration"):
             kwargs["exaggeration"] = exaggeration
 
         if language_id and hasattr(self.model, "language_id"):
             kwargs["language_id"] = language_id
+        return kwargs
 
-        wav = self.model.generate(text, **kwargs)
+    def _demo_pcm(self, text: str) -> bytes:
+        return demo_tone(int(24000 * len(text) * 0.05)).tobytes()
 
-        if wav.dtype != torch.float32:
-            wav = wav.float()
+    def synthesize_chunk(
+        self,
+        text: str,
+        voice_reference: str | Path | None = None,
+        exaggeration: float = 0.5,
+        language_id: str | None = None,
+        voice_profile_id: str | None = None,
+    ) -> bytes:
+        if DEMO_MODE:
+            return self._demo_pcm(text)
 
-        torchaudio.save(str(output_path), wav.cpu(), self.sample_rate)
-        return output_path
+        with (
+            job_scheduler.model_slot("chatterbox"),
+            gpu_arbiter.interactive(settings.chatterbox_device),
+            inference_seconds.time(model="chatterbox", operation="synthesize_chunk"),
+        ):
+            wav = self._generate(text, voice_reference, exaggeration, language_id, voice_profile_id)
+        return self._to_pcm16(wav).tobytes()
+
+    def warmup(self) -> None:
+        self.synthesize_chunk("Hello.")
+
+    def synthesize_stream(
+        self,
+        text: str,
+        voice_reference: str | Path | None = None,
+        exaggeration: float = 0.5,
+        language_id: str | None = None,
+        lookahead: int = 1,
+        voice_profile_id: str | None = None,
+    ) -> Iterator[bytes]:
+        chunks = split_sentences(text)
+
+        def synthesize(chunk: str) -> bytes:
+            return self.synthesize_chunk(chunk, voice_reference, exaggeration, language_id, voice_profile_id)
+
+        if lookahead <= 0:
+            for index, chunk in enumerate(chunks, 1):
+                yield synthesize(chunk)
+                report_progress(index / len(chunks))
+            return
+
+        ready: queue.Queue = queue.Queue(maxsize=lookahead)
+        cancelled = threading.Event()
+
+        def produce() -> None:
+            try:
+                for chunk in chunks:
+                    if cancelled.is_set():
+                        return
+                    ready.put((synthesize(chunk), None))
+            except Exception as e:
+                ready.put((None, e))
+            ready.put((None, None))
+
+        producer = threading.Thread(target=produce, name="chatterbox-stream", daemon=True)
+        producer.start()
+        try:
+            for index in itertools.count(1):
+                pcm, error = ready.get()
+                if error is not None:
+                    raise error
+                if pcm is None:
+                    return
+                yield pcm
+                report_progress(index / len(chunks))
+        finally:
+            cancelled.set()
+            while producer.is_alive():
+                try:
+                    ready.get_nowait()
+                except queue.Empty:
+                    producer.join(0.05)
 
     def list_builtin_voices(self) -> list[str]:
         if DEMO_MODE:
             return ["default", "narrator", "assistant"]
 
-        if hasattr(self.model, "conds") and self.model.conds is not None:
-            return list(self.model.conds.keys())
-        return []
+        if self._builtin_conds is None:
+            return []
+        return list(self._builtin_conds.keys())
 
     def unload(self) -> None:
         if self._model is not None:
             del self._model
             self._model = None
-            torch.cuda.empty_cache()
+            self._builtin_conds = None
+            voice_profiles.evict_loaded()
+            empty_cuda_cache()
 
 
 chatterbox_service = ChatterboxService()
+model_manager.register(
+    "chatterbox",
+    device=settings.chatterbox_device,
+    footprint_mb=MODEL_FOOTPRINTS_MB[settings.chatterbox_model],
+    load=chatterbox_service._load_model,
+    unload=chatterbox_service.unload,
+    is_loaded=lambda: chatterbox_service._model is not None,
+)
@@ -1,15 +1,156 @@
+from collections import deque
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterator, Literal
+import codecs
+import csv
+import os
+import random
+import re
+import signal
 import subprocess
-import torch
-from backend.core import settings
+import threading
+import time
+import uuid
+from backend.core import (
+    settings,
+    job_scheduler,
+    result_cache,
+    model_manager,
+    resolve_device,
+    report_progress,
+    raise_if_cancelled,
+)
+from backend.core.devices import empty_cuda_cache
+from backend.core.gpu_arbiter import gpu_arbiter
+from backend.core.metrics import inference_seconds, video_gpu_seconds, videos_generated, videos_promoted
+from backend.core.tracing import timed_span
+from backend.utils.ffmpeg import FFmpegError, media_runner
+from backend.utils.hashing import file_sha256
+from backend.services.opensora_worker import OpenSoraWorkerClient
 
 DEMO_MODE = True
 
+MODEL_FOOTPRINTS_MB = {"256px": 40000, "768px": 80000}
+DEFAULT_NUM_STEPS = 50
+DEFAULT_GUIDANCE_SCALE = 7.5
+
+Quality = Literal["draft", "full"]
+DEMO_SECONDS = 2.0
+STDERR_TAIL_LINES = 200
+TQDM_STEP_PATTERN = re.compile(r"(\d+)/(\d+) \[")
+
+
+def create_demo_video(output_path: Path, prompt: str) -> None:
+    cmd = [
+        "ffmpeg", "-y",
+        "-f", "lavfi",
+        "-i", f"color=c=blue:s=256x256:d=3",
+        "-vf", f"drawtext=text='{prompt[:30]}...':fontsize=20:fontcolor=white:x=(w-text_w)/2:y=(h-text_h)/2",
+        "-c:v", "libx264",
+        "-t", "3",
+        str(output_path),
+    ]
+
+    try:
+        media_runner.run_sync(cmd, timeout=settings.ffmpeg_timeout_seconds)
+    except FFmpegError:
+        cmd_simple = [
+            "ffmpeg", "-y",
+            "-f", "lavfi",
+            "-i", "color=c=blue:s=256x256:d=3",
+            "-c:v", "libx264",
+            "-t", "3",
+            str(output_path),
+        ]
+        media_runner.run_sync(cmd_simple, timeout=settings.ffmpeg_timeout_seconds, check=False)
+
+
+def report_denoising_step(step: int, total: int) -> None:
+    if total:
+        report_progress(step / total, f"denoising step {step}/{total}")
+    raise_if_cancelled()
+    gpu_arbiter.checkpoint(settings.opensora_device)
+
+
+@contextmanager
+def suspended(process: subprocess.Popen) -> Iterator[None]:
+    if not hasattr(os, "killpg"):
+        yield
+        return
+    os.killpg(process.pid, signal.SIGSTOP)
+    try:
+        yield
+    finally:
+        os.killpg(process.pid, signal.SIGCONT)
+
+
+def _demo_denoise(num_steps: int) -> None:
+    steps = max(1, min(num_steps, 20))
+    for step in range(1, steps + 1):
+        time.sleep(DEMO_SECONDS / steps)
+        report_denoising_step(step, steps)
+
+
+def run_inference(cmd: list[str], cwd: Path, env: dict[str, str]) -> tuple[int, str]:
+    process = subprocess.Popen(
+        cmd,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        cwd=cwd,
+        env=env,
+        start_new_session=True,
+    )
+    tail: deque[str] = deque(maxlen=STDERR_TAIL_LINES)
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    last_step: list[tuple[str, ...] | None] = [None]
+
+    def parse_step(line: str) -> None:
+        match = TQDM_STEP_PATTERN.search(line)
+        if match is None or match.groups() == last_step[0]:
+            return
+        last_step[0] = match.groups()
+        pause = gpu_arbiter.should_yield(settings.opensora_device)
+        with suspended(process) if pause else nullcontext():
+            report_denoising_step(int(match.group(1)), int(match.group(2)))
+
+    def handle(line: str) -> None:
+        if line.strip():
+            tail.append(line)
+            parse_step(line)
+
+    pending = ""
+    fd = process.stderr.fileno()
+    try:
+        while chunk := os.read(fd, 4096):
+            pending += decoder.decode(chunk)
+            *lines, pending = re.split(r"[\r\n]", pending)
+            for line in lines:
+                handle(line)
+            parse_step(pending)
+        handle(pending + decoder.decode(b"", final=True))
+    except BaseException:
+        if hasattr(os, "killpg"):
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+        process.wait()
+        raise
+    finally:
+        process.stderr.close()
+    return process.wait(), "\n".join(tail)
+
+
+def _natural_key(path: Path) -> list[int | str]:
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", path.name)]
+
 
 class OpenSoraService:
     _instance: "OpenSoraService | None" = None
     _initialized: bool = False
+    _worker: OpenSoraWorkerClient | None = None
+    _worker_lock = threading.Lock()
 
     def __new__(cls) -> "OpenSoraService":
         if cls._instance is None:
@@ -44,19 +185,340 @@ class OpenSoraService:
         resolution: str | None = None,
         num_frames: int | None = None,
         seed: int | None = None,
-        num_steps: int = 50,
-        guidance_scale: float = 7.5,
+        num_steps: int = DEFAULT_NUM_STEPS,
+        guidance_scale: float = DEFAULT_GUIDANCE_SCALE,
         reference_image: str | Path | None = None,
+        use_cache: bool = True,
+        quality: Quality = "full",
     ) -> dict[str, Any]:
         output_dir = Path(output_dir)
         output_dir.mkdir(parents=True, exist_ok=True)
 
         resolution = resolution or settings.opensora_resolution
         num_frames = num_frames or settings.opensora_num_frames
+        params = {
+            "seed": seed,
+            "num_steps": num_steps,
+            "guidance_scale": guidance_scale,
+            "reference_image": str(reference_image) if reference_image else None,
+            "quality": quality,
+        }
+
+        cache_key = None
+        if use_cache:
+            cache_key = self._cache_key(
+                prompt, resolution, num_frames, seed, num_steps, guidance_scale, reference_image
+            )
+            cached = self._cached_result(cache_key, output_dir)
+            if cached is not None:
+                return {**cached, **params, "cached": True}
+
+        started = time.perf_counter()
+        with timed_span("opensora.generate", inference_seconds, model="opensora", operation="generate"):
+            result = self._generate_video(
+                prompt, output_dir, resolution, num_frames, seed, num_steps, guidance_scale, reference_image
+            )
+        video_gpu_seconds.inc(time.perf_counter() - started, quality=quality)
+        videos_generated.inc(quality=quality)
+        self._store_result(cache_key, result)
+        return {**result, **params, "cached": False}
+
+    def generate_draft(
+        self,
+        prompt: str,
+        output_dir: str | Path,
+        resolution: str | None = None,
+        num_frames: int | None = None,
+        seed: int | None = None,
+        num_steps: int | None = None,
+        guidance_scale: float = DEFAULT_GUIDANCE_SCALE,
+        reference_image: str | Path | None = None,
+        use_cache: bool = True,
+    ) -> dict[str, Any]:
+        return self.generate_video(
+            prompt=prompt,
+            output_dir=output_dir,
+            resolution=resolution or settings.opensora_draft_resolution,
+            num_frames=num_frames or settings.opensora_draft_num_frames,
+            seed=seed if seed is not None else random.randrange(2**31),
+            num_steps=num_steps or settings.opensora_draft_num_steps,
+            guidance_scale=guidance_scale,
+            reference_image=reference_image,
+            use_cache=use_cache,
+            quality="draft",
+        )
+
+    def promote(
+        self,
+        draft: dict[str, Any],
+        output_dir: str | Path,
+        resolution: str | None = None,
+        num_frames: int | None = None,
+        num_steps: int | None = None,
+        use_cache: bool = True,
+    ) -> dict[str, Any]:
+        result = self.generate_video(
+            prompt=draft["prompt"],
+            output_dir=output_dir,
+            resolution=resolution,
+            num_frames=num_frames,
+            seed=draft["seed"],
+            num_steps=num_steps or DEFAULT_NUM_STEPS,
+            guidance_scale=draft.get("guidance_scale", DEFAULT_GUIDANCE_SCALE),
+            reference_image=draft.get("reference_image"),
+            use_cache=use_cache,
+        )
+        videos_promoted.inc()
+        return {**result, "draft_video_path": draft["video_path"]}
+
+    def generation_stats(self) -> dict[str, Any]:
+        tiers = {
+            quality: {
+                "rendered": int(videos_generated.value(quality=quality)),
+                "gpu_seconds": round(video_gpu_seconds.value(quality=quality), 3),
+            }
+            for quality in ("draft", "full")
+        }
+        gpu_hours = sum(video_gpu_seconds.value(quality=quality) for quality in tiers) / 3600
+        accepted = tiers["full"]["rendered"]
+        return {
+            **tiers,
+            "promoted": int(videos_promoted.value()),
+            "accepted": accepted,
+            "accepted_per_gpu_hour": round(accepted / gpu_hours, 2) if gpu_hours else None,
+        }
+
+    def _cache_key(
+        self,
+        prompt: str,
+        resolution: str,
+        num_frames: int,
+        seed: int | None,
+        num_steps: int,
+        guidance_scale: float,
+        reference_image: str | Path | None = None,
+        operation: str = "opensora.generate_video",
+    ) -> str | None:
+        if seed is None or not result_cache.enabled:
+            return None
+        return result_cache.key(
+            operation,
+            prompt=prompt,
+            resolution=resolution,
+            num_frames=num_frames,
+            seed=seed,
+            num_steps=num_steps,
+            guidance_scale=guidance_scale,
+            reference_image=file_sha256(reference_image) if reference_image else None,
+            model="demo" if DEMO_MODE else settings.opensora_model_path.name,
+        )
+
+    def _cached_result(self, cache_key: str | None, output_dir: Path) -> dict[str, Any] | None:
+        entry = result_cache.get(cache_key, restore=True) if cache_key else None
+        if entry is None:
+            return None
+        video_path = entry.materialize("video.mp4", output_dir / entry.meta["video_name"])
+        if video_path is None:
+            return None
+        return {**entry.meta["result"], "video_path": str(video_path)}
+
+    def _store_result(self, cache_key: str | None, result: dict[str, Any]) -> None:
+        video_path = Path(result["video_path"])
+        if cache_key is not None and video_path.exists():
+            result_cache.put(
+                cache_key,
+                {"result": result, "video_name": video_path.name},
+                files={"video.mp4": video_path},
+            )
+
+    def generate_video_batch(
+        self,
+        items: list[dict[str, Any]],
+        output_dir: str | Path,
+        use_cache: bool = True,
+        on_item: Callable[[int, dict[str, Any]], None] | None = None,
+    ) -> dict[str, Any]:
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        normalized = [
+            {
+                "prompt": item["prompt"],
+                "seed": item.get("seed"),
+                "resolution": item.get("resolution") or settings.opensora_resolution,
+                "num_frames": item.get("num_frames") or settings.opensora_num_frames,
+                "num_steps": DEFAULT_NUM_STEPS if item.get("num_steps") is None else item["num_steps"],
+                "guidance_scale": (
+                    DEFAULT_GUIDANCE_SCALE if item.get("guidance_scale") is None else item["guidance_scale"]
+                ),
+                "output_dir": str(output_dir / f"{index:03d}"),
+            }
+            for index, item in enumerate(items)
+        ]
+        results: list[dict[str, Any] | None] = [None] * len(items)
+
+        def finish(index: int, result: dict[str, Any]) -> None:
+            results[index] = result
+            if on_item is not None:
+                on_item(index, result)
+
+        groups: dict[tuple[Any, ...], list[int]] = {}
+        cache_keys: dict[int, str | None] = {}
+        for index, params in enumerate(normalized):
+            cache_keys[index] = self._cache_key(
+                params["prompt"], params["resolution"], params["num_frames"],
+                params["seed"], params["num_steps"], params["guidance_scale"],
+                operation="opensora.generate_batch",
+            ) if use_cache else None
+            cached = self._cached_result(cache_keys[index], Path(params["output_dir"]))
+            if cached is not None:
+                finish(index, {"status": "completed", "cached": True, **cached})
+                continue
+            key = (
+                params["resolution"], params["num_frames"], params["num_steps"], params["guidance_scale"],
+                params["seed"],
+            )
+            groups.setdefault(key, []).append(index)
+
+        gpu_seconds = 0.0
+        batch_size = max(1, settings.opensora_batch_size)
+        for (resolution, *_), indices in groups.items():
+            for start in range(0, len(indices), batch_size):
+                chunk = indices[start:start + batch_size]
+                started = time.perf_counter()
+                try:
+                    with timed_span(
+                        "opensora.generate_batch", inference_seconds, model="opensora", operation="generate_batch"
+                    ):
+                        outputs = self._generate_batch([normalized[i] for i in chunk], resolution)
+                except Exception as e:
+                    gpu_seconds += time.perf_counter() - started
+                    video_gpu_seconds.inc(time.perf_counter() - started, quality="full")
+                    for index in chunk:
+                        finish(index, {"status": "failed", "prompt": normalized[index]["prompt"], "error": str(e)})
+                    continue
+                gpu_seconds += time.perf_counter() - started
+                video_gpu_seconds.inc(time.perf_counter() - started, quality="full")
+                videos_generated.inc(len(outputs), quality="full")
+
+                for index, output in zip(chunk, outputs):
+                    params = normalized[index]
+                    result = {
+                        "video_path": output["video_path"],
+                        "prompt": params["prompt"],
+                        "seed": params["seed"],
+                        "resolution": params["resolution"],
+                        "num_frames": params["num_frames"],
+                    }
+                    self._store_result(cache_keys[index], result)
+                    finish(index, {"status": "completed", "cached": False, **result})
+
+        generated = sum(1 for r in results if r and r["status"] == "completed" and not r["cached"])
+        return {
+            "items": results,
+            "completed": sum(1 for r in results if r and r["status"] == "completed"),
+            "failed": sum(1 for r in results if r and r["status"] == "failed"),
+            "batches": sum(-(-len(indices) // batch_size) for indices in groups.values()),
+            "gpu_seconds": round(gpu_seconds, 3),
+            "videos_per_gpu_hour": round(generated * 3600 / gpu_seconds, 2) if gpu_seconds else None,
+        }
+
+    def _generate_batch(self, items: list[dict[str, Any]], resolution: str) -> list[dict[str, Any]]:
+        if settings.opensora_worker_mode == "persistent":
+            model_manager.load("opensora")
+            return self.get_worker().generate_batch(
+                [{**params, "resolution": resolution} for params in items],
+                on_progress=report_denoising_step,
+            )
+
+        if DEMO_MODE:
+            _demo_denoise(items[0]["num_steps"])
+            outputs = []
+            for params in items:
+                video_dir = Path(params["output_dir"])
+                video_dir.mkdir(parents=True, exist_ok=True)
+                demo_video = video_dir / "demo_video.mp4"
+                self._create_demo_video(demo_video, params["prompt"])
+                outputs.append({"video_path": str(demo_video)})
+            return outputs
+
+        batch_dir = Path(items[0]["output_dir"]).parent / f"batch_{uuid.uuid4().hex[:8]}"
+        batch_dir.mkdir(parents=True, exist_ok=True)
+        prompt_file = batch_dir / "prompts.csv"
+        with open(prompt_file, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["text", "seed"])
+            for params in items:
+                writer.writerow([params["prompt"], params["seed"] if params["seed"] is not None else ""])
+
+        first = items[0]
+        cmd = [
+            "torchrun",
+            "--nproc_per_node", "1",
+            "--standalone",
+            "scripts/diffusion/inference.py",
+            f"configs/diffusion/inference/{resolution}.py",
+            "--save-dir", str(batch_dir),
+            "--dataset.data-path", str(prompt_file),
+            "--batch-size", str(len(items)),
+            "--num-frames", str(first["num_frames"]),
+            "--num-steps", str(first["num_steps"]),
+            "--guidance-scale", str(first["guidance_scale"]),
+        ]
+        if first["seed"] is not None:
+            cmd.extend(["--seed", str(first["seed"])])
+
+        returncode, stderr = run_inference(
+            cmd,
+            cwd=self._get_opensora_path(),
+            env={**subprocess.os.environ, "CUDA_VISIBLE_DEVICES": "0"},
+        )
+        if returncode != 0:
+            raise RuntimeError(f"Open-Sora batch generation failed: {stderr}")
+
+        video_files = sorted(batch_dir.rglob("*.mp4"), key=_natural_key)
+        if len(video_files) != len(items):
+            raise RuntimeError(f"Expected {len(items)} videos from batch, found {len(video_files)}")
+
+        outputs = []
+        for params, video_file in zip(items, video_files):
+            video_dir = Path(params["output_dir"])
+            video_dir.mkdir(parents=True, exist_ok=True)
+            outputs.append({"video_path": str(video_file.replace(video_dir / video_file.name))})
+        return outputs
+
+    def _generate_video(
+        self,
+        prompt: str,
+        output_dir: Path,
+        resolution: str,
+        num_frames: int,
+        seed: int | None,
+        num_steps: int,
+        guidance_scale: float,
+        reference_image: str | Path | None,
+    ) -> dict[str, Any]:
+        if settings.opensora_worker_mode == "persistent":
+            model_manager.load("opensora")
+            result = self.get_worker().generate({
+                "prompt": prompt,
+                "resolution": resolution,
+                "output_dir": str(output_dir),
+                "num_frames": num_frames,
+                "seed": seed,
+                "num_steps": num_steps,
+                "guidance_scale": guidance_scale,
+                "reference_image": str(reference_image) if reference_image else None,
+            }, on_progress=report_denoising_step)
+            return {
+                "video_path": result["video_path"],
+                "prompt": prompt,
+                "resolution": resolution,
+                "num_frames": num_frames,
+            }
 
         if DEMO_MODE:
-            import time
-            time.sleep(2)
+            _demo_denoise(num_steps)
 
             demo_video = output_dir / "demo_video.mp4"
             self._create_demo_video(demo_video, prompt)
@@ -98,16 +560,14 @@ class OpenSoraService:
             "CUDA_VISIBLE_DEVICES": "0",
         }
 
-        result = subprocess.run(
+        returncode, stderr = run_inference(
             cmd,
-            capture_output=True,
-            text=True,
             cwd=self._get_opensora_path(),
             env={**subprocess.os.environ, **env},
         )
 
-        if result.returncode != 0:
-            raise RuntimeError(f"Open-Sora generation failed: {result.stderr}")
+        if returncode != 0:
+            raise RuntimeError(f"Open-Sora generation failed: {stderr}")
 
         video_files = list(output_dir.glob("*.mp4"))
         if not video_files:
@@ -121,30 +581,36 @@ class OpenSoraService:
         }
 
     def _create_demo_video(self, output_path: Path, prompt: str) -> None:
-        import subprocess
-
-        cmd = [
-            "ffmpeg", "-y",
-            "-f", "lavfi",
-            "-i", f"color=c=blue:s=256x256:d=3",
-            "-vf", f"drawtext=text='{prompt[:30]}...':fontsize=20:fontcolor=white:x=(w-text_w)/2:y=(h-text_h)/2",
-            "-c:v", "libx264",
-            "-t", "3",
-            str(output_path),
-        ]
-
-        try:
-            subprocess.run(cmd, capture_output=True, check=True)
-        except Exception:
-            cmd_simple = [
-                "ffmpeg", "-y",
-                "-f", "lavfi",
-                "-i", "color=c=blue:s=256x256:d=3",
-                "-c:v", "libx264",
-                "-t", "3",
-                str(output_path),
-            ]
-            subprocess.run(cmd_simple, capture_output=True)
+        create_demo_video(output_path, prompt)
+
+    def get_worker(self) -> OpenSoraWorkerClient:
+        with self._worker_lock:
+            if self._worker is None:
+                device = resolve_device(settings.opensora_device)
+                options: dict[str, Any] = {
+                    "cuda_visible_devices": device.split(":", 1)[1] if device.startswith("cuda:") else None,
+                    "cooperative_yield": settings.gpu_cooperative_yield,
+                }
+                if not DEMO_MODE:
+                    options.update(
+                        repo_path=str(self._get_opensora_path()),
+                        config_path=self._get_config_path(),
+                        model_path=str(self._get_model_path()),
+                    )
+                OpenSoraService._worker = OpenSoraWorkerClient(
+                    backend="demo" if DEMO_MODE else "opensora",
+                    options=options,
+                    startup_timeout=settings.opensora_worker_startup_timeout,
+                    health_interval=settings.opensora_worker_health_interval,
+                )
+            return self._worker
+
+    def worker_health(self) -> dict[str, Any]:
+        worker = self._worker
+        return {
+            "mode": settings.opensora_worker_mode,
+            "worker": worker.health() if worker is not None else None,
+        }
 
     def _get_opensora_path(self) -> Path:
         return settings.opensora_repo_path
@@ -163,6 +629,8 @@ class OpenSoraService:
                 "demo_mode": True,
             }
 
+        import torch
+
         if not torch.cuda.is_available():
             return {
                 "available": False,
@@ -183,8 +651,41 @@ class OpenSoraService:
             "resolution": settings.opensora_resolution,
         }
 
+    def load(self) -> None:
+        if settings.opensora_worker_mode == "persistent":
+            self.get_worker().start()
+
+    def warmup(self) -> None:
+        if not self._check_installation():
+            raise RuntimeError("Open-Sora is not installed")
+        if settings.opensora_worker_mode != "persistent":
+            return
+        with job_scheduler.model_slot("opensora"):
+            model_manager.load("opensora")
+            if not self.get_worker().health()["responsive"]:
+                raise RuntimeError("Open-Sora worker is not responding")
+
+    def is_loaded(self) -> bool:
+        worker = self._worker
+        return worker is not None and worker.is_alive()
+
     def unload(self) -> None:
-        torch.cuda.empty_cache()
+        with self._worker_lock:
+            worker, OpenSoraService._worker = self._worker, None
+        if worker is not None:
+            worker.stop()
+        empty_cuda_cache()
 
 
 opensora_service = OpenSoraService()
+model_manager.register(
+    "opensora",
+    device=settings.opensora_device,
+    footprint_mb=max(
+        MODEL_FOOTPRINTS_MB[settings.opensora_resolution],
+        MODEL_FOOTPRINTS_MB.get(settings.opensora_draft_resolution, 0),
+    ),
+    load=opensora_service.load,
+    unload=opensora_service.unload,
+    is_loaded=opensora_service.is_loaded,
+)
@@ -0,0 +1,449 @@
+from multiprocessing.connection import Connection
+from pathlib import Path
+from typing import Any, Callable
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import uuid
+
+
+ProgressFn = Callable[[int, int], None]
+
+
+class WorkerCrashedError(RuntimeError):
+    pass
+
+
+class JobCancelledError(RuntimeError):
+    pass
+
+
+class DemoInferenceBackend:
+    def __init__(self, progress: ProgressFn | None = None, **options: Any) -> None:
+        self.progress = progress
+        self.options = options
+
+    def generate(self, params: dict[str, Any]) -> dict[str, Any]:
+        from backend.services.opensora_service import create_demo_video
+
+        steps = params.get("num_steps") or 0
+        for step in range(1, steps + 1):
+            if self.progress is not None:
+                self.progress(step, steps)
+        output_dir = Path(params["output_dir"])
+        output_dir.mkdir(parents=True, exist_ok=True)
+        video_path = output_dir / "demo_video.mp4"
+        create_demo_video(video_path, params["prompt"])
+        return {"video_path": str(video_path)}
+
+    def generate_batch(self, items: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        return [self.generate(params) for params in items]
+
+
+class OpenSoraInferenceBackend:
+    def __init__(
+        self,
+        repo_path: str,
+        config_path: str,
+        model_path: str,
+        progress: ProgressFn | None = None,
+        **options: Any,
+    ) -> None:
+        os.chdir(repo_path)
+        sys.path.insert(0, repo_path)
+        os.environ.setdefault("MASTER_ADDR", "127.0.0.1")
+        os.environ.setdefault("MASTER_PORT", str(29500 + os.getpid() % 1000))
+        os.environ.setdefault("RANK", "0")
+        os.environ.setdefault("LOCAL_RANK", "0")
+        os.environ.setdefault("WORLD_SIZE", "1")
+
+        import torch
+        import torch.distributed as dist
+        from mmengine.config import Config
+        from opensora.utils.sampling import prepare_api, prepare_models
+
+        if not dist.is_initialized():
+            dist.init_process_group(backend="nccl" if torch.cuda.is_available() else "gloo")
+
+        self.torch = torch
+        self.config_cls = Config
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.dtype = torch.bfloat16
+        self.cfg = Config.fromfile(config_path)
+        self.cfg.model_path = model_path
+        self._resolution_options: dict[str, Any] = {}
+
+        with torch.inference_mode():
+            model, model_ae, model_t5, model_clip, optional_models = prepare_models(
+                self.cfg, self.device, self.dtype, offload_model=self.cfg.get("offload_model", False)
+            )
+        self.api_fn = prepare_api(model, model_ae, model_t5, model_clip, optional_models)
+
+    def _base_sampling_option(self, resolution: str | None) -> Any:
+        if resolution is None:
+            return self.cfg.sampling_option
+        if resolution not in self._resolution_options:
+            config = self.config_cls.fromfile(f"configs/diffusion/inference/{resolution}.py")
+            self._resolution_options[resolution] = config.sampling_option
+        return self._resolution_options[resolution]
+
+    def _sampling_option(self, params: dict[str, Any]) -> Any:
+        from opensora.utils.sampling import SamplingOption, sanitize_sampling_option
+
+        return sanitize_sampling_option(SamplingOption(**{
+            **self._base_sampling_option(params.get("resolution")),
+            "num_frames": params["num_frames"],
+            "num_steps": params["num_steps"],
+            "guidance": params["guidance_scale"],
+            "seed": params.get("seed"),
+        }))
+
+    def _sample(self, items: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        from opensora.datasets.utils import save_sample
+
+        first = items[0]
+        sampling_option = self._sampling_option(first)
+        cond_type = "i2v_head" if first.get("reference_image") else "t2v"
+        with self.torch.inference_mode():
+            samples = self.api_fn(
+                sampling_option,
+                cond_type,
+                seed=sampling_option.seed,
+                patch_size=self.cfg.get("patch_size", 2),
+                text=[params["prompt"] for params in items],
+                ref=[params["reference_image"] for params in items] if first.get("reference_image") else None,
+            )
+
+        results = []
+        for sample, params in zip(samples, items):
+            output_dir = Path(params["output_dir"])
+            output_dir.mkdir(parents=True, exist_ok=True)
+            save_path = save_sample(
+                sample,
+                save_path=str(output_dir / f"sample_{uuid.uuid4().hex[:8]}"),
+                fps=self.cfg.get("fps_save", 24),
+            )
+            results.append({"video_path": str(save_path)})
+        return results
+
+    def generate(self, params: dict[str, Any]) -> dict[str, Any]:
+        return self._sample([params])[0]
+
+    def generate_batch(self, items: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        groups: dict[Any, list[int]] = {}
+        for index, params in enumerate(items):
+            key = (params.get("resolution"), params.get("seed"), bool(params.get("reference_image")))
+            groups.setdefault(key, []).append(index)
+
+        results: list[dict[str, Any]] = [{} for _ in items]
+        for indices in groups.values():
+            for index, result in zip(indices, self._sample([items[i] for i in indices])):
+                results[index] = result
+        return results
+
+
+BACKENDS = {
+    "demo": DemoInferenceBackend,
+    "opensora": OpenSoraInferenceBackend,
+}
+
+
+def _wait_for_resume(conn: Connection, job_id: str) -> None:
+    while True:
+        message = conn.recv()
+        if message["type"] == "resume" and message.get("id") == job_id:
+            return
+        if message["type"] == "cancel" and message.get("id") == job_id:
+            raise JobCancelledError(f"Job {job_id} was cancelled")
+        if message["type"] == "ping":
+            conn.send({"type": "pong", "id": message.get("id")})
+        elif message["type"] == "shutdown":
+            raise SystemExit(0)
+
+
+def _progress_reporter(conn: Connection, current_job: list[str | None], cooperative_yield: bool = False) -> ProgressFn:
+    def report(step: int, total: int) -> None:
+        job_id = current_job[0]
+        if job_id is None or not total:
+            return
+        conn.send({
+            "type": "progress",
+            "id": job_id,
+            "step": step,
+            "total": total,
+            "await_resume": cooperative_yield,
+        })
+        if cooperative_yield:
+            _wait_for_resume(conn, job_id)
+
+    return report
+
+
+def _install_progress_hook(report: ProgressFn) -> None:
+    try:
+        import tqdm
+    except ImportError:
+        return
+    original_update = tqdm.std.tqdm.update
+
+    def update(bar: Any, n: float = 1) -> Any:
+        result = original_update(bar, n)
+        if bar.total:
+            report(int(bar.n), int(bar.total))
+        return result
+
+    tqdm.std.tqdm.update = update
+
+
+def worker_main(conn: Connection, backend_name: str, options: dict[str, Any]) -> None:
+    if options.get("cuda_visible_devices") is not None:
+        os.environ["CUDA_VISIBLE_DEVICES"] = options["cuda_visible_devices"]
+    current_job: list[str | None] = [None]
+    report = _progress_reporter(conn, current_job, bool(options.get("cooperative_yield")))
+    _install_progress_hook(report)
+
+    try:
+        backend = BACKENDS[backend_name](progress=report, **options)
+    except Exception as e:
+        conn.send({"type": "failed", "error": f"{type(e).__name__}: {e}"})
+        return
+
+    conn.send({"type": "ready", "pid": os.getpid()})
+
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            return
+
+        if message["type"] == "ping":
+            conn.send({"type": "pong", "id": message.get("id")})
+        elif message["type"] == "shutdown":
+            return
+        elif message["type"] in ("generate", "generate_batch"):
+            current_job[0] = message["id"]
+            try:
+                if message["type"] == "generate_batch":
+                    result = backend.generate_batch(message["params"])
+                else:
+                    result = backend.generate(message["params"])
+                conn.send({"type": "result", "id": message["id"], "result": result})
+            except Exception as e:
+                conn.send({"type": "error", "id": message["id"], "error": f"{type(e).__name__}: {e}"})
+            finally:
+                current_job[0] = None
+
+
+class OpenSoraWorkerClient:
+    def __init__(
+        self,
+        backend: str,
+        options: dict[str, Any] | None = None,
+        startup_timeout: float = 600.0,
+        ping_timeout: float = 5.0,
+        health_interval: float = 30.0,
+    ) -> None:
+        self.backend = backend
+        self.options = options or {}
+        self.startup_timeout = startup_timeout
+        self.ping_timeout = ping_timeout
+        self.health_interval = health_interval
+        self.restarts = 0
+        self.jobs_served = 0
+        self.load_seconds: float | None = None
+        self._process: multiprocessing.Process | None = None
+        self._conn: Connection | None = None
+        self._lock = threading.Lock()
+        self._monitor: threading.Thread | None = None
+        self._stopping = threading.Event()
+
+    @property
+    def pid(self) -> int | None:
+        return self._process.pid if self._process else None
+
+    def is_alive(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    def _spawn(self) -> None:
+        context = multiprocessing.get_context("spawn")
+        parent_conn, child_conn = context.Pipe()
+        process = context.Process(
+            target=worker_main,
+            args=(child_conn, self.backend, self.options),
+            name=f"opensora-worker-{self.backend}",
+            daemon=True,
+        )
+        started = time.perf_counter()
+        process.start()
+        child_conn.close()
+
+        if not parent_conn.poll(self.startup_timeout):
+            process.kill()
+            raise WorkerCrashedError("Open-Sora worker did not become ready in time")
+        try:
+            message = parent_conn.recv()
+        except EOFError:
+            process.join(1)
+            raise WorkerCrashedError(f"Open-Sora worker exited during startup (code {process.exitcode})")
+        if message["type"] != "ready":
+            process.join(1)
+            raise WorkerCrashedError(f"Open-Sora worker failed to start: {message.get('error')}")
+
+        self.load_seconds = time.perf_counter() - started
+        self._process = process
+        self._conn = parent_conn
+
+    def _terminate(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        if self._process is not None:
+            if self._process.is_alive():
+                self._process.kill()
+            self._process.join(5)
+            self._process = None
+
+    def _ping(self) -> bool:
+        ping_id = uuid.uuid4().hex
+        deadline = time.monotonic() + self.ping_timeout
+        try:
+            self._conn.send({"type": "ping", "id": ping_id})
+            while (remaining := deadline - time.monotonic()) > 0 and self._conn.poll(remaining):
+                message = self._conn.recv()
+                if message["type"] == "pong" and message.get("id") == ping_id:
+                    return True
+            return False
+        except (EOFError, OSError):
+            return False
+
+    def _ensure_running(self) -> None:
+        if self.is_alive() and self._ping():
+            return
+        if self.load_seconds is not None:
+            self.restarts += 1
+        self._terminate()
+        self._spawn()
+        self._start_monitor()
+
+    def start(self) -> None:
+        with self._lock:
+            self._ensure_running()
+
+    def generate(
+        self,
+        params: dict[str, Any],
+        timeout: float | None = None,
+        on_progress: ProgressFn | None = None,
+    ) -> dict[str, Any]:
+        return self._request("generate", params, timeout, on_progress)
+
+    def generate_batch(
+        self,
+        items: list[dict[str, Any]],
+        timeout: float | None = None,
+        on_progress: ProgressFn | None = None,
+    ) -> list[dict[str, Any]]:
+        return self._request("generate_batch", items, timeout, on_progress, jobs=len(items))
+
+    def _request(
+        self,
+        message_type: str,
+        params: Any,
+        timeout: float | None,
+        on_progress: ProgressFn | None = None,
+        jobs: int = 1,
+    ) -> Any:
+        with self._lock:
+            self._ensure_running()
+            job_id = uuid.uuid4().hex
+            self._conn.send({"type": message_type, "id": job_id, "params": params})
+
+            deadline = time.monotonic() + timeout if timeout else None
+            while True:
+                remaining = deadline - time.monotonic() if deadline else 1.0
+                if remaining <= 0:
+                    self._terminate()
+                    raise TimeoutError("Open-Sora worker timed out")
+                try:
+                    if not self._conn.poll(min(remaining, 1.0)):
+                        if not self.is_alive():
+                            raise EOFError
+                        continue
+                    message = self._conn.recv()
+                except (EOFError, OSError):
+                    self._terminate()
+                    raise WorkerCrashedError("Open-Sora worker crashed during generation")
+
+                if message.get("id") != job_id:
+                    continue
+                if message["type"] == "progress":
+                    reply = "resume"
+                    try:
+                        if on_progress is not None:
+                            on_progress(message["step"], message["total"])
+                    except BaseException:
+                        reply = "cancel"
+                        raise
+                    finally:
+                        if message.get("await_resume"):
+                            self._conn.send({"type": reply, "id": job_id})
+                    continue
+                if message["type"] == "error":
+                    raise RuntimeError(f"Open-Sora generation failed: {message['error']}")
+                self.jobs_served += jobs
+                return message["result"]
+
+    def health(self) -> dict[str, Any]:
+        alive = self.is_alive()
+        responsive = False
+        busy = False
+        if alive:
+            if self._lock.acquire(timeout=self.ping_timeout):
+                try:
+                    responsive = self._ping()
+                finally:
+                    self._lock.release()
+            else:
+                busy = True
+        return {
+            "backend": self.backend,
+            "alive": alive,
+            "responsive": responsive,
+            "busy": busy,
+            "pid": self.pid,
+            "restarts": self.restarts,
+            "jobs_served": self.jobs_served,
+            "load_seconds": self.load_seconds,
+        }
+
+    def _start_monitor(self) -> None:
+        if self._monitor is not None and self._monitor.is_alive():
+            return
+        self._stopping.clear()
+        self._monitor = threading.Thread(target=self._watch, name="opensora-worker-monitor", daemon=True)
+        self._monitor.start()
+
+    def _watch(self) -> None:
+        while not self._stopping.wait(self.health_interval):
+            if not self._lock.acquire(blocking=False):
+                continue
+            try:
+                if self.load_seconds is not None:
+                    self._ensure_running()
+            except WorkerCrashedError:
+                pass
+            finally:
+                self._lock.release()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._conn.send({"type": "shutdown"})
+                except (EOFError, OSError):
+                    pass
+            self._terminate()
+            self.load_seconds = None
@@ -0,0 +1,147 @@
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable
+import json
+import re
+import shutil
+import threading
+import time
+from backend.core import settings
+
+META_FILE = "meta.json"
+CONDITIONALS_FILE = "conds.pt"
+PROFILE_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+@dataclass
+class VoiceProfile:
+    profile_id: str
+    name: str | None
+    model: str
+    reference_sha256: str
+    created_at: float
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class VoiceProfileRegistry:
+    def __init__(self, root: str | Path, max_loaded: int = 16) -> None:
+        self.root = Path(root)
+        self.max_loaded = max_loaded
+        self.hits = 0
+        self.misses = 0
+        self._loaded: OrderedDict[str, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def profile_id(model: str, reference_sha256: str) -> str:
+        return f"{model}-{reference_sha256[:16]}"
+
+    def path(self, profile_id: str) -> Path:
+        return self.root / profile_id
+
+    def conditionals_path(self, profile_id: str) -> Path:
+        return self.path(profile_id) / CONDITIONALS_FILE
+
+    def get(self, profile_id: str) -> VoiceProfile | None:
+        if not PROFILE_ID_PATTERN.match(profile_id):
+            return None
+        meta = self.path(profile_id) / META_FILE
+        if not meta.is_file():
+            return None
+        return VoiceProfile(**json.loads(meta.read_text()))
+
+    def list_profiles(self) -> list[VoiceProfile]:
+        profiles = [VoiceProfile(**json.loads(meta.read_text())) for meta in self.root.glob(f"*/{META_FILE}")]
+        return sorted(profiles, key=lambda profile: profile.created_at)
+
+    def create(
+        self,
+        model: str,
+        reference_sha256: str,
+        name: str | None,
+        save_conditionals: Callable[[Path], Any] | None,
+    ) -> VoiceProfile:
+        profile = VoiceProfile(
+            profile_id=self.profile_id(model, reference_sha256),
+            name=name,
+            model=model,
+            reference_sha256=reference_sha256,
+            created_at=time.time(),
+        )
+        staging = self.root / f".{profile.profile_id}.tmp"
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir(parents=True)
+        conds = save_conditionals(staging / CONDITIONALS_FILE) if save_conditionals else None
+        (staging / META_FILE).write_text(json.dumps(profile.to_dict()))
+
+        destination = self.path(profile.profile_id)
+        shutil.rmtree(destination, ignore_errors=True)
+        staging.rename(destination)
+        if conds is not None:
+            self._remember(profile.profile_id, conds)
+        return profile
+
+    def rename(self, profile_id: str, name: str | None) -> VoiceProfile:
+        profile = self.get(profile_id)
+        if profile is None:
+            raise KeyError(profile_id)
+        profile.name = name
+        meta = self.path(profile_id) / META_FILE
+        staging = meta.with_suffix(".tmp")
+        staging.write_text(json.dumps(profile.to_dict()))
+        staging.replace(meta)
+        return profile
+
+    def conditionals(self, profile_id: str, load: Callable[[Path], Any]) -> Any:
+        with self._lock:
+            conds = self._loaded.get(profile_id)
+            if conds is not None:
+                self.hits += 1
+                self._loaded.move_to_end(profile_id)
+                return conds
+            self.misses += 1
+
+        path = self.conditionals_path(profile_id)
+        if not path.is_file():
+            raise KeyError(profile_id)
+        conds = load(path)
+        self._remember(profile_id, conds)
+        return conds
+
+    def _remember(self, profile_id: str, conds: Any) -> None:
+        with self._lock:
+            self._loaded[profile_id] = conds
+            self._loaded.move_to_end(profile_id)
+            while len(self._loaded) > self.max_loaded:
+                self._loaded.popitem(last=False)
+
+    def delete(self, profile_id: str) -> bool:
+        with self._lock:
+            self._loaded.pop(profile_id, None)
+        path = self.path(profile_id)
+        if not PROFILE_ID_PATTERN.match(profile_id) or not path.is_dir():
+            return False
+        shutil.rmtree(path)
+        return True
+
+    def evict_loaded(self) -> None:
+        with self._lock:
+            self._loaded.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "loaded": len(self._loaded),
+                "max_loaded": self.max_loaded,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+voice_profiles = VoiceProfileRegistry(
+    settings.voice_profile_dir or settings.model_cache_dir / "voices",
+    settings.voice_profile_cache_size,
+)
@@ -0,0 +1,63 @@
+from typing import Any, Callable, Iterable
+import threading
+import time
+from backend.services.whisper_service import whisper_service
+from backend.services.chatterbox_service import chatterbox_service
+from backend.services.opensora_service import opensora_service
+
+WARMUPS: dict[str, Callable[[], None]] = {
+    "whisper": whisper_service.warmup,
+    "chatterbox": chatterbox_service.warmup,
+    "opensora": opensora_service.warmup,
+}
+
+
+class WarmupState:
+    def __init__(self) -> None:
+        self.started = False
+        self.finished = False
+        self.models: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        with self._lock:
+            return self.finished and all(m["status"] == "ready" for m in self.models.values())
+
+    def run(self, models: Iterable[str]) -> bool:
+        models = list(dict.fromkeys(models))
+        with self._lock:
+            self.started = True
+            self.finished = False
+            self.models = {name: {"status": "pending", "seconds": None, "error": None} for name in models}
+
+        for name in models:
+            with self._lock:
+                self.models[name]["status"] = "warming"
+            started = time.perf_counter()
+            try:
+                WARMUPS[name]()
+                status, error = "ready", None
+            except Exception as e:
+                status, error = "failed", f"{type(e).__name__}: {e}"
+            with self._lock:
+                self.models[name] = {
+                    "status": status,
+                    "seconds": round(time.perf_counter() - started, 3),
+                    "error": error,
+                }
+
+        with self._lock:
+            self.finished = True
+        return self.ready
+
+    def snapshot(self) -> dict[str, Any]:
+        ready = self.ready
+        with self._lock:
+            return {
+                "status": "ready" if ready else ("failed" if self.finished else "warming"),
+                "models": {name: dict(info) for name, info in self.models.items()},
+            }
+
+
+warmup_state = WarmupState()
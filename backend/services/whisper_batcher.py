@@ -0,0 +1,198 @@
+from collections import Counter, deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable
+import threading
+import time
+import numpy as np
+
+SAMPLE_RATE = 16000
+WINDOW_SECONDS = 30
+WINDOW_SAMPLES = SAMPLE_RATE * WINDOW_SECONDS
+
+DecodeFn = Callable[[list[np.ndarray], str | None, str], list[tuple[str, str | None]]]
+
+
+def split_windows(audio: np.ndarray) -> list[np.ndarray]:
+    if len(audio) == 0:
+        return [np.zeros(WINDOW_SAMPLES, dtype=np.float32)]
+    return [audio[start:start + WINDOW_SAMPLES] for start in range(0, len(audio), WINDOW_SAMPLES)]
+
+
+def pad_or_trim(window: np.ndarray) -> np.ndarray:
+    if len(window) >= WINDOW_SAMPLES:
+        return window[:WINDOW_SAMPLES]
+    return np.pad(window, (0, WINDOW_SAMPLES - len(window)))
+
+
+@dataclass(eq=False)
+class _BatchRequest:
+    windows: list[np.ndarray]
+    duration: float
+    language: str | None
+    task: str
+    future: Future = field(default_factory=Future)
+    enqueued_at: float = field(default_factory=time.perf_counter)
+    results: list[tuple[str, str | None]] = field(default_factory=list)
+
+    @property
+    def key(self) -> tuple[str | None, str]:
+        return self.language, self.task
+
+
+class WhisperBatcher:
+    def __init__(
+        self,
+        decode_fn: DecodeFn,
+        max_batch_size: int = 8,
+        window_ms: float = 50.0,
+        history_size: int = 1000,
+    ) -> None:
+        self.decode_fn = decode_fn
+        self.max_batch_size = max_batch_size
+        self.window_ms = window_ms
+        self._pending: deque[_BatchRequest] = deque()
+        self._condition = threading.Condition()
+        self._worker: threading.Thread | None = None
+        self._batch_sizes: Counter[int] = Counter()
+        self._latencies: deque[float] = deque(maxlen=history_size)
+        self._queue_waits: deque[float] = deque(maxlen=history_size)
+        self._requests = 0
+
+    def _ensure_started(self) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="whisper-batcher", daemon=True)
+            self._worker.start()
+
+    def submit(self, audio: np.ndarray, language: str | None = None, task: str = "transcribe") -> Future:
+        request = _BatchRequest(
+            windows=split_windows(audio),
+            duration=len(audio) / SAMPLE_RATE,
+            language=language,
+            task=task,
+        )
+        with self._condition:
+            self._ensure_started()
+            self._pending.append(request)
+            self._condition.notify()
+        return request.future
+
+    def transcribe(
+        self,
+        audio: np.ndarray,
+        language: str | None = None,
+        task: str = "transcribe",
+        timeout: float | None = None,
+    ) -> dict[str, Any]:
+        return self.submit(audio, language, task).result(timeout=timeout)
+
+    def _collect(self) -> list[tuple[_BatchRequest, int]]:
+        with self._condition:
+            while not self._pending:
+                self._condition.wait()
+            deadline = time.perf_counter() + self.window_ms / 1000
+            while True:
+                queued_windows = sum(len(r.windows) - len(r.results) for r in self._pending)
+                remaining = deadline - time.perf_counter()
+                if queued_windows >= self.max_batch_size or remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+
+            key = self._pending[0].key
+            slots: list[tuple[_BatchRequest, int]] = []
+            for request in self._pending:
+                if request.key != key:
+                    continue
+                for index in range(len(request.results), len(request.windows)):
+                    if len(slots) == self.max_batch_size:
+                        break
+                    slots.append((request, index))
+                if len(slots) == self.max_batch_size:
+                    break
+            return slots
+
+    def _run(self) -> None:
+        while True:
+            slots = self._collect()
+            started = time.perf_counter()
+            request, _ = slots[0]
+            try:
+                decoded = self.decode_fn(
+                    [pad_or_trim(req.windows[index]) for req, index in slots],
+                    request.language,
+                    request.task,
+                )
+            except Exception as e:
+                self._fail({req for req, _ in slots}, e)
+                continue
+
+            finished = []
+            with self._condition:
+                self._batch_sizes[len(slots)] += 1
+                for (req, _), result in zip(slots, decoded):
+                    if not req.results:
+                        self._queue_waits.append(started - req.enqueued_at)
+                    req.results.append(result)
+                    if len(req.results) == len(req.windows) and req in self._pending:
+                        self._pending.remove(req)
+                        finished.append(req)
+
+            for req in finished:
+                self._requests += 1
+                self._latencies.append(time.perf_counter() - req.enqueued_at)
+                req.future.set_result(self._assemble(req))
+
+    def _fail(self, requests: set[_BatchRequest], error: Exception) -> None:
+        with self._condition:
+            for req in requests:
+                if req in self._pending:
+                    self._pending.remove(req)
+        for req in requests:
+            req.future.set_exception(error)
+
+    @staticmethod
+    def _assemble(request: _BatchRequest) -> dict[str, Any]:
+        segments = [
+            {
+                "id": index,
+                "start": float(index * WINDOW_SECONDS),
+                "end": float(min((index + 1) * WINDOW_SECONDS, request.duration)),
+                "text": text.strip(),
+            }
+            for index, (text, _) in enumerate(request.results)
+            if text.strip()
+        ]
+        return {
+            "text": " ".join(segment["text"] for segment in segments),
+            "language": request.results[0][1] if request.results else request.language,
+            "segments": segments,
+        }
+
+    @staticmethod
+    def _percentile(values: list[float], q: float) -> float | None:
+        if not values:
+            return None
+        return float(np.percentile(values, q))
+
+    def stats(self) -> dict[str, Any]:
+        with self._condition:
+            batch_sizes = dict(self._batch_sizes)
+            latencies = list(self._latencies)
+            waits = list(self._queue_waits)
+            pending = len(self._pending)
+
+        batches = sum(batch_sizes.values())
+        windows = sum(size * count for size, count in batch_sizes.items())
+        return {
+            "max_batch_size": self.max_batch_size,
+            "window_ms": self.window_ms,
+            "pending_requests": pending,
+            "requests": self._requests,
+            "batches": batches,
+            "batch_size_histogram": batch_sizes,
+            "mean_occupancy": windows / (batches * self.max_batch_size) if batches else 0.0,
+            "latency_p50_seconds": self._percentile(latencies, 50),
+            "latency_p95_seconds": self._percentile(latencies, 95),
+            "queue_wait_p50_seconds": self._percentile(waits, 50),
+            "queue_wait_p95_seconds": self._percentile(waits, 95),
+        }
@@ -1,14 +1,42 @@
 from pathlib import Path
+from types import SimpleNamespace
 from typing import Any
-import torch
-from backend.core import settings
+import importlib
+import numpy as np
+from backend.core import settings, job_scheduler, result_cache, model_manager, resolve_device, report_progress
+from backend.core.gpu_arbiter import gpu_arbiter
+from backend.core.devices import empty_cuda_cache
+from backend.core.metrics import inference_seconds, whisper_audio_seconds
+from backend.core.tracing import timed_span
+from backend.utils.hashing import file_sha256
+from backend.services.whisper_batcher import WhisperBatcher, SAMPLE_RATE
+from backend.services.whisper_stream import StreamingTranscriber
+from backend.services.whisper_vad import detect_speech, pack_speech, remap_segments
 
 DEMO_MODE = False
 
+MODEL_FOOTPRINTS_MB = {"tiny": 1000, "base": 1000, "small": 2000, "medium": 5000, "large": 10000, "turbo": 6000}
+
+
+def _install_progress_hook(transcribe_module: Any) -> None:
+    tqdm = transcribe_module.tqdm
+    if getattr(tqdm, "reports_job_progress", False):
+        return
+
+    class ProgressBar(tqdm.tqdm):
+        def update(self, n: float = 1) -> Any:
+            self.frames_done = getattr(self, "frames_done", 0) + n
+            if self.total:
+                report_progress(self.frames_done / self.total, "transcribing")
+            return super().update(n)
+
+    transcribe_module.tqdm = SimpleNamespace(tqdm=ProgressBar, reports_job_progress=True)
+
 
 class WhisperService:
     _instance: "WhisperService | None" = None
     _model = None
+    _batcher: WhisperBatcher | None = None
 
     def __new__(cls) -> "WhisperService":
         if cls._instance is None:
@@ -22,25 +50,117 @@ class WhisperService:
         if DEMO_MODE:
             return
         import whisper
+        _install_progress_hook(importlib.import_module("whisper.transcribe"))
         self._model = whisper.load_model(
             name=settings.whisper_model,
-            device=settings.whisper_device,
+            device=resolve_device(settings.whisper_device),
             download_root=str(settings.model_cache_dir / "whisper"),
         )
 
     @property
     def model(self):
         if self._model is None and not DEMO_MODE:
-            self._load_model()
+            model_manager.load("whisper")
         return self._model
 
+    @property
+    def batcher(self) -> WhisperBatcher:
+        if self._batcher is None:
+            self._batcher = WhisperBatcher(
+                decode_fn=self._decode_batch,
+                max_batch_size=settings.whisper_batch_size,
+                window_ms=settings.whisper_batch_window_ms,
+            )
+        return self._batcher
+
+    def load_audio(self, audio_path: str | Path) -> np.ndarray:
+        if DEMO_MODE:
+            import wave
+
+            try:
+                with wave.open(str(audio_path), "rb") as wav_file:
+                    frames = wav_file.getnframes()
+                    duration = frames / wav_file.getframerate()
+            except (wave.Error, EOFError, OSError):
+                duration = 2.0
+            return np.zeros(int(duration * SAMPLE_RATE), dtype=np.float32)
+
+        import whisper
+        return whisper.load_audio(str(audio_path))
+
+    def _decode_batch(
+        self,
+        windows: list[np.ndarray],
+        language: str | None,
+        task: str,
+    ) -> list[tuple[str, str | None]]:
+        if DEMO_MODE:
+            return [("This is a demo transcription.", language or "en") for _ in windows]
+
+        import torch
+        import whisper
+
+        with (
+            model_manager.use("whisper"),
+            gpu_arbiter.interactive(settings.whisper_device),
+            inference_seconds.time(model="whisper", operation="decode_batch"),
+        ):
+            mel = torch.stack([
+                whisper.log_mel_spectrogram(torch.from_numpy(window), n_mels=self.model.dims.n_mels)
+                for window in windows
+            ]).to(self.model.device)
+            options = whisper.DecodingOptions(
+                language=language,
+                task=task,
+                fp16=self.model.device.type == "cuda",
+                without_timestamps=True,
+            )
+            results = self.model.decode(mel, options)
+        return [(result.text, result.language) for result in results]
+
     def transcribe(
         self,
         audio_path: str | Path,
         language: str | None = None,
         task: str = "transcribe",
         word_timestamps: bool = True,
+        use_cache: bool = True,
+    ) -> dict[str, Any]:
+        cache_key = None
+        if use_cache and result_cache.enabled and Path(audio_path).is_file():
+            cache_key = result_cache.key(
+                "whisper.transcribe",
+                audio=file_sha256(audio_path),
+                model="demo" if DEMO_MODE else settings.whisper_model,
+                language=language,
+                task=task,
+                word_timestamps=word_timestamps,
+                vad=settings.whisper_vad,
+                batched=settings.whisper_batch_enabled,
+            )
+            entry = result_cache.get(cache_key)
+            if entry is not None:
+                return entry.meta["result"]
+
+        with timed_span("whisper.transcribe", inference_seconds, model="whisper", operation="transcribe"):
+            result = self._transcribe(audio_path, language, task, word_timestamps)
+        if cache_key is not None:
+            result_cache.put(cache_key, {"result": result})
+        return result
+
+    def _transcribe(
+        self,
+        audio_path: str | Path,
+        language: str | None,
+        task: str,
+        word_timestamps: bool,
     ) -> dict[str, Any]:
+        if settings.whisper_vad != "off" and not DEMO_MODE:
+            return self._transcribe_speech(self.load_audio(audio_path), language, task, word_timestamps)
+
+        if settings.whisper_batch_enabled:
+            return self.batcher.transcribe(self.load_audio(audio_path), language, task)
+
         if DEMO_MODE:
             return {
                 "text": "This is a demo transcription. Install Whisper models for real transcription.",
@@ -50,8 +170,43 @@ class WhisperService:
                 ],
             }
 
+        return self._run_model(str(audio_path), language, task, word_timestamps)
+
+    def _transcribe_speech(
+        self,
+        audio: np.ndarray,
+        language: str | None,
+        task: str,
+        word_timestamps: bool,
+    ) -> dict[str, Any]:
+        with timed_span("whisper.vad", backend=settings.whisper_vad):
+            regions = detect_speech(
+                audio,
+                settings.whisper_vad,
+                min_silence_ms=settings.whisper_vad_min_silence_ms,
+                pad_ms=settings.whisper_vad_pad_ms,
+            )
+        speech, timeline = pack_speech(audio, regions)
+        whisper_audio_seconds.inc(len(audio) / SAMPLE_RATE, kind="input")
+        whisper_audio_seconds.inc(timeline.speech_seconds, kind="speech")
+        if not regions:
+            return {"text": "", "language": language, "segments": []}
+
+        if settings.whisper_batch_enabled:
+            result = self.batcher.transcribe(speech, language, task)
+        else:
+            result = self._run_model(speech, language, task, word_timestamps)
+        return {**result, "segments": remap_segments(result["segments"], timeline)}
+
+    def _run_model(
+        self,
+        audio: str | np.ndarray,
+        language: str | None,
+        task: str,
+        word_timestamps: bool,
+    ) -> dict[str, Any]:
         result = self.model.transcribe(
-            str(audio_path),
+            audio,
             language=language,
             task=task,
             word_timestamps=word_timestamps,
@@ -71,6 +226,43 @@ class WhisperService:
             ],
         }
 
+    def transcribe_window(
+        self,
+        audio: np.ndarray,
+        language: str | None = None,
+        initial_prompt: str | None = None,
+    ) -> dict[str, Any]:
+        if DEMO_MODE:
+            return {
+                "language": language or "en",
+                "segments": [
+                    {"start": 0.0, "end": len(audio) / SAMPLE_RATE, "text": "This is a demo transcription."}
+                ],
+            }
+
+        with (
+            job_scheduler.model_slot("whisper"),
+            gpu_arbiter.interactive(settings.whisper_device),
+            timed_span("whisper.transcribe_window", inference_seconds, model="whisper", operation="transcribe_window"),
+        ):
+            return self.model.transcribe(
+                audio,
+                language=language,
+                initial_prompt=initial_prompt,
+                condition_on_previous_text=False,
+                verbose=None,
+            )
+
+    def warmup(self) -> None:
+        self.transcribe_window(np.zeros(SAMPLE_RATE, dtype=np.float32), language="en")
+
+    def streaming_transcriber(self, language: str | None = None) -> StreamingTranscriber:
+        return StreamingTranscriber(
+            self.transcribe_window,
+            window_seconds=settings.whisper_stream_window_seconds,
+            language=language,
+        )
+
     def detect_language(self, audio_path: str | Path) -> dict[str, float]:
         if DEMO_MODE:
             return {"en": 0.95, "es": 0.03, "fr": 0.02}
@@ -80,14 +272,23 @@ class WhisperService:
         audio = whisper.pad_or_trim(audio)
         mel = whisper.log_mel_spectrogram(audio, n_mels=self.model.dims.n_mels)
         mel = mel.to(self.model.device)
-        _, probs = self.model.detect_language(mel)
+        with timed_span("whisper.detect_language", inference_seconds, model="whisper", operation="detect_language"):
+            _, probs = self.model.detect_language(mel)
         return dict(sorted(probs.items(), key=lambda x: x[1], reverse=True)[:5])
 
     def unload(self) -> None:
         if self._model is not None:
             del self._model
             self._model = None
-            torch.cuda.empty_cache()
+            empty_cuda_cache()
 
 
 whisper_service = WhisperService()
+model_manager.register(
+    "whisper",
+    device=settings.whisper_device,
+    footprint_mb=MODEL_FOOTPRINTS_MB[settings.whisper_model],
+    load=whisper_service._load_model,
+    unload=whisper_service.unload,
+    is_loaded=lambda: whisper_service._model is not None,
+)
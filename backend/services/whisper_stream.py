@@ -0,0 +1,115 @@
+from typing import Any, Callable, Iterable, Iterator
+import numpy as np
+from backend.services.whisper_batcher import SAMPLE_RATE
+
+WindowFn = Callable[[np.ndarray, str | None, str | None], dict[str, Any]]
+
+
+class StreamingTranscriber:
+    def __init__(
+        self,
+        transcribe_window: WindowFn,
+        window_seconds: float = 15.0,
+        language: str | None = None,
+    ) -> None:
+        self.transcribe_window = transcribe_window
+        self.window_samples = int(window_seconds * SAMPLE_RATE)
+        self.language = language
+        self.detected_language: str | None = language
+        self.segments: list[dict[str, Any]] = []
+        self._buffer = np.zeros(0, dtype=np.float32)
+        self._offset = 0
+
+    @property
+    def text(self) -> str:
+        return " ".join(segment["text"] for segment in self.segments)
+
+    def feed(self, samples: np.ndarray) -> list[dict[str, Any]]:
+        self._buffer = np.concatenate([self._buffer, samples.astype(np.float32, copy=False)])
+        finalized = []
+        while len(self._buffer) >= self.window_samples:
+            finalized.extend(self._decode(final=False))
+        return finalized
+
+    def flush(self) -> list[dict[str, Any]]:
+        if len(self._buffer) == 0:
+            return []
+        return self._decode(final=True)
+
+    def _decode(self, final: bool) -> list[dict[str, Any]]:
+        window = self._buffer[:self.window_samples]
+        prompt = self.segments[-1]["text"] if self.segments else None
+        result = self.transcribe_window(window, self.language or self.detected_language, prompt)
+        self.detected_language = self.detected_language or result.get("language")
+
+        segments = [s for s in result.get("segments", []) if s["text"].strip()]
+        consumed = len(window)
+        if not final and len(segments) > 1:
+            carry_from = int(segments[-1]["start"] * SAMPLE_RATE)
+            if 0 < carry_from < consumed:
+                segments = segments[:-1]
+                consumed = carry_from
+
+        offset_seconds = self._offset / SAMPLE_RATE
+        finalized = []
+        for segment in segments:
+            finalized.append({
+                "id": len(self.segments),
+                "start": round(offset_seconds + segment["start"], 3),
+                "end": round(offset_seconds + min(segment["end"], consumed / SAMPLE_RATE), 3),
+                "text": segment["text"].strip(),
+            })
+            self.segments.append(finalized[-1])
+
+        self._buffer = self._buffer[consumed:]
+        self._offset += consumed
+        return finalized
+
+
+class PcmResampler:
+    def __init__(self, sample_rate: int = SAMPLE_RATE) -> None:
+        if sample_rate <= 0:
+            raise ValueError(f"Invalid sample rate: {sample_rate}")
+        self.sample_rate = sample_rate
+        self._step = sample_rate / SAMPLE_RATE
+        self._carry = b""
+        self._tail = np.zeros(0, dtype=np.float32)
+        self._position = 0.0
+
+    def feed(self, data: bytes) -> np.ndarray:
+        data = self._carry + data
+        whole = len(data) - len(data) % 2
+        self._carry = data[whole:]
+        samples = np.frombuffer(data[:whole], dtype="<i2").astype(np.float32) / 32768.0
+        if self.sample_rate == SAMPLE_RATE:
+            return samples
+
+        source = np.concatenate([self._tail, samples])
+        if len(source) == 0:
+            return source
+        last = len(source) - 1
+        count = max(0, int(np.floor((last - self._position) / self._step)) + 1)
+        targets = self._position + np.arange(count) * self._step
+        resampled = np.interp(targets, np.arange(len(source)), source).astype(np.float32)
+        self._tail = source[-1:]
+        self._position += count * self._step - last
+        return resampled
+
+
+def pcm16_to_float(data: bytes, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    return PcmResampler(sample_rate).feed(data)
+
+
+def iter_audio_chunks(audio: np.ndarray, chunk_seconds: float = 1.0) -> Iterator[np.ndarray]:
+    step = int(chunk_seconds * SAMPLE_RATE)
+    for start in range(0, len(audio), step):
+        yield audio[start:start + step]
+
+
+def stream_segments(
+    transcriber: StreamingTranscriber,
+    chunks: Iterable[np.ndarray],
+) -> Iterator[dict[str, Any]]:
+    for chunk in chunks:
+        yield from transcriber.feed(chunk)
+    yield from transcriber.flush()
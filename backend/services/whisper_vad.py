@@ -0,0 +1,137 @@
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable
+import numpy as np
+from backend.services.whisper_batcher import SAMPLE_RATE
+
+Region = tuple[int, int]
+VadFn = Callable[[np.ndarray, int], list[Region]]
+
+
+def merge_regions(
+    regions: list[Region],
+    total: int,
+    sample_rate: int = SAMPLE_RATE,
+    min_speech_ms: float = 250.0,
+    min_silence_ms: float = 500.0,
+    pad_ms: float = 200.0,
+) -> list[Region]:
+    pad = int(pad_ms * sample_rate / 1000)
+    min_gap = int(min_silence_ms * sample_rate / 1000)
+    min_length = int(min_speech_ms * sample_rate / 1000)
+
+    merged: list[list[int]] = []
+    for start, end in sorted(regions):
+        start, end = max(0, start - pad), min(total, end + pad)
+        if merged and start - merged[-1][1] < min_gap:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged if end - start >= min_length]
+
+
+def energy_vad(
+    audio: np.ndarray,
+    sample_rate: int = SAMPLE_RATE,
+    frame_ms: float = 30.0,
+    threshold_db: float = -45.0,
+    margin_db: float = 10.0,
+) -> list[Region]:
+    frame = int(frame_ms * sample_rate / 1000)
+    frames = len(audio) // frame
+    if frames == 0:
+        return [(0, len(audio))] if len(audio) else []
+
+    rms = np.sqrt(np.mean(np.square(audio[:frames * frame].reshape(frames, frame), dtype=np.float64), axis=1))
+    db = 20 * np.log10(rms + 1e-10)
+    noise_floor = float(np.percentile(db, 10))
+    threshold = max(threshold_db, min(noise_floor + margin_db, float(db.max()) - margin_db))
+
+    voiced = np.concatenate([[False], db > threshold, [False]])
+    edges = np.flatnonzero(np.diff(voiced.astype(np.int8)))
+    regions = [(int(start) * frame, int(end) * frame) for start, end in zip(edges[::2], edges[1::2])]
+    if regions and regions[-1][1] == frames * frame:
+        regions[-1] = (regions[-1][0], len(audio))
+    return regions
+
+
+@lru_cache(maxsize=1)
+def _silero_model() -> Any:
+    from silero_vad import load_silero_vad
+
+    return load_silero_vad()
+
+
+def silero_vad(audio: np.ndarray, sample_rate: int = SAMPLE_RATE) -> list[Region]:
+    import torch
+    from silero_vad import get_speech_timestamps
+
+    timestamps = get_speech_timestamps(torch.from_numpy(audio), _silero_model(), sampling_rate=sample_rate)
+    return [(int(ts["start"]), int(ts["end"])) for ts in timestamps]
+
+
+VAD_BACKENDS: dict[str, VadFn] = {
+    "energy": energy_vad,
+    "silero": silero_vad,
+}
+
+
+def register_vad(name: str, vad: VadFn) -> None:
+    VAD_BACKENDS[name] = vad
+
+
+def detect_speech(
+    audio: np.ndarray,
+    backend: str = "energy",
+    sample_rate: int = SAMPLE_RATE,
+    **options: Any,
+) -> list[Region]:
+    vad = VAD_BACKENDS.get(backend)
+    if vad is None:
+        raise ValueError(f"Unknown VAD backend: {backend}")
+    return merge_regions(vad(audio, sample_rate), len(audio), sample_rate, **options)
+
+
+@dataclass
+class SpeechTimeline:
+    packed_starts: list[float]
+    original_starts: list[float]
+    lengths: list[float]
+
+    @property
+    def speech_seconds(self) -> float:
+        return sum(self.lengths)
+
+    def to_original(self, seconds: float, end: bool = False) -> float:
+        index = (bisect_left if end else bisect_right)(self.packed_starts, seconds) - 1
+        index = max(0, min(index, len(self.packed_starts) - 1))
+        offset = min(max(seconds - self.packed_starts[index], 0.0), self.lengths[index])
+        return round(self.original_starts[index] + offset, 3)
+
+
+def pack_speech(
+    audio: np.ndarray,
+    regions: list[Region],
+    sample_rate: int = SAMPLE_RATE,
+) -> tuple[np.ndarray, SpeechTimeline]:
+    timeline = SpeechTimeline([], [], [])
+    position = 0
+    for start, end in regions:
+        timeline.packed_starts.append(position / sample_rate)
+        timeline.original_starts.append(start / sample_rate)
+        timeline.lengths.append((end - start) / sample_rate)
+        position += end - start
+    packed = np.concatenate([audio[start:end] for start, end in regions]) if regions else audio[:0]
+    return packed, timeline
+
+
+def remap_segments(segments: list[dict[str, Any]], timeline: SpeechTimeline) -> list[dict[str, Any]]:
+    return [
+        {
+            **segment,
+            "start": timeline.to_original(segment["start"]),
+            "end": timeline.to_original(segment["end"], end=True),
+        }
+        for segment in segments
+    ]
@@ -3,6 +3,8 @@ from fastapi.testclient import TestClient
 from unittest.mock import patch, MagicMock
 from pathlib import Path
 import io
+import json
+import time
 
 from backend.main import app
 
@@ -26,6 +28,51 @@ class TestHealthEndpoints:
         assert response.status_code == 200
         assert response.json()["status"] == "healthy"
 
+    def test_ready_waits_for_warmup(self, monkeypatch):
+        from backend.core import settings
+        from backend.services import warmup
+
+        monkeypatch.setattr(warmup, "warmup_state", warmup.WarmupState())
+        monkeypatch.setattr("backend.main.warmup_state", warmup.warmup_state)
+        monkeypatch.setattr(settings, "warmup_models", ["whisper"])
+        monkeypatch.setattr(settings, "warmup_blocking", True)
+
+        assert TestClient(app).get("/ready").status_code == 503
+
+        with patch.dict(warmup.WARMUPS, {"whisper": lambda: None}):
+            with TestClient(app) as client:
+                response = client.get("/ready")
+
+        assert response.status_code == 200
+        assert response.json()["models"]["whisper"]["status"] == "ready"
+
+
+class TestStartup:
+    def test_cold_import_skips_heavy_modules(self):
+        from backend.benchmarks.import_time import measure_cold_import
+
+        result = measure_cold_import("backend.main")
+
+        assert result["heavy_modules"] == []
+
+    def test_model_info_does_not_import_torch(self):
+        import subprocess
+        import sys
+        from backend.benchmarks.import_time import REPO_ROOT
+
+        script = (
+            "import sys\n"
+            "from fastapi.testclient import TestClient\n"
+            "from backend.core import settings\n"
+            "from backend.main import app\n"
+            "settings.whisper_device = settings.chatterbox_device = settings.opensora_device = 'auto'\n"
+            "assert TestClient(app).get('/api/v1/system/models').status_code == 200\n"
+            "print('torch' in sys.modules)\n"
+        )
+        result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, cwd=REPO_ROOT, check=True)
+
+        assert result.stdout.split()[-1] == "False"
+
 
 class TestTranscriptionEndpoints:
     @patch("backend.services.whisper_service.transcribe")
@@ -46,6 +93,18 @@ class TestTranscriptionEndpoints:
         assert data["text"] == "Hello world"
         assert data["language"] == "en"
 
+    @patch("backend.api.routes.whisper_service.transcribe")
+    def test_rejects_compressed_audio_longer_than_duration_limit(self, mock_transcribe, client):
+        from backend.core import settings
+        from backend.utils.probe import MediaInfo
+
+        info = MediaInfo(path="", duration=settings.max_audio_duration_seconds + 1, format_name="mp3", size=0, streams=())
+        with patch("backend.api.routes.probe_media_async", return_value=info):
+            response = client.post("/api/v1/transcribe", files={"file": ("talk.mp3", io.BytesIO(b"ID3"), "audio/mpeg")})
+
+        assert response.status_code == 413
+        mock_transcribe.assert_not_called()
+
     @patch("backend.services.whisper_service.detect_language")
     def test_detect_language_success(self, mock_detect, client):
         mock_detect.return_value = {"en": 0.95, "es": 0.03, "fr": 0.02}
@@ -60,6 +119,67 @@ class TestTranscriptionEndpoints:
         assert "languages" in data
 
 
+class TestStreamingTranscriptionEndpoints:
+    @pytest.fixture(autouse=True)
+    def demo_whisper(self, monkeypatch):
+        import sys
+        from backend.core import settings
+
+        monkeypatch.setattr(sys.modules["backend.services.whisper_service"], "DEMO_MODE", True)
+        monkeypatch.setattr(settings, "whisper_stream_window_seconds", 1.0)
+
+    def test_stream_returns_ndjson_segments(self, client):
+        import json
+        import wave
+
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(16000)
+            wav_file.writeframes(b"\x00\x00" * 16000 * 3)
+        files = {"file": ("test.wav", io.BytesIO(buffer.getvalue()), "audio/wav")}
+
+        response = client.post("/api/v1/transcribe/stream", files=files)
+        events = [json.loads(line) for line in response.text.splitlines()]
+
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        assert [e["type"] for e in events] == ["segment", "segment", "segment", "done"]
+        assert events[2]["start"] == 2.0
+
+    def test_live_websocket_emits_segments_as_frames_arrive(self, client):
+        with client.websocket_connect("/api/v1/transcribe/live") as websocket:
+            websocket.send_bytes(b"\x00\x00" * 16000)
+            first = websocket.receive_json()
+            websocket.send_text("end")
+            done = websocket.receive_json()
+
+        assert first["type"] == "segment"
+        assert first["end"] == 1.0
+        assert done["type"] == "done"
+
+    def test_live_websocket_carries_odd_bytes_between_frames(self, client):
+        with client.websocket_connect("/api/v1/transcribe/live") as websocket:
+            websocket.send_bytes(b"\x00" * 16001)
+            websocket.send_bytes(b"\x00" * 15999)
+            first = websocket.receive_json()
+            websocket.send_text("end")
+            done = websocket.receive_json()
+
+        assert first["type"] == "segment"
+        assert first["end"] == 1.0
+        assert done["type"] == "done"
+
+    def test_live_websocket_rejects_invalid_sample_rate_before_accepting(self, client):
+        from starlette.testclient import WebSocketDenialResponse
+
+        with pytest.raises(WebSocketDenialResponse) as denial:
+            with client.websocket_connect("/api/v1/transcribe/live?sample_rate=0"):
+                pass
+
+        assert denial.value.status_code == 400
+
+
 class TestSynthesisEndpoints:
     @patch("backend.services.chatterbox_service.synthesize")
     def test_synthesize_speech_success(self, mock_synthesize, client):
@@ -74,6 +194,33 @@ class TestSynthesisEndpoints:
         data = response.json()
         assert "audio_id" in data
 
+    def test_synthesize_stream_returns_wav_frames(self, client, monkeypatch):
+        import sys
+
+        monkeypatch.setattr(sys.modules["backend.services.chatterbox_service"], "DEMO_MODE", True)
+
+        response = client.post("/api/v1/synthesize/stream", json={"text": "Hi. Bye."})
+
+        assert response.status_code == 200
+        assert response.headers["x-sample-rate"] == "24000"
+        assert response.content[:4] == b"RIFF"
+        assert len(response.content) == 44 + 2 * int(24000 * 3 * 0.05) + 2 * int(24000 * 4 * 0.05)
+
+    def test_synthesize_stream_does_not_load_model_outside_its_slot(self, client, monkeypatch):
+        import sys
+
+        module = sys.modules["backend.services.chatterbox_service"]
+        monkeypatch.setattr(module, "DEMO_MODE", False)
+        monkeypatch.setattr(module.chatterbox_service, "_model", None)
+        monkeypatch.setattr(module.chatterbox_service, "synthesize_stream", lambda **kwargs: iter([b"\x00\x00"]))
+
+        with patch.object(module.model_manager, "load") as mock_load:
+            response = client.post("/api/v1/synthesize/stream", json={"text": "Hi.", "format": "pcm"})
+
+        assert response.status_code == 200
+        assert response.headers["x-sample-rate"] == "24000"
+        mock_load.assert_not_called()
+
     @patch("backend.services.chatterbox_service.list_builtin_voices")
     def test_list_voices(self, mock_list_voices, client):
         mock_list_voices.return_value = ["default", "narrator"]
@@ -85,6 +232,36 @@ class TestSynthesisEndpoints:
         assert "builtin_voices" in data
 
 
+class TestVoiceProfileEndpoints:
+    def test_profile_can_be_created_and_used(self, client, tmp_path, monkeypatch):
+        import sys
+        from backend.services.voice_profiles import VoiceProfileRegistry
+
+        registry = VoiceProfileRegistry(tmp_path / "voices")
+        monkeypatch.setattr("backend.api.routes.voice_profiles", registry)
+        monkeypatch.setattr(sys.modules["backend.services.chatterbox_service"], "voice_profiles", registry)
+        monkeypatch.setattr(sys.modules["backend.services.chatterbox_service"], "DEMO_MODE", True)
+
+        response = client.post(
+            "/api/v1/voice-profiles",
+            files={"file": ("narrator.wav", io.BytesIO(b"RIFF narrator"), "audio/wav")},
+            data={"name": "Narrator"},
+        )
+        profile_id = response.json()["profile_id"]
+
+        assert response.status_code == 200
+        assert client.get("/api/v1/voice-profiles").json()["profiles"][0]["name"] == "Narrator"
+
+        with patch("backend.api.routes.chatterbox_service.synthesize") as mock_synthesize:
+            ok = client.post("/api/v1/synthesize", json={"text": "Hi", "voice_profile_id": profile_id})
+            missing = client.post("/api/v1/synthesize", json={"text": "Hi", "voice_profile_id": "nope"})
+
+        assert ok.status_code == 200
+        assert mock_synthesize.call_args.kwargs["voice_profile_id"] == profile_id
+        assert missing.status_code == 404
+        assert client.delete(f"/api/v1/voice-profiles/{profile_id}").status_code == 200
+
+
 class TestVideoGenerationEndpoints:
     @patch("backend.services.opensora_service.generate_video")
     def test_generate_video_returns_job_id(self, mock_generate, client):
@@ -101,11 +278,342 @@ class TestVideoGenerationEndpoints:
         data = response.json()
         assert "job_id" in data
 
+    def test_generate_video_rejects_when_queue_full(self, client):
+        from backend.core import QueueFullError
+
+        with patch(
+            "backend.api.routes.job_scheduler.submit",
+            side_effect=QueueFullError("cpu", 32),
+        ):
+            response = client.post(
+                "/api/v1/generate-video",
+                json={"prompt": "A beautiful sunset"},
+            )
+
+        assert response.status_code == 429
+        assert response.json()["detail"]["queue_depth"] == 32
+
+    def test_generate_video_writes_job_store_off_the_event_loop(self, client):
+        import asyncio
+        from backend.core import QueueFullError
+
+        calls = []
+
+        def record(*args, **kwargs):
+            try:
+                asyncio.get_running_loop()
+                calls.append("event loop")
+            except RuntimeError:
+                calls.append("worker thread")
+
+        with (
+            patch("backend.api.routes.job_store.create", side_effect=record),
+            patch("backend.api.routes.job_store.delete", side_effect=record),
+            patch("backend.api.routes.job_scheduler.submit", side_effect=QueueFullError("cpu", 32)),
+        ):
+            response = client.post("/api/v1/generate-video", json={"prompt": "A beautiful sunset"})
+
+        assert response.status_code == 429
+        assert calls == ["worker thread", "worker thread"]
+
+    def test_drafts_jump_ahead_of_full_renders_and_batches(self, client):
+        from backend.core import PRIORITY_HIGH, PRIORITY_LOW, PRIORITY_NORMAL
+
+        with patch("backend.api.routes.job_scheduler.submit") as mock_submit:
+            client.post("/api/v1/generate-video", json={"prompt": "fox", "quality": "draft"})
+            client.post("/api/v1/generate-video", json={"prompt": "fox"})
+            client.post("/api/v1/generate-video/batch", json={"items": [{"prompt": "fox"}]})
+
+        priorities = [call.kwargs["priority"] for call in mock_submit.call_args_list]
+        assert priorities == [PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW]
+
     def test_get_nonexistent_job_returns_404(self, client):
         response = client.get("/api/v1/job/nonexistent-id")
         assert response.status_code == 404
 
 
+class TestDraftPromotion:
+    def wait(self, client, job_id):
+        for _ in range(100):
+            job = client.get(f"/api/v1/job/{job_id}").json()
+            if job["status"] in ("completed", "failed"):
+                return job
+            time.sleep(0.05)
+        return job
+
+    def test_draft_can_be_promoted_with_the_same_seed(self, client, tmp_path):
+        def fake_generate(**kwargs):
+            return {
+                "video_path": str(tmp_path / f"{kwargs.get('quality', 'full')}.mp4"),
+                "prompt": kwargs["prompt"],
+                "seed": kwargs["seed"],
+                "num_frames": kwargs["num_frames"],
+                "guidance_scale": kwargs["guidance_scale"],
+                "reference_image": None,
+                "quality": kwargs.get("quality", "full"),
+            }
+
+        with patch("backend.api.routes.opensora_service.generate_video", side_effect=fake_generate):
+            draft_id = client.post(
+                "/api/v1/generate-video", json={"prompt": "A red fox", "quality": "draft"}
+            ).json()["job_id"]
+            draft = self.wait(client, draft_id)
+            response = client.post(f"/api/v1/generate-video/{draft_id}/promote")
+            full = self.wait(client, response.json()["job_id"])
+
+        assert draft["result"]["quality"] == "draft"
+        assert full["error"] is None
+        assert response.json()["seed"] == draft["result"]["seed"]
+        assert full["status"] == "completed"
+        assert full["result"]["quality"] == "full"
+        assert full["result"]["seed"] == draft["result"]["seed"]
+        assert full["result"]["draft_job_id"] == draft_id
+
+    def test_only_completed_drafts_can_be_promoted(self, client):
+        from backend.core import job_store, JobStatus
+
+        job_store.create(JobStatus(job_id="full-job", status="completed", progress=1.0, result={"quality": "full"}))
+
+        assert client.post("/api/v1/generate-video/missing/promote").status_code == 404
+        assert client.post("/api/v1/generate-video/full-job/promote").status_code == 400
+
+
+class TestPipelineEndpoints:
+    def test_pipeline_reports_per_stage_status(self, client, tmp_path):
+        with patch(
+            "backend.api.routes.opensora_service.generate_video",
+            return_value={"video_path": str(tmp_path / "video.mp4")},
+        ), patch(
+            "backend.api.routes.chatterbox_service.synthesize",
+            return_value=tmp_path / "voiceover.wav",
+        ), patch(
+            "backend.api.routes.combine_audio_video",
+            return_value=tmp_path / "final.mp4",
+        ):
+            response = client.post(
+                "/api/v1/pipeline/voice-to-video",
+                json={"text": "A calm lake at dawn"},
+            )
+            job_id = response.json()["job_id"]
+
+            for _ in range(100):
+                job = client.get(f"/api/v1/job/{job_id}").json()
+                if job["status"] in ("completed", "failed"):
+                    break
+                time.sleep(0.05)
+
+        assert job["status"] == "completed"
+        assert job["stages"] == {"video": "completed", "voiceover": "completed", "mux": "completed"}
+        assert job["result"]["final_video_path"] == str(tmp_path / "final.mp4")
+
+
+class TestJobEvents:
+    def test_events_stream_progress_until_completion(self, client, tmp_path):
+        from backend.core import progress_broker, report_progress
+
+        def fake_generate(**kwargs):
+            job_id = kwargs["output_dir"].name
+            for _ in range(100):
+                if progress_broker._subscribers.get(job_id):
+                    break
+                time.sleep(0.05)
+            report_progress(0.5, "denoising step 25/50")
+            return {"video_path": str(tmp_path / "video.mp4")}
+
+        with patch("backend.api.routes.opensora_service.generate_video", side_effect=fake_generate):
+            job_id = client.post("/api/v1/generate-video", json={"prompt": "A calm lake"}).json()["job_id"]
+            response = client.get(f"/api/v1/job/{job_id}/events")
+
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [
+            (block.split("\n")[0].removeprefix("event: "), json.loads(block.split("data: ", 1)[1]))
+            for block in response.text.strip().split("\n\n")
+            if block.startswith("event:")
+        ]
+        progress = [data for name, data in events if name == "progress"]
+        assert progress[0]["stage"] == "video"
+        assert progress[0]["message"] == "denoising step 25/50"
+        assert events[-1][1]["status"] == "completed"
+
+    def test_events_for_unknown_job_return_404(self, client):
+        assert client.get("/api/v1/job/nonexistent-id/events").status_code == 404
+
+
+class TestMediaDelivery:
+    @pytest.fixture
+    def audio(self):
+        import uuid
+        from backend.core import settings
+
+        audio_id = f"test-{uuid.uuid4().hex}"
+        path = settings.temp_dir / f"{audio_id}.wav"
+        path.write_bytes(bytes(range(256)) * 4)
+        yield audio_id, path.read_bytes()
+        path.unlink(missing_ok=True)
+
+    def test_full_response_advertises_ranges_and_validators(self, client, audio):
+        audio_id, content = audio
+        response = client.get(f"/api/v1/audio/{audio_id}")
+
+        assert response.status_code == 200
+        assert response.content == content
+        assert response.headers["accept-ranges"] == "bytes"
+        assert response.headers["etag"]
+        assert response.headers["last-modified"]
+
+    def test_range_request_returns_only_requested_bytes(self, client, audio):
+        audio_id, content = audio
+
+        response = client.get(f"/api/v1/audio/{audio_id}", headers={"Range": "bytes=100-199"})
+        suffix = client.get(f"/api/v1/audio/{audio_id}", headers={"Range": "bytes=-24"})
+
+        assert response.status_code == 206
+        assert response.content == content[100:200]
+        assert response.headers["content-range"] == f"bytes 100-199/{len(content)}"
+        assert suffix.content == content[-24:]
+
+    def test_unsatisfiable_range_returns_416(self, client, audio):
+        audio_id, content = audio
+        response = client.get(f"/api/v1/audio/{audio_id}", headers={"Range": f"bytes={len(content)}-"})
+
+        assert response.status_code == 416
+        assert response.headers["content-range"] == f"bytes */{len(content)}"
+
+    def test_conditional_get_returns_304(self, client, audio):
+        audio_id, _ = audio
+        first = client.get(f"/api/v1/audio/{audio_id}")
+
+        by_etag = client.get(f"/api/v1/audio/{audio_id}", headers={"If-None-Match": first.headers["etag"]})
+        by_date = client.get(
+            f"/api/v1/audio/{audio_id}", headers={"If-Modified-Since": first.headers["last-modified"]}
+        )
+        stale_if_range = client.get(
+            f"/api/v1/audio/{audio_id}", headers={"Range": "bytes=0-9", "If-Range": '"stale"'}
+        )
+
+        assert by_etag.status_code == 304
+        assert by_etag.content == b""
+        assert by_date.status_code == 304
+        assert stale_if_range.status_code == 200
+
+    def test_accel_redirect_offloads_body_to_proxy(self, client, audio, monkeypatch):
+        from backend.core import settings
+
+        audio_id, _ = audio
+        monkeypatch.setattr(settings, "media_accel_redirect_prefix", "/protected/")
+        response = client.get(f"/api/v1/audio/{audio_id}")
+
+        assert response.headers["x-accel-redirect"] == f"/protected/{audio_id}.wav"
+        assert response.content == b""
+
+
+class TestObservability:
+    def test_metrics_endpoint_exposes_request_histograms(self, client):
+        client.get("/health")
+
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert 'voxvideo_http_requests_total{method="GET",route="/health",status="200"}' in response.text
+        assert "voxvideo_http_request_duration_seconds_bucket" in response.text
+        assert "# TYPE voxvideo_job_queue_depth gauge" in response.text
+
+    def test_route_label_keeps_the_api_prefix(self, client):
+        client.get("/api/v1/job/missing-job")
+
+        response = client.get("/metrics")
+
+        assert 'route="/api/v1/job/{job_id}",status="404"' in response.text
+        assert 'route="/job/{job_id}"' not in response.text
+
+    def test_job_trace_links_pipeline_stages(self, client, tmp_path):
+        with patch(
+            "backend.api.routes.opensora_service.generate_video",
+            return_value={"video_path": str(tmp_path / "video.mp4")},
+        ):
+            response = client.post(
+                "/api/v1/pipeline/voice-to-video",
+                json={"text": "A calm lake", "generate_voiceover": False},
+            )
+            job_id = response.json()["job_id"]
+
+            for _ in range(100):
+                job = client.get(f"/api/v1/job/{job_id}").json()
+                if job["status"] in ("completed", "failed"):
+                    break
+                time.sleep(0.05)
+
+        spans = {span["name"]: span for span in client.get(f"/api/v1/job/{job_id}/trace").json()["spans"]}
+        assert spans["stage.video"]["parent_id"] == spans["job.pipeline"]["span_id"]
+        assert spans["stage.video"]["trace_id"] == job_id
+
+
+class TestSloEndpoint:
+    @patch("backend.api.routes.chatterbox_service.synthesize")
+    def test_interactive_requests_are_tracked_against_their_target(self, mock_synthesize, client):
+        before = client.get("/api/v1/system/slo").json()["classes"]["interactive"]["samples"]
+
+        client.post("/api/v1/synthesize", json={"text": "Hello world"})
+        response = client.get("/api/v1/system/slo")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["classes"]["interactive"]["samples"] == min(before + 1, 1000)
+        assert data["classes"]["interactive"]["target_ms"] == 2000.0
+        assert data["arbiter"]["interactive_active"] == {}
+
+
+    def test_interactive_is_registered_only_after_the_model_slot(self):
+        import asyncio
+        import threading
+        from backend.api.routes import call_model
+        from backend.core import gpu_arbiter, job_scheduler
+
+        seen = []
+        with job_scheduler.model_slot("chatterbox"):
+            call = call_model("chatterbox", lambda: seen.append(gpu_arbiter.stats()["interactive_active"]))
+            thread = threading.Thread(target=asyncio.run, args=(call,))
+            thread.start()
+            time.sleep(0.1)
+            assert gpu_arbiter.stats()["interactive_active"] == {}
+        thread.join(2)
+
+        assert seen and sum(seen[0].values()) == 1
+
+
+class TestVideoBatchEndpoint:
+    def test_batch_job_reports_items(self, client, tmp_path):
+        def fake_batch(items, output_dir, use_cache, on_item):
+            results = []
+            for index, item in enumerate(items):
+                results.append({"status": "completed", "prompt": item["prompt"], "video_path": f"{index}.mp4"})
+                on_item(index, results[-1])
+            return {"items": results, "completed": len(items), "failed": 0, "videos_per_gpu_hour": 120.0}
+
+        with patch("backend.api.routes.opensora_service.generate_video_batch", side_effect=fake_batch):
+            response = client.post(
+                "/api/v1/generate-video/batch",
+                json={"items": [{"prompt": "shot 1", "seed": 1}, {"prompt": "shot 2"}]},
+            )
+            job_id = response.json()["job_id"]
+
+            for _ in range(100):
+                job = client.get(f"/api/v1/job/{job_id}").json()
+                if job["status"] in ("completed", "failed"):
+                    break
+                time.sleep(0.05)
+
+        assert response.json()["items"] == 2
+        assert job["status"] == "completed"
+        assert [item["prompt"] for item in job["result"]["items"]] == ["shot 1", "shot 2"]
+
+    def test_empty_batch_is_rejected(self, client):
+        response = client.post("/api/v1/generate-video/batch", json={"items": []})
+
+        assert response.status_code == 422
+
+
 class TestSystemEndpoints:
     @patch("backend.services.opensora_service.check_gpu_requirements")
     def test_gpu_status(self, mock_check_gpu, client):
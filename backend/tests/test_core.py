@@ -0,0 +1,654 @@
+import asyncio
+import pytest
+import threading
+import time
+
+from backend.core.scheduler import JobScheduler, QueueFullError, PRIORITY_HIGH, PRIORITY_LOW
+from backend.core.job_store import JobStatus, InMemoryJobStore, SQLiteJobStore
+from backend.core.result_cache import ResultCache
+from backend.core.pipeline import Stage, StageFailedError, run_stages
+from backend.core.progress import JobProgress, ProgressBroker, report_progress
+from backend.core.metrics import MetricsRegistry
+from backend.core.tracing import Tracer
+from backend.core.gpu_arbiter import GpuArbiter
+from backend.core.slo import SloTracker
+
+
+@pytest.fixture
+def scheduler():
+    scheduler = JobScheduler(
+        workers_per_device=1,
+        max_queue_size=2,
+        model_concurrency={"opensora": 1},
+    )
+    yield scheduler
+    scheduler.shutdown()
+
+
+class TestJobScheduler:
+    def test_submit_runs_job_off_caller_thread(self, scheduler):
+        future = scheduler.submit(threading.get_ident, device="cpu", job_id="a")
+        assert future.result(timeout=5) != threading.get_ident()
+
+    def test_rejects_when_queue_full(self, scheduler):
+        release = threading.Event()
+        started = threading.Event()
+
+        def block():
+            started.set()
+            release.wait(5)
+
+        scheduler.submit(block, device="cpu", job_id="running")
+        started.wait(5)
+        scheduler.submit(lambda: None, device="cpu", job_id="q1")
+        scheduler.submit(lambda: None, device="cpu", job_id="q2")
+
+        with pytest.raises(QueueFullError) as exc_info:
+            scheduler.submit(lambda: None, device="cpu", job_id="q3")
+        assert exc_info.value.depth == 2
+
+        release.set()
+
+    def test_models_are_expected_before_the_job_is_queued(self, scheduler, monkeypatch):
+        import sys
+
+        manager = sys.modules["backend.core.scheduler"].model_manager
+        depths = []
+        monkeypatch.setattr(manager, "expect", lambda models: depths.append(scheduler.queue_depth("cpu")))
+        undone = []
+        monkeypatch.setattr(manager, "expect_done", lambda models: undone.append(tuple(models)))
+        release = threading.Event()
+        started = threading.Event()
+
+        def block():
+            started.set()
+            release.wait(5)
+
+        scheduler.submit(block, device="cpu", job_id="running", models=("opensora",))
+        started.wait(5)
+        scheduler.submit(lambda: None, device="cpu", job_id="q1", models=("opensora",))
+        scheduler.submit(lambda: None, device="cpu", job_id="q2", models=("opensora",))
+        with pytest.raises(QueueFullError):
+            scheduler.submit(lambda: None, device="cpu", job_id="q3", models=("opensora",))
+        release.set()
+
+        assert depths == [0, 0, 1, 2]
+        assert ("opensora",) in undone
+
+    def test_restart_without_waiting_keeps_worker_limit(self, scheduler):
+        scheduler.submit(lambda: None, device="cpu", job_id="warm").result(timeout=5)
+        scheduler.shutdown(wait=False)
+
+        lock = threading.Lock()
+        active = [0]
+        peak = [0]
+
+        def job():
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.2)
+            with lock:
+                active[0] -= 1
+
+        futures = [scheduler.submit(job, device="cpu", job_id=f"job-{i}") for i in range(2)]
+        for future in futures:
+            future.result(timeout=5)
+
+        assert peak[0] == 1
+
+    def test_higher_priority_runs_first(self, scheduler):
+        release = threading.Event()
+        started = threading.Event()
+        order = []
+
+        def block():
+            started.set()
+            release.wait(5)
+
+        scheduler.submit(block, device="cpu", job_id="blocker")
+        started.wait(5)
+        low = scheduler.submit(lambda: order.append("low"), device="cpu", job_id="low", priority=PRIORITY_LOW)
+        high = scheduler.submit(lambda: order.append("high"), device="cpu", job_id="high", priority=PRIORITY_HIGH)
+        release.set()
+        low.result(timeout=5)
+        high.result(timeout=5)
+
+        assert order == ["high", "low"]
+
+    def test_model_slot_limits_concurrency(self, scheduler):
+        active = []
+        peak = []
+
+        def use_model():
+            with scheduler.model_slot("opensora"):
+                active.append(1)
+                peak.append(len(active))
+                time.sleep(0.05)
+                active.pop()
+
+        threads = [threading.Thread(target=use_model) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert max(peak) == 1
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return InMemoryJobStore(ttl_seconds=60, eviction_interval_seconds=3600)
+    return SQLiteJobStore(tmp_path / "jobs.db", ttl_seconds=60, eviction_interval_seconds=3600)
+
+
+class TestJobStore:
+    def test_incomplete_backend_fails_at_construction(self):
+        from backend.core.job_store import JobStore
+
+        class PartialStore(JobStore):
+            def get(self, job_id):
+                return None
+
+        with pytest.raises(TypeError):
+            PartialStore()
+
+    def test_create_update_get_roundtrip(self, store):
+        store.create(JobStatus(job_id="job-1", status="pending", progress=0.0))
+        store.update("job-1", status="completed", progress=1.0, result={"video_path": "/tmp/v.mp4"})
+
+        job = store.get("job-1")
+        assert job.status == "completed"
+        assert job.progress == 1.0
+        assert job.result == {"video_path": "/tmp/v.mp4"}
+
+    def test_get_missing_job_returns_none(self, store):
+        assert store.get("missing") is None
+
+    def test_list_filters_by_status(self, store):
+        store.create(JobStatus(job_id="a", status="pending", progress=0.0))
+        store.create(JobStatus(job_id="b", status="pending", progress=0.0))
+        store.update("b", status="failed", error="boom")
+
+        assert [job.job_id for job in store.list_jobs(status="failed")] == ["b"]
+
+    def test_evict_expired_removes_finished_jobs_and_outputs(self, store, tmp_path, monkeypatch):
+        from backend.core import settings
+
+        monkeypatch.setattr(settings, "temp_dir", tmp_path)
+        (tmp_path / "done").mkdir()
+        (tmp_path / "done" / "video.mp4").write_bytes(b"data")
+        store.create(JobStatus(job_id="done", status="pending", progress=0.0))
+        store.create(JobStatus(job_id="active", status="running", progress=0.5))
+        store.update("done", status="completed", progress=1.0)
+
+        evicted = store.evict_expired(now=time.time() + 120)
+
+        assert evicted == ["done"]
+        assert store.get("done") is None
+        assert store.get("active") is not None
+        assert not (tmp_path / "done").exists()
+
+    def test_update_rejects_unknown_fields(self, store):
+        store.create(JobStatus(job_id="job", status="pending", progress=0.0))
+
+        with pytest.raises(ValueError, match="colour"):
+            store.update("job", colour="blue")
+
+    def test_fail_interrupted_marks_unfinished_jobs_failed(self, store):
+        for job_id, status in (("queued", "pending"), ("busy", "running"), ("done", "completed")):
+            store.create(JobStatus(job_id=job_id, status=status, progress=0.0))
+
+        assert sorted(store.fail_interrupted()) == ["busy", "queued"]
+        assert store.get("busy").status == "failed"
+        assert store.get("queued").error == "Interrupted by server restart"
+        assert store.get("done").status == "completed"
+
+    def test_eviction_runs_off_the_calling_thread(self, store, monkeypatch):
+        release = threading.Event()
+        evicted = threading.Event()
+
+        def slow_evict():
+            release.wait(1)
+            evicted.set()
+            return []
+
+        monkeypatch.setattr(store, "evict_expired", slow_evict)
+        store.eviction_interval_seconds = 0
+        store.create(JobStatus(job_id="job", status="pending", progress=0.0))
+
+        assert not evicted.is_set()
+        release.set()
+        assert evicted.wait(1)
+
+
+class TestSQLiteJobStore:
+    def test_jobs_survive_reopen(self, tmp_path):
+        path = tmp_path / "jobs.db"
+        SQLiteJobStore(path).create(JobStatus(job_id="persisted", status="pending", progress=0.0))
+
+        assert SQLiteJobStore(path).get("persisted").status == "pending"
+
+    def test_uses_wal_journal(self, tmp_path):
+        store = SQLiteJobStore(tmp_path / "jobs.db")
+        mode = store._connection().execute("PRAGMA journal_mode").fetchone()[0]
+        assert mode == "wal"
+
+
+class TestResultCache:
+    def test_key_depends_on_all_parts(self):
+        base = ResultCache.key("whisper.transcribe", audio="abc", model="base")
+        assert base == ResultCache.key("whisper.transcribe", model="base", audio="abc")
+        assert base != ResultCache.key("whisper.transcribe", audio="abc", model="small")
+
+    def test_put_then_get_counts_hits_and_misses(self, tmp_path):
+        cache = ResultCache(tmp_path, max_bytes=10**6)
+        key = cache.key("test", value=1)
+
+        assert cache.get(key) is None
+        cache.put(key, {"result": {"text": "hello"}})
+        entry = cache.get(key)
+
+        assert entry.meta["result"] == {"text": "hello"}
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_materialize_copies_cached_file(self, tmp_path):
+        cache = ResultCache(tmp_path / "cache", max_bytes=10**6)
+        source = tmp_path / "audio.wav"
+        source.write_bytes(b"RIFF")
+        cache.put("k" * 64, {}, files={"audio.wav": source})
+
+        restored = cache.get("k" * 64).materialize("audio.wav", tmp_path / "out" / "copy.wav")
+
+        assert restored.read_bytes() == b"RIFF"
+
+    def test_materialize_after_eviction_is_a_miss(self, tmp_path):
+        cache = ResultCache(tmp_path / "cache", max_bytes=1500)
+        blob = tmp_path / "blob"
+        blob.write_bytes(b"x" * 1000)
+        cache.put("a" * 64, {}, files={"blob": blob})
+
+        entry = cache.get("a" * 64, restore=True)
+        cache.put("b" * 64, {}, files={"blob": blob})
+
+        assert entry.materialize("blob", tmp_path / "out" / "blob") is None
+        assert cache.stats()["hits"] == 0
+        assert cache.stats()["misses"] == 1
+
+    def test_cross_device_copy_runs_outside_the_cache_lock(self, tmp_path, monkeypatch):
+        import os
+        import shutil
+
+        cache = ResultCache(tmp_path / "cache", max_bytes=10**6)
+        source = tmp_path / "audio.wav"
+        source.write_bytes(b"RIFF")
+        cache.put("k" * 64, {}, files={"audio.wav": source})
+        locked_during_copy = []
+        copy = shutil.copyfileobj
+
+        def fail_link(src, dst):
+            raise OSError("cross-device link")
+
+        def record_copy(src, dst):
+            locked_during_copy.append(cache._lock.locked())
+            copy(src, dst)
+
+        monkeypatch.setattr(os, "link", fail_link)
+        monkeypatch.setattr(shutil, "copyfileobj", record_copy)
+        restored = cache.get("k" * 64, restore=True).materialize("audio.wav", tmp_path / "out" / "copy.wav")
+
+        assert restored.read_bytes() == b"RIFF"
+        assert locked_during_copy == [False]
+        assert cache.stats()["hits"] == 1
+
+    def test_evicts_least_recently_used_entries_over_budget(self, tmp_path):
+        cache = ResultCache(tmp_path / "cache", max_bytes=2500)
+        blob = tmp_path / "blob"
+        blob.write_bytes(b"x" * 1000)
+        first, second, third = (cache.key("test", n=n) for n in range(3))
+
+        cache.put(first, {}, files={"blob": blob})
+        cache.put(second, {}, files={"blob": blob})
+        cache.get(first)
+        cache.put(third, {}, files={"blob": blob})
+
+        assert cache.get(second) is None
+        assert cache.get(first) is not None
+        assert cache.get(third) is not None
+
+    def test_index_is_rebuilt_from_disk(self, tmp_path):
+        ResultCache(tmp_path, max_bytes=10**6).put("a" * 64, {"result": 1})
+        assert ResultCache(tmp_path, max_bytes=10**6).stats()["entries"] == 1
+
+
+class TestRunStages:
+    def test_independent_stages_run_concurrently(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def meet(results):
+            barrier.wait()
+            return "done"
+
+        results = run_stages([
+            Stage("prompt", lambda results: "a prompt"),
+            Stage("video", meet, deps=("prompt",)),
+            Stage("voiceover", meet, deps=("prompt",)),
+            Stage("mux", lambda results: (results["video"], results["voiceover"]), deps=("video", "voiceover")),
+        ])
+
+        assert results["mux"] == ("done", "done")
+
+    def test_failure_skips_dependents_and_reports_stage(self):
+        events = []
+
+        def fail(results):
+            raise RuntimeError("boom")
+
+        with pytest.raises(StageFailedError) as exc_info:
+            run_stages(
+                [Stage("video", fail), Stage("mux", lambda results: None, deps=("video",))],
+                on_stage=lambda name, status: events.append((name, status)),
+            )
+
+        assert exc_info.value.stage == "video"
+        assert ("video", "failed") in events
+        assert ("mux", "skipped") in events
+
+    def test_failure_stops_running_siblings_before_returning(self):
+        from backend.core.pipeline import raise_if_cancelled
+
+        started = threading.Event()
+        steps = []
+
+        def render(results):
+            started.set()
+            for step in range(200):
+                time.sleep(0.01)
+                steps.append(step)
+                raise_if_cancelled()
+
+        def fail(results):
+            started.wait(5)
+            raise RuntimeError("boom")
+
+        with pytest.raises(StageFailedError):
+            run_stages([Stage("video", render), Stage("voiceover", fail)])
+        finished = len(steps)
+        time.sleep(0.05)
+
+        assert finished < 200
+        assert len(steps) == finished
+
+    def test_rejects_cycles(self):
+        with pytest.raises(ValueError, match="cycle"):
+            run_stages([
+                Stage("a", lambda results: None, deps=("b",)),
+                Stage("b", lambda results: None, deps=("a",)),
+            ])
+
+
+class TestModelManager:
+    @pytest.fixture
+    def manager(self):
+        from backend.core.model_manager import ModelManager
+
+        manager = ModelManager(ram_budget_mb=1000, prefetch=False)
+        manager.loaded = set()
+
+        def register(name: str, footprint_mb: int = 400) -> None:
+            manager.register(
+                name,
+                device="cpu",
+                footprint_mb=footprint_mb,
+                load=lambda: manager.loaded.add(name),
+                unload=lambda: manager.loaded.discard(name),
+                is_loaded=lambda: name in manager.loaded,
+            )
+
+        for name in ("whisper", "chatterbox", "opensora"):
+            register(name)
+        return manager
+
+    def use(self, manager, name):
+        with manager.use(name):
+            manager.load(name)
+
+    def test_auto_device_is_not_resolved_before_torch_is_loaded(self):
+        import subprocess
+        import sys
+        from backend.benchmarks.import_time import REPO_ROOT
+
+        script = (
+            "import sys\n"
+            "from backend.core.model_manager import ModelManager\n"
+            "manager = ModelManager(prefetch=False)\n"
+            "manager.register('demo', device='auto', footprint_mb=100,\n"
+            "                 load=lambda: None, unload=lambda: None, is_loaded=lambda: False)\n"
+            "with manager.use('demo'):\n"
+            "    pass\n"
+            "print(manager.stats()['models']['demo']['device'], 'torch' in sys.modules)\n"
+        )
+        result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, cwd=REPO_ROOT, check=True)
+
+        assert result.stdout.split() == ["auto", "False"]
+
+    def test_least_recently_used_model_is_evicted(self, manager):
+        for name in ("whisper", "chatterbox", "opensora"):
+            self.use(manager, name)
+
+        assert manager.loaded == {"chatterbox", "opensora"}
+        stats = manager.stats()
+        assert stats["models"]["whisper"]["unloads"] == 1
+        assert stats["models"]["opensora"]["last_load_seconds"] is not None
+        assert stats["pools"]["cpu"]["used_mb"] == 800
+
+    def test_models_with_queued_jobs_are_kept(self, manager):
+        self.use(manager, "whisper")
+        self.use(manager, "chatterbox")
+        manager.expect(["whisper"])
+
+        self.use(manager, "opensora")
+
+        assert manager.loaded == {"whisper", "opensora"}
+
+    def test_model_in_use_is_never_evicted(self, manager):
+        manager.budgets["cpu"] = 500
+        entered = threading.Event()
+        release = threading.Event()
+        order = []
+
+        def hold_whisper():
+            with manager.use("whisper"):
+                manager.load("whisper")
+                entered.set()
+                release.wait(5)
+                order.append("whisper released")
+
+        holder = threading.Thread(target=hold_whisper)
+        holder.start()
+        entered.wait(5)
+
+        def load_chatterbox():
+            self.use(manager, "chatterbox")
+            order.append("chatterbox loaded")
+
+        waiter = threading.Thread(target=load_chatterbox)
+        waiter.start()
+        time.sleep(0.1)
+        assert manager.loaded == {"whisper"}
+
+        release.set()
+        holder.join(5)
+        waiter.join(5)
+        assert order == ["whisper released", "chatterbox loaded"]
+        assert manager.loaded == {"chatterbox"}
+
+    def test_queued_jobs_prefetch_models(self, manager):
+        manager.prefetch_enabled = True
+        manager.expect(["opensora"])
+
+        for _ in range(100):
+            if "opensora" in manager.loaded:
+                break
+            time.sleep(0.01)
+
+        assert "opensora" in manager.loaded
+        assert manager.stats()["models"]["opensora"]["queued_jobs"] == 1
+
+
+class TestJobProgress:
+    @pytest.fixture
+    def store(self, monkeypatch):
+        import sys
+
+        store = InMemoryJobStore(eviction_interval_seconds=0)
+        monkeypatch.setattr(sys.modules["backend.core.progress"], "job_store", store)
+        return store
+
+    def test_stage_weights_drive_overall_progress_and_eta(self, store):
+        store.create(JobStatus(job_id="job", status="running", progress=0.0))
+        broker = ProgressBroker()
+        tracker = JobProgress("job", {"video": 3.0, "voiceover": 1.0}, min_store_interval=0, broker=broker)
+        tracker.started -= 10
+
+        with tracker.bind("video"):
+            report_progress(0.5, "denoising step 25/50")
+            event = broker.last("job")
+
+        assert event["stage"] == "video"
+        assert event["progress"] == 0.375
+        assert event["eta_seconds"] == pytest.approx(10 * 0.625 / 0.375, abs=0.2)
+        assert event["message"] == "denoising step 25/50"
+        assert store.get("job").progress == 0.75
+
+        tracker.update("voiceover", 1.0)
+        assert store.get("job").progress == 1.0
+
+    def test_report_without_binding_is_ignored(self):
+        report_progress(0.5)
+
+    async def test_subscribers_receive_job_status_changes(self, store):
+        broker = ProgressBroker()
+        store.add_listener(broker.on_job_update)
+        store.create(JobStatus(job_id="job", status="pending", progress=0.0))
+        queue = broker.subscribe("job")
+
+        await asyncio.to_thread(store.update, "job", status="completed", progress=1.0)
+        event = await asyncio.wait_for(queue.get(), 1)
+
+        assert event["type"] == "status"
+        assert event["status"] == "completed"
+        broker.unsubscribe("job", queue)
+
+
+class TestMetrics:
+    def test_histogram_renders_cumulative_buckets(self):
+        registry = MetricsRegistry(prefix="test_")
+        latency = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            latency.observe(value, route="/a")
+
+        text = registry.render()
+
+        assert "# TYPE test_latency_seconds histogram" in text
+        assert 'test_latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+        assert 'test_latency_seconds_bucket{route="/a",le="1"} 2' in text
+        assert 'test_latency_seconds_bucket{route="/a",le="+Inf"} 3' in text
+        assert 'test_latency_seconds_count{route="/a"} 3' in text
+
+    def test_collectors_refresh_gauges_and_labels_are_checked(self):
+        registry = MetricsRegistry(prefix="test_")
+        depth = registry.gauge("queue_depth", "Depth", ("device",))
+        registry.on_collect(lambda: depth.set(7, device="cpu"))
+
+        assert 'test_queue_depth{device="cpu"} 7' in registry.render()
+        with pytest.raises(ValueError):
+            depth.set(1, gpu="0")
+
+
+class TestTracing:
+    def test_pipeline_stages_are_children_of_the_job_span(self, monkeypatch):
+        import sys
+
+        tracer = Tracer()
+        monkeypatch.setattr(sys.modules["backend.core.pipeline"], "tracer", tracer)
+
+        def video(results):
+            with tracer.span("opensora.generate"):
+                return "video.mp4"
+
+        with tracer.span("job.pipeline", trace_id="job-1"):
+            run_stages([Stage("video", video), Stage("mux", lambda results: "final.mp4", deps=("video",))])
+
+        spans = {span["name"]: span for span in tracer.get("job-1")}
+        assert set(spans) == {"job.pipeline", "stage.video", "stage.mux", "opensora.generate"}
+        assert spans["stage.video"]["parent_id"] == spans["job.pipeline"]["span_id"]
+        assert spans["opensora.generate"]["parent_id"] == spans["stage.video"]["span_id"]
+        assert all(span["status"] == "ok" for span in spans.values())
+
+    def test_spans_without_a_trace_are_not_recorded(self):
+        tracer = Tracer()
+        with tracer.span("untraced") as span:
+            assert span is None
+
+
+class TestGpuArbiter:
+    def test_batch_checkpoint_waits_for_interactive_work(self):
+        arbiter = GpuArbiter(max_yield_seconds=5.0)
+        entered = threading.Event()
+        release = threading.Event()
+
+        def interactive():
+            with arbiter.interactive("cuda"):
+                entered.set()
+                release.wait(1)
+
+        thread = threading.Thread(target=interactive)
+        thread.start()
+        entered.wait(1)
+        assert arbiter.should_yield("cuda:0")
+        assert not arbiter.should_yield("cuda:1")
+
+        threading.Timer(0.1, release.set).start()
+        waited = arbiter.checkpoint("cuda:0")
+        thread.join()
+
+        assert 0.05 < waited < 1.0
+        assert arbiter.stats()["yields"] == 1
+        assert arbiter.checkpoint("cuda:0") == 0.0
+
+    def test_unresolved_auto_device_contends_with_every_device(self, monkeypatch):
+        import sys
+
+        monkeypatch.setattr(sys.modules["backend.core.gpu_arbiter"], "loaded_device", lambda device: device)
+        arbiter = GpuArbiter()
+        with arbiter.interactive("auto"):
+            assert arbiter.should_yield("cuda:1")
+        with arbiter.interactive("cuda:1"):
+            assert arbiter.should_yield("auto")
+            assert not arbiter.should_yield("cuda:0")
+
+    def test_yield_is_capped_and_can_be_disabled(self):
+        arbiter = GpuArbiter(max_yield_seconds=0.05)
+        with arbiter.interactive("cpu"):
+            assert arbiter.checkpoint("cpu") < 0.5
+            arbiter.enabled = False
+            assert arbiter.checkpoint("cpu") == 0.0
+
+
+class TestSloTracker:
+    def test_reports_percentiles_and_violations_per_class(self):
+        tracker = SloTracker({"interactive": 100.0, "batch": 1000.0}, window=100)
+        for ms in range(10, 210, 10):
+            tracker.observe("interactive", ms / 1000)
+        tracker.observe("batch", 0.5)
+
+        stats = tracker.stats()
+
+        assert stats["interactive"]["samples"] == 20
+        assert stats["interactive"]["violations"] == 10
+        assert stats["interactive"]["attainment"] == 0.5
+        assert stats["interactive"]["p95_ms"] == pytest.approx(190.5)
+        assert stats["batch"]["violations"] == 0
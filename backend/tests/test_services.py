@@ -1,6 +1,7 @@
 import pytest
 from unittest.mock import patch, MagicMock
 from pathlib import Path
+import shutil
 
 
 class TestWhisperService:
@@ -55,10 +56,9 @@ class TestChatterboxService:
         assert service._model is not None
 
     @patch("chatterbox.tts_turbo.ChatterboxTurboTTS.from_pretrained")
-    @patch("torchaudio.save")
-    def test_chatterbox_synthesize_saves_file(
-        self, mock_save, mock_from_pretrained
-    ):
+    def test_chatterbox_synthesize_saves_file(self, mock_from_pretrained):
+        import sys
+
         mock_model = MagicMock()
         mock_model.sr = 24000
         mock_model.generate.return_value = MagicMock()
@@ -68,13 +68,418 @@ class TestChatterboxService:
 
         service = ChatterboxService()
         output_path = Path("/tmp/test_output.wav")
-        result = service.synthesize("Hello world", output_path)
+        with patch.object(
+            sys.modules["backend.services.chatterbox_service"], "write_wav"
+        ) as mock_write_wav:
+            mock_write_wav.return_value = output_path
+            result = service.synthesize("Hello world", output_path, use_cache=False)
 
         assert result == output_path
-        mock_save.assert_called_once()
+        mock_write_wav.assert_called_once()
+
+
+class TestResultCaching:
+    def test_chatterbox_demo_synthesis_is_served_from_cache(self, tmp_path, monkeypatch):
+        import sys
+        from backend.core.result_cache import ResultCache
+        from backend.services.chatterbox_service import ChatterboxService
+
+        module = sys.modules["backend.services.chatterbox_service"]
+        monkeypatch.setattr(module, "DEMO_MODE", True)
+        monkeypatch.setattr(module, "result_cache", ResultCache(tmp_path / "cache", 10**7))
+        service = ChatterboxService()
+
+        first = service.synthesize("Hello", tmp_path / "first.wav")
+        with patch.object(ChatterboxService, "_synthesize") as mock_synthesize:
+            second = service.synthesize("Hello", tmp_path / "second.wav")
+            bypassed = service.synthesize("Hello", tmp_path / "third.wav", use_cache=False)
+
+        assert second.read_bytes() == first.read_bytes()
+        assert mock_synthesize.call_count == 1
+        assert bypassed == tmp_path / "third.wav"
+
+    def test_whisper_batched_and_unbatched_results_are_cached_separately(self, tmp_path, monkeypatch):
+        import sys
+        from backend.core.result_cache import ResultCache
+        from backend.services.whisper_service import WhisperService
+
+        module = sys.modules["backend.services.whisper_service"]
+        monkeypatch.setattr(module, "result_cache", ResultCache(tmp_path / "cache", 10**7))
+        audio = tmp_path / "speech.wav"
+        audio.write_bytes(b"RIFF")
+        service = WhisperService()
+
+        with patch.object(WhisperService, "_transcribe", return_value={"text": "hi", "segments": []}) as mock_run:
+            for batched in (False, True, True):
+                monkeypatch.setattr(module.settings, "whisper_batch_enabled", batched)
+                service.transcribe(audio)
+
+        assert mock_run.call_count == 2
+
+
+class TestVideoBatchGeneration:
+    @pytest.fixture
+    def service(self, tmp_path, monkeypatch):
+        import sys
+        from backend.core.result_cache import ResultCache
+        from backend.services.opensora_service import OpenSoraService
+
+        module = sys.modules["backend.services.opensora_service"]
+        monkeypatch.setattr(module, "DEMO_MODE", True)
+        monkeypatch.setattr(module, "result_cache", ResultCache(tmp_path / "cache", 10**7))
+        monkeypatch.setattr(module.time, "sleep", lambda seconds: None)
+        monkeypatch.setattr(module.settings, "opensora_batch_size", 2)
+        monkeypatch.setattr(OpenSoraService, "_create_demo_video", lambda self, path, prompt: path.write_bytes(b"mp4"))
+        return OpenSoraService()
+
+    def test_items_are_grouped_by_compatible_settings(self, service, tmp_path):
+        from backend.services.opensora_service import OpenSoraService
+
+        items = [
+            {"prompt": "shot 1", "seed": 1},
+            {"prompt": "shot 2", "seed": 1},
+            {"prompt": "shot 3", "seed": 1},
+            {"prompt": "shot 4", "seed": 1, "num_frames": 33},
+        ]
+        progress = []
+        with patch.object(OpenSoraService, "_generate_batch", wraps=service._generate_batch) as mock_batch:
+            result = service.generate_video_batch(items, tmp_path / "out", on_item=lambda i, r: progress.append(i))
+
+        assert sorted(len(call.args[0]) for call in mock_batch.call_args_list) == [1, 1, 2]
+        assert result["completed"] == 4
+        assert result["batches"] == 3
+        assert sorted(progress) == [0, 1, 2, 3]
+        assert [item["prompt"] for item in result["items"]] == ["shot 1", "shot 2", "shot 3", "shot 4"]
+        assert all(Path(item["video_path"]).exists() for item in result["items"])
+        assert result["videos_per_gpu_hour"] > 0
+
+    def test_seeded_items_are_served_from_cache(self, service, tmp_path):
+        from backend.services.opensora_service import OpenSoraService
+
+        items = [{"prompt": "shot 1", "seed": 1}, {"prompt": "shot 2"}]
+        service.generate_video_batch(items, tmp_path / "first")
+        with patch.object(OpenSoraService, "_generate_batch", wraps=service._generate_batch) as mock_batch:
+            result = service.generate_video_batch(items, tmp_path / "second")
+
+        assert result["items"][0]["cached"] is True
+        assert result["items"][1]["cached"] is False
+        assert [len(call.args[0]) for call in mock_batch.call_args_list] == [1]
+
+    def test_items_with_different_seeds_are_rendered_apart(self, service, tmp_path):
+        from backend.services.opensora_service import OpenSoraService
+
+        items = [{"prompt": "a", "seed": 1}, {"prompt": "b", "seed": 2}, {"prompt": "c", "num_steps": 0}]
+        with patch.object(OpenSoraService, "_generate_batch", wraps=service._generate_batch) as mock_batch:
+            service.generate_video_batch(items, tmp_path / "out")
+
+        chunks = [[item["seed"] for item in call.args[0]] for call in mock_batch.call_args_list]
+        assert sorted(chunks, key=str) == [[1], [2], [None]]
+        assert mock_batch.call_args_list[2].args[0][0]["num_steps"] == 0
+
+    def test_batch_renders_do_not_answer_single_render_cache_lookups(self, service, tmp_path):
+        service.generate_video_batch([{"prompt": "shot", "seed": 7}], tmp_path / "batch")
+
+        result = service.generate_video("shot", tmp_path / "single", seed=7)
+
+        assert result["cached"] is False
+
+    def test_failed_batch_marks_only_its_items(self, service, tmp_path):
+        from backend.services.opensora_service import OpenSoraService
+
+        def flaky(self, items, resolution):
+            if items[0]["num_frames"] == 33:
+                raise RuntimeError("out of memory")
+            return [{"video_path": str(tmp_path / "ok.mp4")} for _ in items]
+
+        items = [{"prompt": "a"}, {"prompt": "b", "num_frames": 33}]
+        with patch.object(OpenSoraService, "_generate_batch", flaky):
+            result = service.generate_video_batch(items, tmp_path / "out")
+
+        assert [item["status"] for item in result["items"]] == ["completed", "failed"]
+        assert result["items"][1]["error"] == "out of memory"
+
+
+class TestDraftVideoGeneration:
+    @pytest.fixture
+    def service(self, tmp_path, monkeypatch):
+        import sys
+        from backend.core.result_cache import ResultCache
+        from backend.services.opensora_service import OpenSoraService
+
+        module = sys.modules["backend.services.opensora_service"]
+        monkeypatch.setattr(module, "DEMO_MODE", True)
+        monkeypatch.setattr(module, "result_cache", ResultCache(tmp_path / "cache", 10**7))
+        monkeypatch.setattr(module.time, "sleep", lambda seconds: None)
+        monkeypatch.setattr(OpenSoraService, "_create_demo_video", lambda self, path, prompt: path.write_bytes(b"mp4"))
+        return OpenSoraService()
+
+    def test_draft_uses_cheap_settings_and_pins_a_seed(self, service, tmp_path):
+        from backend.core import settings
+
+        with patch.object(service, "_generate_video", wraps=service._generate_video) as mock_generate:
+            draft = service.generate_draft("A red fox", tmp_path / "draft")
+
+        prompt, _, resolution, num_frames, seed, num_steps, *_ = mock_generate.call_args.args
+        assert (resolution, num_frames, num_steps) == (
+            settings.opensora_draft_resolution,
+            settings.opensora_draft_num_frames,
+            settings.opensora_draft_num_steps,
+        )
+        assert seed is not None
+        assert draft["quality"] == "draft"
+        assert draft["seed"] == seed
+
+    def test_promote_reuses_prompt_and_seed_at_full_quality(self, service, tmp_path):
+        from backend.core import settings
+
+        draft = service.generate_draft("A red fox", tmp_path / "draft", seed=7, guidance_scale=5.0)
+        before = service.generation_stats()
+        with patch.object(service, "_generate_video", wraps=service._generate_video) as mock_generate:
+            full = service.promote(draft, tmp_path / "full")
+
+        prompt, _, resolution, num_frames, seed, num_steps, guidance_scale, _ = mock_generate.call_args.args
+        assert (prompt, seed, guidance_scale) == ("A red fox", 7, 5.0)
+        assert (resolution, num_frames, num_steps) == (settings.opensora_resolution, settings.opensora_num_frames, 50)
+        assert full["quality"] == "full"
+        assert full["draft_video_path"] == draft["video_path"]
+
+        stats = service.generation_stats()
+        assert stats["promoted"] == before["promoted"] + 1
+        assert stats["accepted"] == before["accepted"] + 1
+        assert stats["accepted_per_gpu_hour"] is not None
+
+
+class TestVoiceProfiles:
+    @pytest.fixture
+    def registry(self, tmp_path, monkeypatch):
+        import sys
+        from backend.services.voice_profiles import VoiceProfileRegistry
+
+        registry = VoiceProfileRegistry(tmp_path / "voices", max_loaded=1)
+        monkeypatch.setattr(sys.modules["backend.services.chatterbox_service"], "voice_profiles", registry)
+        return registry
+
+    def test_conditionals_are_cached_in_memory_and_on_disk(self, registry, tmp_path):
+        from backend.services.voice_profiles import VoiceProfileRegistry
+
+        def save(path):
+            path.write_text("conds")
+            return "conds"
+
+        first = registry.create("turbo", "a" * 64, "Narrator", save)
+        second = registry.create("turbo", "b" * 64, None, save)
+        loads = []
+
+        def load(path):
+            loads.append(path)
+            return path.read_text()
+
+        assert registry.conditionals(second.profile_id, load) == "conds"
+        assert registry.conditionals(first.profile_id, load) == "conds"
+        assert loads == [registry.conditionals_path(first.profile_id)]
+
+        cold = VoiceProfileRegistry(tmp_path / "voices")
+        assert [p.name for p in cold.list_profiles()] == ["Narrator", None]
+        assert cold.get("../etc") is None
+
+    def test_voice_reference_conditioning_is_computed_once(self, registry, tmp_path, monkeypatch):
+        import sys
+        import torch
+        from backend.services.chatterbox_service import ChatterboxService
+
+        module = sys.modules["backend.services.chatterbox_service"]
+        monkeypatch.setattr(module, "DEMO_MODE", False)
+        monkeypatch.setattr(module, "result_cache", MagicMock(enabled=False))
+
+        model = MagicMock(sr=24000)
+        model.generate.return_value = torch.zeros(1, 2400)
+        model.conds.save.side_effect = lambda path: Path(path).write_bytes(b"conds")
+        service = ChatterboxService()
+        monkeypatch.setattr(service, "_model", model)
+
+        reference = tmp_path / "narrator.wav"
+        reference.write_bytes(b"RIFF voice")
+        service.synthesize("One.", tmp_path / "one.wav", voice_reference=reference)
+        service.synthesize("Two.", tmp_path / "two.wav", voice_reference=reference)
+
+        model.prepare_conditionals.assert_called_once_with(str(reference))
+        assert "audio_prompt_path" not in model.generate.call_args.kwargs
+        assert len(registry.list_profiles()) == 1
+
+    def test_profile_conditionals_do_not_leak_into_default_voice(self, registry, tmp_path, monkeypatch):
+        import sys
+        import torch
+        from backend.services.chatterbox_service import ChatterboxService
+
+        module = sys.modules["backend.services.chatterbox_service"]
+        monkeypatch.setattr(module, "DEMO_MODE", False)
+        monkeypatch.setattr(module, "result_cache", MagicMock(enabled=False))
+
+        builtin = MagicMock(name="builtin_conds")
+        used = []
+        model = MagicMock(sr=24000)
+        model.generate.side_effect = lambda text, **kwargs: used.append(model.conds) or torch.zeros(1, 2400)
+        model.conds.save.side_effect = lambda path: Path(path).write_bytes(b"conds")
+        service = ChatterboxService()
+        monkeypatch.setattr(service, "_model", model)
+        monkeypatch.setattr(service, "_builtin_conds", builtin)
+
+        reference = tmp_path / "narrator.wav"
+        reference.write_bytes(b"RIFF voice")
+        service.synthesize("One.", tmp_path / "one.wav", voice_reference=reference)
+        service.synthesize("Two.", tmp_path / "two.wav")
+
+        assert used[0] is not builtin
+        assert used[1] is builtin
+
+    def test_recreating_a_profile_updates_its_name(self, registry, tmp_path, monkeypatch):
+        import sys
+        from backend.services.chatterbox_service import ChatterboxService
+
+        monkeypatch.setattr(sys.modules["backend.services.chatterbox_service"], "DEMO_MODE", True)
+        reference = tmp_path / "narrator.wav"
+        reference.write_bytes(b"RIFF voice")
+        service = ChatterboxService()
+
+        first = service.create_voice_profile(reference, "Narrator")
+        renamed = service.create_voice_profile(reference, "Storyteller")
+        unnamed = service.create_voice_profile(reference)
+
+        assert renamed.profile_id == first.profile_id
+        assert registry.get(first.profile_id).name == "Storyteller"
+        assert unnamed.name == "Storyteller"
+
+    def test_builtin_voices_are_listed_without_loading_the_model(self, monkeypatch):
+        import sys
+        from backend.services.chatterbox_service import ChatterboxService
+
+        module = sys.modules["backend.services.chatterbox_service"]
+        monkeypatch.setattr(module, "DEMO_MODE", False)
+        service = ChatterboxService()
+        monkeypatch.setattr(service, "_model", None)
+        monkeypatch.setattr(service, "_builtin_conds", None)
+
+        with patch.object(module.model_manager, "load") as mock_load:
+            assert service.list_builtin_voices() == []
+
+        mock_load.assert_not_called()
+
+
+class TestWarmup:
+    def test_failed_model_keeps_service_unready(self):
+        from backend.services import warmup
+
+        def broken():
+            raise RuntimeError("weights missing")
+
+        state = warmup.WarmupState()
+        with patch.dict(warmup.WARMUPS, {"whisper": lambda: None, "chatterbox": broken}):
+            ready = state.run(["whisper", "chatterbox"])
+
+        snapshot = state.snapshot()
+        assert ready is False
+        assert snapshot["status"] == "failed"
+        assert snapshot["models"]["whisper"]["status"] == "ready"
+        assert "weights missing" in snapshot["models"]["chatterbox"]["error"]
+
+    def test_whisper_warmup_runs_a_dummy_window(self, monkeypatch):
+        import sys
+        from backend.services.whisper_service import WhisperService
+
+        monkeypatch.setattr(sys.modules["backend.services.whisper_service"], "DEMO_MODE", True)
+        with patch.object(WhisperService, "transcribe_window", wraps=WhisperService().transcribe_window) as mock_window:
+            WhisperService().warmup()
+
+        assert len(mock_window.call_args.args[0]) == 16000
+
+
+class TestOpenSoraWorker:
+    @pytest.fixture
+    def worker(self):
+        from backend.services.opensora_worker import OpenSoraWorkerClient
+
+        worker = OpenSoraWorkerClient(backend="demo", startup_timeout=60, health_interval=3600)
+        yield worker
+        worker.stop()
+
+    def test_worker_stays_resident_between_health_checks(self, worker):
+        worker.start()
+        pid = worker.pid
+
+        health = worker.health()
+
+        assert health["alive"] is True
+        assert health["responsive"] is True
+        assert worker.pid == pid
+
+    def test_worker_restarts_after_crash(self, worker):
+        worker.start()
+        worker._process.kill()
+        worker._process.join()
+
+        worker.start()
+
+        assert worker.is_alive()
+        assert worker.restarts == 1
+
+    def test_cancelled_request_does_not_respawn_worker(self, tmp_path):
+        from backend.services.opensora_worker import OpenSoraWorkerClient
+
+        worker = OpenSoraWorkerClient(
+            backend="demo",
+            options={"cooperative_yield": True},
+            startup_timeout=60,
+            health_interval=3600,
+        )
+
+        def cancel(step, total):
+            raise KeyboardInterrupt
+
+        try:
+            worker.start()
+            pid = worker.pid
+            with pytest.raises(KeyboardInterrupt):
+                worker.generate({"prompt": "A red fox", "output_dir": str(tmp_path), "num_steps": 3}, on_progress=cancel)
+
+            worker.start()
+
+            assert worker.pid == pid
+            assert worker.restarts == 0
+            assert worker.health()["responsive"] is True
+        finally:
+            worker.stop()
+
+    @pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+    def test_worker_generates_demo_video(self, worker, tmp_path):
+        result = worker.generate({"prompt": "A red fox", "output_dir": str(tmp_path)})
+
+        assert Path(result["video_path"]).exists()
+        assert worker.jobs_served == 1
 
 
 class TestOpenSoraService:
+    def test_run_inference_reports_each_tqdm_step_as_it_arrives(self, monkeypatch, tmp_path):
+        import sys
+        import time
+        from backend.services.opensora_service import run_inference
+
+        module = sys.modules["backend.services.opensora_service"]
+        steps = []
+        started = time.monotonic()
+        monkeypatch.setattr(module, "report_denoising_step", lambda step, total: steps.append((step, time.monotonic())))
+        script = (
+            "import sys, time\n"
+            "for i in range(1, 4):\n"
+            "    sys.stderr.write(f'\\r{i}/3 [00:01<00:01]'); sys.stderr.flush(); time.sleep(0.2)\n"
+        )
+
+        returncode, tail = run_inference([sys.executable, "-c", script], tmp_path, None)
+
+        assert returncode == 0
+        assert [step for step, _ in steps] == [1, 2, 3]
+        assert steps[0][1] - started < 0.15
+        assert tail.splitlines()[-1] == "3/3 [00:01<00:01]"
+
     @patch("subprocess.run")
     def test_opensora_check_installation(self, mock_run):
         mock_run.return_value = MagicMock(returncode=0)
@@ -84,6 +489,29 @@ class TestOpenSoraService:
         service = OpenSoraService()
         assert service._initialized is True
 
+    def test_drafts_share_the_resident_worker(self, monkeypatch, tmp_path):
+        import sys
+        from concurrent.futures import ThreadPoolExecutor
+        from backend.services.opensora_service import OpenSoraService
+
+        module = sys.modules["backend.services.opensora_service"]
+        client = MagicMock()
+        client.return_value.generate.return_value = {"video_path": str(tmp_path / "v.mp4")}
+        monkeypatch.setattr(module, "OpenSoraWorkerClient", client)
+        monkeypatch.setattr(module.settings, "opensora_worker_mode", "persistent")
+        monkeypatch.setattr(module.model_manager, "load", lambda name: None)
+        monkeypatch.setattr(OpenSoraService, "_worker", None)
+        service = OpenSoraService()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            workers = set(pool.map(lambda _: service.get_worker(), range(8)))
+        for resolution in ("256px", "768px"):
+            service._generate_video("fox", tmp_path, resolution, 33, 1, 10, 7.5, None)
+
+        assert len(workers) == 1
+        assert client.call_count == 1
+        assert [call.args[0]["resolution"] for call in client.return_value.generate.call_args_list] == ["256px", "768px"]
+
     @patch("torch.cuda.is_available")
     @patch("torch.cuda.get_device_properties")
     @patch("torch.cuda.get_device_name")
@@ -110,3 +538,199 @@ class TestOpenSoraService:
         assert result["available"] is True
         assert result["gpu_name"] == "NVIDIA GeForce RTX 4090"
         assert result["total_memory_gb"] == 24.0
+
+
+class TestWhisperBatcher:
+    def test_concurrent_requests_share_a_batch(self):
+        import numpy as np
+        from concurrent.futures import ThreadPoolExecutor
+        from backend.services.whisper_batcher import WhisperBatcher, SAMPLE_RATE
+
+        batches = []
+
+        def decode(windows, language, task):
+            batches.append(len(windows))
+            return [(f"window {i}", "en") for i in range(len(windows))]
+
+        batcher = WhisperBatcher(decode, max_batch_size=4, window_ms=200)
+        audio = np.zeros(SAMPLE_RATE * 5, dtype=np.float32)
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(lambda _: batcher.transcribe(audio, timeout=5), range(4)))
+
+        assert batches == [4]
+        assert all(result["language"] == "en" for result in results)
+        assert batcher.stats()["mean_occupancy"] == 1.0
+
+    def test_long_audio_is_split_into_30_second_windows(self):
+        import numpy as np
+        from backend.services.whisper_batcher import WhisperBatcher, SAMPLE_RATE, WINDOW_SAMPLES
+
+        seen = []
+
+        def decode(windows, language, task):
+            seen.extend(len(w) for w in windows)
+            return [("hello", language) for _ in windows]
+
+        batcher = WhisperBatcher(decode, max_batch_size=8, window_ms=1)
+        result = batcher.transcribe(np.zeros(SAMPLE_RATE * 65, dtype=np.float32), language="en", timeout=5)
+
+        assert seen == [WINDOW_SAMPLES] * 3
+        assert [(s["start"], s["end"]) for s in result["segments"]] == [(0.0, 30.0), (30.0, 60.0), (60.0, 65.0)]
+
+    def test_decode_errors_propagate_to_callers(self):
+        import numpy as np
+        from backend.services.whisper_batcher import WhisperBatcher
+
+        def decode(windows, language, task):
+            raise RuntimeError("CUDA out of memory")
+
+        batcher = WhisperBatcher(decode, window_ms=1)
+        with pytest.raises(RuntimeError, match="out of memory"):
+            batcher.transcribe(np.zeros(16000, dtype=np.float32), timeout=5)
+
+
+class TestStreamingTranscriber:
+    def test_emits_segments_per_window_with_global_offsets(self):
+        import numpy as np
+        from backend.services.whisper_stream import StreamingTranscriber, iter_audio_chunks, stream_segments
+
+        def transcribe_window(audio, language, prompt):
+            return {
+                "language": "en",
+                "segments": [{"start": 0.0, "end": len(audio) / 16000, "text": " chunk"}],
+            }
+
+        transcriber = StreamingTranscriber(transcribe_window, window_seconds=2.0)
+        audio = np.zeros(16000 * 5, dtype=np.float32)
+        segments = list(stream_segments(transcriber, iter_audio_chunks(audio, 0.5)))
+
+        assert [(s["start"], s["end"]) for s in segments] == [(0.0, 2.0), (2.0, 4.0), (4.0, 5.0)]
+        assert transcriber.detected_language == "en"
+
+    def test_carries_unfinished_last_segment_into_next_window(self):
+        import numpy as np
+        from backend.services.whisper_stream import StreamingTranscriber
+
+        calls = []
+
+        def transcribe_window(audio, language, prompt):
+            calls.append(len(audio))
+            return {
+                "segments": [
+                    {"start": 0.0, "end": 1.2, "text": "first"},
+                    {"start": 1.2, "end": 2.0, "text": "cut"},
+                ],
+            }
+
+        transcriber = StreamingTranscriber(transcribe_window, window_seconds=2.0)
+        finalized = transcriber.feed(np.zeros(32000, dtype=np.float32))
+
+        assert [s["text"] for s in finalized] == ["first"]
+        assert transcriber.flush()[0]["start"] == 1.2
+
+    def test_pcm16_to_float_resamples_to_16k(self):
+        import numpy as np
+        from backend.services.whisper_stream import pcm16_to_float
+
+        pcm = (np.ones(48000, dtype="<i2") * 16384).tobytes()
+        samples = pcm16_to_float(pcm, sample_rate=48000)
+
+        assert len(samples) == 16000
+        assert samples[0] == pytest.approx(0.5)
+
+
+    def test_resampler_keeps_state_across_frames(self):
+        import numpy as np
+        from backend.services.whisper_stream import PcmResampler, pcm16_to_float
+
+        t = np.arange(44100) / 44100
+        pcm = (np.sin(2 * np.pi * 440 * t) * 16000).astype("<i2").tobytes()
+        whole = pcm16_to_float(pcm, sample_rate=44100)
+
+        resampler = PcmResampler(44100)
+        framed = np.concatenate([resampler.feed(pcm[start:start + 883]) for start in range(0, len(pcm), 883)])
+
+        assert len(framed) == len(whole) == 16000
+        np.testing.assert_allclose(framed, whole, atol=1e-6)
+
+
+class TestWhisperVad:
+    @staticmethod
+    def speech_between_silence():
+        import numpy as np
+
+        t = np.arange(16000 * 2) / 16000
+        tone = (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+        silence = np.zeros(16000 * 3, dtype=np.float32)
+        return np.concatenate([silence, tone, silence, tone, silence])
+
+    def test_energy_vad_finds_speech_regions(self):
+        from backend.services.whisper_vad import detect_speech
+
+        regions = detect_speech(self.speech_between_silence(), pad_ms=0)
+
+        assert [(start / 16000, end / 16000) for start, end in regions] == [
+            pytest.approx((3.0, 5.0), abs=0.05),
+            pytest.approx((8.0, 10.0), abs=0.05),
+        ]
+
+    def test_packed_timestamps_map_back_to_the_original_timeline(self):
+        from backend.services.whisper_vad import pack_speech, remap_segments
+
+        audio = self.speech_between_silence()
+        packed, timeline = pack_speech(audio, [(48000, 80000), (128000, 160000)])
+        segments = remap_segments(
+            [{"start": 0.5, "end": 2.0, "text": "one"}, {"start": 2.0, "end": 3.5, "text": "two"}],
+            timeline,
+        )
+
+        assert len(packed) == 64000
+        assert timeline.speech_seconds == 4.0
+        assert [(s["start"], s["end"]) for s in segments] == [(3.5, 5.0), (8.0, 9.5)]
+
+    def test_transcribe_decodes_only_speech(self, monkeypatch):
+        import sys
+        from backend.services.whisper_service import WhisperService
+
+        whisper_module = sys.modules["backend.services.whisper_service"]
+        monkeypatch.setattr(whisper_module, "DEMO_MODE", False)
+        monkeypatch.setattr(whisper_module.settings, "whisper_vad", "energy")
+        monkeypatch.setattr(whisper_module.settings, "whisper_batch_enabled", False)
+
+        service = WhisperService()
+        model = MagicMock()
+        model.transcribe.return_value = {
+            "text": " hello",
+            "language": "en",
+            "segments": [{"id": 0, "start": 0.0, "end": 1.0, "text": " hello"}],
+        }
+        monkeypatch.setattr(service, "_model", model)
+        monkeypatch.setattr(service, "load_audio", lambda path: self.speech_between_silence())
+
+        result = service.transcribe("speech.wav", use_cache=False)
+
+        decoded = model.transcribe.call_args.args[0]
+        assert len(decoded) < 16000 * 5
+        assert result["segments"][0]["start"] == pytest.approx(2.8, abs=0.05)
+
+
+class TestStreamingSynthesis:
+    def test_split_sentences_breaks_on_sentence_and_long_clauses(self):
+        from backend.services.chatterbox_service import split_sentences
+
+        assert split_sentences("Hello there. How are you? Fine!") == ["Hello there.", "How are you?", "Fine!"]
+        long_sentence = ", ".join(["word " * 10] * 6).strip()
+        assert all(len(chunk) <= 120 for chunk in split_sentences(long_sentence, max_chars=120))
+
+    @pytest.mark.parametrize("lookahead", [0, 2])
+    def test_stream_yields_one_chunk_per_sentence_in_order(self, monkeypatch, lookahead):
+        import sys
+        from backend.services.chatterbox_service import ChatterboxService
+
+        monkeypatch.setattr(sys.modules["backend.services.chatterbox_service"], "DEMO_MODE", True)
+        service = ChatterboxService()
+
+        chunks = list(service.synthesize_stream("One. Three.", lookahead=lookahead))
+
+        assert chunks == [service._demo_pcm("One."), service._demo_pcm("Three.")]
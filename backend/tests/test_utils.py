@@ -0,0 +1,443 @@
+import pytest
+import hashlib
+import io
+import time
+import wave
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+from backend.utils.upload import (
+    RequestSizeLimitMiddleware,
+    stream_upload_to_disk,
+    parse_wav_byte_rate,
+    UploadLimitError,
+)
+
+
+def make_wav(seconds: float, sample_rate: int = 16000) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(b"\x00\x00" * int(sample_rate * seconds))
+    return buffer.getvalue()
+
+
+class TestStreamUpload:
+    async def test_writes_file_and_hashes_in_chunks(self, tmp_path):
+        content = b"x" * 10_000
+        upload = UploadFile(file=io.BytesIO(content), filename="data.bin")
+
+        stored = await stream_upload_to_disk(
+            upload, tmp_path / "out.bin", max_bytes=20_000, chunk_size=1024
+        )
+
+        assert stored.path.read_bytes() == content
+        assert stored.size == len(content)
+        assert stored.sha256 == hashlib.sha256(content).hexdigest()
+
+    async def test_rejects_oversized_upload_and_removes_partial_file(self, tmp_path):
+        upload = UploadFile(file=io.BytesIO(b"x" * 5000), filename="data.bin")
+
+        with pytest.raises(UploadLimitError):
+            await stream_upload_to_disk(
+                upload, tmp_path / "out.bin", max_bytes=4096, chunk_size=1024
+            )
+
+        assert not (tmp_path / "out.bin").exists()
+
+    async def test_rejects_wav_longer_than_duration_limit(self, tmp_path):
+        upload = UploadFile(file=io.BytesIO(make_wav(3.0)), filename="speech.wav")
+
+        with pytest.raises(UploadLimitError, match="seconds"):
+            await stream_upload_to_disk(
+                upload, tmp_path / "speech.wav", max_bytes=10**7, max_duration_seconds=1.0
+            )
+
+    async def test_accepts_wav_within_duration_limit(self, tmp_path):
+        upload = UploadFile(file=io.BytesIO(make_wav(0.5)), filename="speech.wav")
+
+        stored = await stream_upload_to_disk(
+            upload, tmp_path / "speech.wav", max_bytes=10**7, max_duration_seconds=1.0
+        )
+
+        assert stored.path.exists()
+
+    def size_limited_app(self, max_bytes):
+        app = FastAPI()
+        app.state.handled = 0
+
+        @app.post("/upload")
+        async def upload(file: UploadFile = File(...)):
+            app.state.handled += 1
+            return {"size": file.size}
+
+        app.add_middleware(RequestSizeLimitMiddleware, max_bytes=max_bytes)
+        return app
+
+    def test_rejects_oversized_content_length_before_parsing_body(self):
+        app = self.size_limited_app(1024)
+
+        response = TestClient(app).post("/upload", files={"file": ("big.bin", b"x" * 4096)})
+
+        assert response.status_code == 413
+        assert app.state.handled == 0
+
+    def test_rejects_chunked_body_once_limit_is_crossed(self):
+        app = self.size_limited_app(1024)
+
+        def body():
+            for _ in range(8):
+                yield b"x" * 512
+
+        response = TestClient(app).post(
+            "/upload",
+            content=body(),
+            headers={"content-type": "multipart/form-data; boundary=xyz"},
+        )
+
+        assert response.status_code == 413
+        assert app.state.handled == 0
+
+    def test_parse_wav_byte_rate_reads_fmt_and_data_size(self):
+        byte_rate, declared = parse_wav_byte_rate(make_wav(1.0)[:4096])
+        assert byte_rate == 32000
+        assert declared == 32000
+
+
+class TestAudioWriter:
+    def test_demo_tone_matches_scalar_formula(self):
+        from backend.utils.audio import demo_tone
+
+        expected = [int(32767 * 0.1 * (i % 100) / 100) for i in range(1000)]
+        assert demo_tone(1000).tolist() == expected
+
+    def test_write_wav_writes_all_frames_in_one_file(self, tmp_path):
+        import numpy as np
+        from backend.utils.audio import write_wav
+
+        path = write_wav(tmp_path / "tone.wav", np.linspace(-1.0, 1.0, 2400, dtype=np.float32), 24000)
+
+        with wave.open(str(path), "rb") as wav_file:
+            assert wav_file.getframerate() == 24000
+            assert wav_file.getsampwidth() == 2
+            frames = np.frombuffer(wav_file.readframes(2400), dtype="<i2")
+        assert frames[0] == -32767
+        assert frames[-1] == 32767
+
+    def test_wav_stream_header_is_parseable(self):
+        from backend.utils.audio import wav_stream_header
+        from backend.utils.upload import parse_wav_byte_rate
+
+        assert parse_wav_byte_rate(wav_stream_header(24000)) == (48000, None)
+
+
+FFPROBE_OUTPUT = {
+    "streams": [
+        {
+            "index": 0,
+            "codec_type": "video",
+            "codec_name": "h264",
+            "width": 256,
+            "height": 256,
+            "avg_frame_rate": "30000/1001",
+            "nb_frames": "90",
+            "duration": "3.003",
+        },
+        {
+            "index": 1,
+            "codec_type": "audio",
+            "codec_name": "aac",
+            "sample_rate": "24000",
+            "channels": 1,
+            "duration": "2.5",
+        },
+    ],
+    "format": {"format_name": "mov,mp4,m4a,3gp,3g2,mj2", "duration": "3.003", "size": "1024"},
+}
+
+
+class TestMediaProbe:
+    def test_parse_probe_output_reads_all_streams(self):
+        from backend.utils.probe import parse_probe_output
+
+        info = parse_probe_output(FFPROBE_OUTPUT, "clip.mp4")
+
+        assert info.duration == pytest.approx(3.003)
+        assert info.video.width == 256
+        assert info.video.fps == pytest.approx(29.97, rel=1e-3)
+        assert info.audio.sample_rate == 24000
+        assert info.audio.channels == 1
+
+    def test_probe_media_runs_ffprobe_once_per_file_version(self, tmp_path):
+        import json
+        from unittest.mock import patch, MagicMock
+        from backend.utils.probe import probe_media
+
+        clip = tmp_path / "clip.mp4"
+        clip.write_bytes(b"video")
+        completed = MagicMock(returncode=0, stdout=json.dumps(FFPROBE_OUTPUT).encode())
+
+        with patch("backend.utils.probe.media_runner.run_sync", return_value=completed) as mock_run:
+            first = probe_media(clip)
+            second = probe_media(clip)
+            clip.write_bytes(b"re-encoded video")
+            probe_media(clip)
+
+        assert first is second
+        assert mock_run.call_count == 2
+
+    async def test_probe_media_async_shares_the_cache(self, tmp_path):
+        import json
+        from unittest.mock import patch, MagicMock
+        from backend.utils.probe import probe_media, probe_media_async
+
+        clip = tmp_path / "clip.mp4"
+        clip.write_bytes(b"video")
+        completed = MagicMock(returncode=0, stdout=json.dumps(FFPROBE_OUTPUT).encode())
+
+        with patch("backend.utils.probe.media_runner.run_sync", return_value=completed):
+            sync_info = probe_media(clip)
+        with patch("backend.utils.probe.media_runner.run") as mock_exec:
+            async_info = await probe_media_async(clip)
+
+        assert async_info is sync_info
+        mock_exec.assert_not_called()
+
+
+class TestMediaRunner:
+    @pytest.fixture
+    def runner(self):
+        from backend.utils.ffmpeg import MediaRunner
+
+        return MediaRunner(max_concurrency=2)
+
+    def test_failed_command_raises_structured_error(self, runner):
+        import sys
+        from backend.utils.ffmpeg import FFmpegError
+
+        cmd = [sys.executable, "-c", "import sys; sys.stderr.write('bad input\\n'); sys.exit(3)"]
+        with pytest.raises(FFmpegError) as excinfo:
+            runner.run_sync(cmd)
+
+        assert excinfo.value.returncode == 3
+        assert "bad input" in excinfo.value.stderr
+        assert runner.stats()["failed"] == 1
+
+    def test_missing_binary_raises_structured_error(self, runner):
+        from backend.utils.ffmpeg import FFmpegError
+
+        with pytest.raises(FFmpegError, match="not found"):
+            runner.run_sync(["definitely-not-ffmpeg-binary", "-version"])
+
+    def test_timeout_kills_the_child(self, runner):
+        import sys
+        import time
+        from backend.utils.ffmpeg import FFmpegTimeoutError
+
+        started = time.perf_counter()
+        with pytest.raises(FFmpegTimeoutError):
+            runner.run_sync([sys.executable, "-c", "import time; time.sleep(30)"], timeout=0.5)
+
+        assert time.perf_counter() - started < 10
+        assert runner.stats()["active"] == 0
+
+    async def test_cancelling_the_caller_kills_the_child(self, runner, tmp_path):
+        import asyncio
+        import os
+        import sys
+
+        pid_file = tmp_path / "pid"
+        script = f"import os, time; open({str(pid_file)!r}, 'w').write(str(os.getpid())); time.sleep(30)"
+        task = asyncio.create_task(runner.run([sys.executable, "-c", script]))
+        while not pid_file.exists() or not pid_file.read_text():
+            await asyncio.sleep(0.05)
+
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        for _ in range(100):
+            if runner.stats()["active"] == 0:
+                break
+            await asyncio.sleep(0.05)
+
+        with pytest.raises(ProcessLookupError):
+            os.kill(int(pid_file.read_text()), 0)
+
+    def test_concurrency_is_bounded(self, runner, tmp_path):
+        import sys
+        from concurrent.futures import ThreadPoolExecutor
+
+        script = (
+            "import os, time, sys; d = sys.argv[1]; p = os.path.join(d, str(os.getpid())); "
+            "open(p, 'w').close(); print(len(os.listdir(d))); time.sleep(0.3); os.remove(p)"
+        )
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            results = list(pool.map(
+                lambda _: runner.run_sync([sys.executable, "-c", script, str(tmp_path)]),
+                range(6),
+            ))
+
+        assert max(int(result.stdout) for result in results) <= 2
+
+    def test_progress_is_parsed_from_the_progress_pipe(self, runner):
+        import sys
+        from backend.utils.ffmpeg import with_progress_pipe
+
+        script = (
+            "print('frame=24\\nfps=48.0\\nout_time_us=1000000\\nspeed=2.0x\\nprogress=continue'); "
+            "print('frame=48\\nout_time_us=2000000\\nprogress=end')"
+        )
+        updates = []
+        runner.run_sync([sys.executable, "-c", script], on_progress=updates.append)
+
+        assert [u.out_time_seconds for u in updates] == [1.0, 2.0]
+        assert updates[0].speed == 2.0
+        assert updates[-1].done is True
+        assert with_progress_pipe(["ffmpeg", "-i", "in.mp4"])[1:4] == ["-progress", "pipe:1", "-nostats"]
+
+
+class TestMuxCommand:
+    @pytest.fixture
+    def clip(self):
+        from backend.utils.probe import MediaInfo, StreamInfo
+
+        stream = StreamInfo(index=0, codec_type="video", codec_name="h264", duration=4.0, fps=24.0, frame_count=96)
+        return MediaInfo(path="clip.mp4", duration=4.0, format_name="mp4", size=1, streams=(stream,))
+
+    @pytest.fixture
+    def voiceover(self):
+        from backend.utils.probe import MediaInfo, StreamInfo
+
+        stream = StreamInfo(index=0, codec_type="audio", codec_name="pcm_s16le", duration=30.0, sample_rate=24000)
+        return MediaInfo(path="voice.wav", duration=30.0, format_name="wav", size=1, streams=(stream,))
+
+    def test_loop_stream_copies_and_trims_to_audio(self, clip, voiceover):
+        from backend.utils.mux import build_mux_command
+
+        cmd = build_mux_command("clip.mp4", "voice.wav", "out.mp4", clip, voiceover, mode="loop")
+
+        assert cmd[cmd.index("-stream_loop") + 1] == "-1"
+        assert cmd[cmd.index("-c:v") + 1] == "copy"
+        assert cmd[cmd.index("-c:a") + 1] == "aac"
+        assert cmd[cmd.index("-t") + 1] == "30.000"
+        assert "-shortest" not in cmd
+        assert "frag_keyframe" in cmd[cmd.index("-movflags") + 1]
+
+    @pytest.mark.parametrize("mode, expected", [
+        ("freeze", "tpad=stop_mode=clone:stop_duration=26.000"),
+        ("pingpong", "reverse"),
+        ("stretch", "setpts=PTS*7.500000"),
+    ])
+    def test_extending_modes_reencode_video(self, clip, voiceover, mode, expected):
+        from backend.utils.mux import build_mux_command
+
+        cmd = build_mux_command("clip.mp4", "voice.wav", "out.mp4", clip, voiceover, mode=mode)
+
+        assert "-stream_loop" not in cmd
+        assert expected in cmd[cmd.index("-filter_complex") + 1]
+        assert cmd[cmd.index("-c:v") + 1] == "libx264"
+
+    def test_short_audio_copies_without_filters(self, clip, voiceover):
+        from dataclasses import replace
+        from backend.utils.mux import build_mux_command
+
+        short = replace(voiceover, duration=2.0)
+        cmd = build_mux_command("clip.mp4", "voice.wav", "out.mp4", clip, short, mode="pingpong", fragmented=False)
+
+        assert "-filter_complex" not in cmd
+        assert "-shortest" in cmd
+        assert cmd[cmd.index("-c:v") + 1] == "copy"
+        assert cmd[cmd.index("-movflags") + 1] == "+faststart"
+
+    def test_wav_is_probed_from_its_header(self, tmp_path):
+        from unittest.mock import patch
+        from backend.utils.probe import probe_media
+
+        path = tmp_path / "voice.wav"
+        path.write_bytes(make_wav(1.5))
+        with patch("backend.utils.probe.media_runner.run_sync") as mock_run:
+            info = probe_media(path)
+
+        mock_run.assert_not_called()
+        assert info.duration == pytest.approx(1.5)
+        assert info.audio.codec_name == "pcm_s16le"
+
+
+class TestBenchmarkSuite:
+    def test_percentile_interpolates_between_samples(self):
+        from backend.benchmarks.suite import percentile
+
+        assert percentile([10, 20, 30, 40, 50], 50) == 30
+        assert percentile([10, 20], 95) == pytest.approx(19.5)
+        assert percentile([], 99) == 0.0
+
+    def test_compare_flags_only_regressions_past_threshold(self):
+        from backend.benchmarks.suite import compare
+
+        baseline = {
+            "synthesize": {"p50_ms": 100, "p95_ms": 200, "p99_ms": 300, "throughput_rps": 50, "peak_rss_mb": 500, "errors": 0},
+            "retired": {"p50_ms": 1},
+        }
+        current = {
+            "synthesize": {"p50_ms": 115, "p95_ms": 260, "p99_ms": 200, "throughput_rps": 35, "peak_rss_mb": 510, "errors": 2},
+            "new_scenario": {"p50_ms": 999},
+        }
+
+        regressions = {(r.name, r.metric): r for r in compare(current, baseline, threshold=0.2)}
+
+        assert set(regressions) == {
+            ("synthesize", "p95_ms"),
+            ("synthesize", "throughput_rps"),
+            ("synthesize", "errors"),
+        }
+        assert regressions[("synthesize", "p95_ms")].change == pytest.approx(0.3)
+
+    def test_run_load_records_latency_and_errors(self):
+        from backend.benchmarks.suite import run_load
+
+        def request(index):
+            if index == 3:
+                raise ValueError("boom")
+            time.sleep(0.01)
+
+        result = run_load("sleep", request, requests=8, concurrency=4)
+
+        assert result.errors == 1
+        assert result.first_error == "ValueError: boom"
+        assert 10 <= result.p50_ms <= result.p99_ms
+        assert result.throughput_rps > 0
+        assert result.peak_rss_mb > 0
+
+    def test_scenarios_that_need_ffmpeg_are_skipped_without_it(self):
+        from unittest.mock import patch
+        from backend.benchmarks.suite import SCENARIOS, runnable_scenarios
+
+        with patch("backend.benchmarks.suite.shutil.which", return_value=None):
+            assert runnable_scenarios(list(SCENARIOS)) == ["transcribe", "synthesize"]
+        with patch("backend.benchmarks.suite.shutil.which", return_value="/usr/bin/ffmpeg"):
+            assert runnable_scenarios(list(SCENARIOS)) == list(SCENARIOS)
+
+
+class TestParseRange:
+    def test_parses_open_closed_and_suffix_ranges(self):
+        from backend.utils.delivery import ByteRange, parse_range
+
+        assert parse_range("bytes=0-99", 1000) == ByteRange(0, 99)
+        assert parse_range("bytes=900-", 1000) == ByteRange(900, 999)
+        assert parse_range("bytes=-100", 1000) == ByteRange(900, 999)
+        assert parse_range("bytes=500-5000", 1000) == ByteRange(500, 999)
+
+    def test_ignores_malformed_and_multipart_ranges(self):
+        from backend.utils.delivery import parse_range
+
+        assert parse_range("items=0-1", 1000) is None
+        assert parse_range("bytes=0-1,5-9", 1000) is None
+        assert parse_range("bytes=9-1", 1000) is None
+
+    def test_rejects_ranges_past_the_end(self):
+        from backend.utils.delivery import RangeNotSatisfiable, parse_range
+
+        with pytest.raises(RangeNotSatisfiable):
+            parse_range("bytes=1000-", 1000)
@@ -1,3 +1,28 @@
-from .media import combine_audio_video, get_video_duration, get_audio_duration
+from .media import combine_audio_video, combine_audio_video_async, get_video_duration, get_audio_duration
+from .ffmpeg import media_runner, FFmpegError, FFmpegProgress
+from .mux import mux, mux_async, MuxMode, MUX_MODES
+from .audio import wav_stream_header
+from .probe import probe_media, probe_media_async, MediaInfo, StreamInfo
+from .upload import stream_upload_to_disk, StoredUpload, UploadLimitError
 
-__all__ = ["combine_audio_video", "get_video_duration", "get_audio_duration"]
+__all__ = [
+    "combine_audio_video",
+    "combine_audio_video_async",
+    "get_video_duration",
+    "get_audio_duration",
+    "media_runner",
+    "FFmpegError",
+    "FFmpegProgress",
+    "mux",
+    "mux_async",
+    "MuxMode",
+    "MUX_MODES",
+    "wav_stream_header",
+    "probe_media",
+    "probe_media_async",
+    "MediaInfo",
+    "StreamInfo",
+    "stream_upload_to_disk",
+    "StoredUpload",
+    "UploadLimitError",
+]
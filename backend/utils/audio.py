@@ -0,0 +1,53 @@
+from pathlib import Path
+import struct
+import wave
+import numpy as np
+
+STREAMING_DATA_SIZE = 0xFFFFFFFF
+PCM16 = np.dtype("<i2")
+
+
+def wav_stream_header(sample_rate: int, channels: int = 1, sample_width: int = 2) -> bytes:
+    byte_rate = sample_rate * channels * sample_width
+    return b"".join([
+        b"RIFF",
+        struct.pack("<I", STREAMING_DATA_SIZE),
+        b"WAVE",
+        b"fmt ",
+        struct.pack("<IHHIIHH", 16, 1, channels, sample_rate, byte_rate, channels * sample_width, sample_width * 8),
+        b"data",
+        struct.pack("<I", STREAMING_DATA_SIZE),
+    ])
+
+
+def demo_tone(num_samples: int) -> np.ndarray:
+    index = np.arange(num_samples)
+    return (32767 * 0.1 * (index % 100) / 100).astype(PCM16)
+
+
+def to_pcm16(samples: np.ndarray) -> np.ndarray:
+    samples = np.asarray(samples)
+    if samples.dtype == PCM16:
+        return samples
+    if np.issubdtype(samples.dtype, np.integer):
+        return samples.astype(PCM16)
+    return (np.clip(samples, -1.0, 1.0) * 32767).astype(PCM16)
+
+
+def write_wav(
+    path: str | Path,
+    samples: np.ndarray,
+    sample_rate: int,
+    channels: int = 1,
+) -> Path:
+    path = Path(path)
+    pcm = to_pcm16(samples)
+    if pcm.ndim == 2 and pcm.shape[0] == channels and channels > 1:
+        pcm = pcm.T
+
+    with wave.open(str(path), "wb") as wav_file:
+        wav_file.setnchannels(channels)
+        wav_file.setsampwidth(PCM16.itemsize)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(np.ascontiguousarray(pcm).tobytes())
+    return path
@@ -0,0 +1,198 @@
+from dataclasses import dataclass
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Any
+import os
+import anyio
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+from backend.core.config import settings
+
+ZEROCOPY_EXTENSION = "http.response.zerocopysend"
+PATHSEND_EXTENSION = "http.response.pathsend"
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+@dataclass
+class ByteRange:
+    start: int
+    end: int
+
+    @property
+    def length(self) -> int:
+        return self.end - self.start + 1
+
+
+def parse_range(header: str, size: int) -> ByteRange | None:
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if not first:
+            suffix = int(last)
+            if suffix <= 0:
+                raise RangeNotSatisfiable(header)
+            return ByteRange(max(0, size - suffix), size - 1)
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+
+    if start > end and last:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable(header)
+    return ByteRange(start, min(end, size - 1))
+
+
+def file_etag(stat: os.stat_result) -> str:
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    candidates = [candidate.strip().removeprefix("W/") for candidate in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def _not_modified_since(header: str, stat: os.stat_result) -> bool:
+    try:
+        return int(stat.st_mtime) <= parsedate_to_datetime(header).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+
+def _if_range_matches(header: str, etag: str, last_modified: str) -> bool:
+    header = header.strip()
+    if header.startswith('"') or header.startswith("W/"):
+        return header == etag
+    return header == last_modified
+
+
+def accel_redirect_path(path: Path) -> str | None:
+    prefix = settings.media_accel_redirect_prefix
+    if not prefix:
+        return None
+    try:
+        relative = path.resolve().relative_to(settings.temp_dir.resolve())
+    except ValueError:
+        return None
+    return f"{prefix.rstrip('/')}/{relative.as_posix()}"
+
+
+class FileRangeResponse(Response):
+    def __init__(
+        self,
+        path: Path,
+        stat: os.stat_result,
+        headers: dict[str, str],
+        status_code: int = 200,
+        byte_range: ByteRange | None = None,
+        send_body: bool = True,
+        chunk_size: int | None = None,
+    ) -> None:
+        super().__init__(status_code=status_code, headers=headers)
+        self.path = path
+        self.stat = stat
+        self.byte_range = byte_range or ByteRange(0, stat.st_size - 1)
+        self.send_body = send_body
+        self.chunk_size = chunk_size or settings.media_chunk_size
+        self.headers["content-length"] = str(max(self.byte_range.length, 0))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if not self.send_body or self.byte_range.length <= 0:
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        extensions = scope.get("extensions") or {}
+        whole_file = self.byte_range.start == 0 and self.byte_range.length == self.stat.st_size
+        if PATHSEND_EXTENSION in extensions and whole_file:
+            await send({"type": PATHSEND_EXTENSION, "path": str(self.path)})
+            return
+
+        file = await anyio.to_thread.run_sync(open, self.path, "rb")
+        try:
+            if ZEROCOPY_EXTENSION in extensions:
+                await send({
+                    "type": ZEROCOPY_EXTENSION,
+                    "file": file,
+                    "offset": self.byte_range.start,
+                    "count": self.byte_range.length,
+                })
+                return
+            await self._send_chunks(file.fileno(), send)
+        finally:
+            file.close()
+
+    async def _send_chunks(self, fd: int, send: Send) -> None:
+        offset = self.byte_range.start
+        remaining = self.byte_range.length
+        while remaining > 0:
+            chunk = await anyio.to_thread.run_sync(os.pread, fd, min(self.chunk_size, remaining), offset)
+            if not chunk:
+                break
+            offset += len(chunk)
+            remaining -= len(chunk)
+            await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+        if remaining > 0:
+            await send({"type": "http.response.body", "body": b""})
+
+
+def serve_media(request: Request, path: str | Path, media_type: str) -> Response:
+    path = Path(path)
+    stat = path.stat()
+    etag = file_etag(stat)
+    last_modified = formatdate(stat.st_mtime, usegmt=True)
+    headers: dict[str, Any] = {
+        "accept-ranges": "bytes",
+        "etag": etag,
+        "last-modified": last_modified,
+        "cache-control": f"private, max-age={settings.media_cache_max_age}",
+        "content-type": media_type,
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+    if (if_none_match and _etag_matches(if_none_match, etag)) or (
+        not if_none_match and if_modified_since and _not_modified_since(if_modified_since, stat)
+    ):
+        headers.pop("content-type")
+        return Response(status_code=304, headers=headers)
+
+    redirect = accel_redirect_path(path)
+    if redirect is not None:
+        return Response(status_code=200, headers={**headers, "x-accel-redirect": redirect})
+
+    byte_range = None
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or _if_range_matches(if_range, etag, last_modified)):
+        try:
+            byte_range = parse_range(range_header, stat.st_size)
+        except RangeNotSatisfiable:
+            return Response(
+                status_code=416,
+                headers={**headers, "content-range": f"bytes */{stat.st_size}"},
+            )
+
+    status_code = 200
+    if byte_range is not None:
+        status_code = 206
+        headers["content-range"] = f"bytes {byte_range.start}-{byte_range.end}/{stat.st_size}"
+
+    return FileRangeResponse(
+        path,
+        stat,
+        headers,
+        status_code=status_code,
+        byte_range=byte_range,
+        send_body=request.method != "HEAD",
+    )
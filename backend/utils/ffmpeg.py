@@ -0,0 +1,237 @@
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Coroutine, Sequence
+import asyncio
+import os
+import threading
+import time
+from backend.core.config import settings
+from backend.core.metrics import ffmpeg_active, ffmpeg_seconds, metrics
+
+STDERR_TAIL_BYTES = 64 * 1024
+
+
+class FFmpegError(RuntimeError):
+    def __init__(self, cmd: Sequence[str], returncode: int | None, stderr: str, message: str | None = None) -> None:
+        self.cmd = list(cmd)
+        self.returncode = returncode
+        self.stderr = stderr
+        tail = stderr.strip().splitlines()[-5:]
+        super().__init__(message or f"{Path(self.cmd[0]).name} exited with code {returncode}: {' | '.join(tail)}")
+
+
+class FFmpegTimeoutError(FFmpegError):
+    pass
+
+
+@dataclass
+class FFmpegProgress:
+    out_time_seconds: float = 0.0
+    frame: int | None = None
+    fps: float | None = None
+    speed: float | None = None
+    done: bool = False
+    raw: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class ProcessResult:
+    cmd: list[str]
+    returncode: int
+    stdout: bytes
+    stderr: str
+
+
+ProgressCallback = Callable[[FFmpegProgress], None]
+
+
+def with_progress_pipe(cmd: Sequence[str]) -> list[str]:
+    cmd = list(cmd)
+    if Path(cmd[0]).name == "ffmpeg" and "-progress" not in cmd:
+        return [cmd[0], "-progress", "pipe:1", "-nostats", *cmd[1:]]
+    return cmd
+
+
+def parse_progress(block: dict[str, str]) -> FFmpegProgress:
+    def number(key: str, cast: Callable[[str], Any]) -> Any:
+        value = block.get(key, "").strip().rstrip("x")
+        try:
+            return cast(value)
+        except ValueError:
+            return None
+
+    out_time_us = number("out_time_us", int) or number("out_time_ms", int) or 0
+    return FFmpegProgress(
+        out_time_seconds=out_time_us / 1_000_000,
+        frame=number("frame", int),
+        fps=number("fps", float),
+        speed=number("speed", float),
+        done=block.get("progress") == "end",
+        raw=dict(block),
+    )
+
+
+class MediaRunner:
+    def __init__(self, max_concurrency: int | None = None) -> None:
+        self.max_concurrency = max_concurrency or os.cpu_count() or 1
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+
+                def serve() -> None:
+                    asyncio.set_event_loop(loop)
+                    self._semaphore = asyncio.Semaphore(self.max_concurrency)
+                    ready.set()
+                    loop.run_forever()
+
+                threading.Thread(target=serve, name="media-runner", daemon=True).start()
+                ready.wait()
+                self._loop = loop
+            return self._loop
+
+    def _submit(self, coro: Coroutine[Any, Any, ProcessResult]) -> Future:
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    async def run(
+        self,
+        cmd: Sequence[str],
+        timeout: float | None = None,
+        on_progress: ProgressCallback | None = None,
+        check: bool = True,
+    ) -> ProcessResult:
+        return await asyncio.wrap_future(self._submit(self._execute(cmd, timeout, on_progress, check)))
+
+    def run_sync(
+        self,
+        cmd: Sequence[str],
+        timeout: float | None = None,
+        on_progress: ProgressCallback | None = None,
+        check: bool = True,
+    ) -> ProcessResult:
+        future = self._submit(self._execute(cmd, timeout, on_progress, check))
+        try:
+            return future.result()
+        except BaseException:
+            future.cancel()
+            raise
+
+    async def _execute(
+        self,
+        cmd: Sequence[str],
+        timeout: float | None,
+        on_progress: ProgressCallback | None,
+        check: bool,
+    ) -> ProcessResult:
+        cmd = with_progress_pipe(cmd) if on_progress else list(cmd)
+        tool = Path(cmd[0]).name
+        async with self._semaphore:
+            self.active += 1
+            started = time.perf_counter()
+            try:
+                result = await self._spawn(cmd, timeout, on_progress)
+            except BaseException:
+                self.failed += 1
+                ffmpeg_seconds.observe(time.perf_counter() - started, tool=tool, outcome="error")
+                raise
+            finally:
+                self.active -= 1
+
+        if check and result.returncode != 0:
+            self.failed += 1
+            ffmpeg_seconds.observe(time.perf_counter() - started, tool=tool, outcome="failed")
+            raise FFmpegError(cmd, result.returncode, result.stderr)
+        self.completed += 1
+        ffmpeg_seconds.observe(time.perf_counter() - started, tool=tool, outcome="ok")
+        return result
+
+    async def _spawn(
+        self,
+        cmd: list[str],
+        timeout: float | None,
+        on_progress: ProgressCallback | None,
+    ) -> ProcessResult:
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+        except FileNotFoundError as e:
+            raise FFmpegError(cmd, None, "", f"{cmd[0]} not found") from e
+
+        stdout_chunks: list[bytes] = []
+        stderr_tail: deque[bytes] = deque()
+        stderr_size = 0
+
+        async def read_stdout() -> None:
+            block: dict[str, str] = {}
+            async for line in process.stdout:
+                if on_progress is None:
+                    stdout_chunks.append(line)
+                    continue
+                key, _, value = line.decode(errors="replace").strip().partition("=")
+                block[key] = value
+                if key == "progress":
+                    on_progress(parse_progress(block))
+                    block = {}
+
+        async def read_stderr() -> None:
+            nonlocal stderr_size
+            while chunk := await process.stderr.read(8192):
+                stderr_tail.append(chunk)
+                stderr_size += len(chunk)
+                while stderr_size - len(stderr_tail[0]) >= STDERR_TAIL_BYTES:
+                    stderr_size -= len(stderr_tail.popleft())
+
+        async def communicate() -> int:
+            await asyncio.gather(read_stdout(), read_stderr())
+            return await process.wait()
+
+        try:
+            returncode = await asyncio.wait_for(communicate(), timeout)
+        except asyncio.TimeoutError:
+            await self._kill(process)
+            raise FFmpegTimeoutError(
+                cmd, None, b"".join(stderr_tail).decode(errors="replace"),
+                f"{Path(cmd[0]).name} timed out after {timeout:g}s",
+            )
+        except asyncio.CancelledError:
+            await self._kill(process)
+            raise
+
+        return ProcessResult(
+            cmd=cmd,
+            returncode=returncode,
+            stdout=b"".join(stdout_chunks),
+            stderr=b"".join(stderr_tail).decode(errors="replace"),
+        )
+
+    @staticmethod
+    async def _kill(process: asyncio.subprocess.Process) -> None:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "active": self.active,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+
+media_runner = MediaRunner(settings.ffmpeg_max_concurrency)
+metrics.on_collect(lambda: ffmpeg_active.set(media_runner.active))
@@ -0,0 +1,43 @@
+from collections import OrderedDict
+from pathlib import Path
+import hashlib
+import threading
+
+_DIGEST_CACHE_SIZE = 1024
+_digests: OrderedDict[tuple[str, int, int], str] = OrderedDict()
+_lock = threading.Lock()
+
+
+def _stat_key(path: Path) -> tuple[str, int, int]:
+    stat = path.stat()
+    return str(path.resolve()), stat.st_mtime_ns, stat.st_size
+
+
+def _remember(key: tuple[str, int, int], digest: str) -> None:
+    with _lock:
+        _digests[key] = digest
+        _digests.move_to_end(key)
+        while len(_digests) > _DIGEST_CACHE_SIZE:
+            _digests.popitem(last=False)
+
+
+def remember_file_digest(path: str | Path, digest: str) -> None:
+    _remember(_stat_key(Path(path)), digest)
+
+
+def file_sha256(path: str | Path, chunk_size: int = 1024 * 1024) -> str:
+    path = Path(path)
+    key = _stat_key(path)
+    with _lock:
+        digest = _digests.get(key)
+        if digest is not None:
+            _digests.move_to_end(key)
+            return digest
+
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            hasher.update(chunk)
+    digest = hasher.hexdigest()
+    _remember(key, digest)
+    return digest
@@ -0,0 +1,139 @@
+from pathlib import Path
+from typing import Literal
+from backend.core.config import settings
+from backend.core.metrics import mux_seconds
+from backend.core.tracing import timed_span
+from backend.utils.ffmpeg import ProgressCallback, media_runner
+from backend.utils.probe import MediaInfo, probe_media, probe_media_async
+
+MuxMode = Literal["loop", "freeze", "pingpong", "stretch", "shortest"]
+
+MUX_MODES: tuple[MuxMode, ...] = ("loop", "freeze", "pingpong", "stretch", "shortest")
+MP4_VIDEO_CODECS = {"h264", "hevc", "av1", "mpeg4"}
+MP4_AUDIO_CODECS = {"aac", "mp3", "alac", "ac3"}
+DEFAULT_FPS = 24.0
+
+
+def _video_fps(video: MediaInfo) -> float:
+    stream = video.video
+    return stream.fps if stream and stream.fps else DEFAULT_FPS
+
+
+def _video_frames(video: MediaInfo) -> int:
+    stream = video.video
+    if stream and stream.frame_count:
+        return stream.frame_count
+    return max(1, round(video.duration * _video_fps(video)))
+
+
+def can_copy_video(video: MediaInfo) -> bool:
+    return video.video is not None and video.video.codec_name in MP4_VIDEO_CODECS
+
+
+def can_copy_audio(audio: MediaInfo) -> bool:
+    return audio.audio is not None and audio.audio.codec_name in MP4_AUDIO_CODECS
+
+
+def _video_filter(mode: MuxMode, video: MediaInfo, audio: MediaInfo) -> str | None:
+    fps = _video_fps(video)
+    frames = _video_frames(video)
+    if mode == "loop":
+        return f"loop=loop=-1:size={frames},setpts=N/{fps}/TB"
+    if mode == "freeze":
+        return f"tpad=stop_mode=clone:stop_duration={audio.duration - video.duration:.3f}"
+    if mode == "pingpong":
+        return (
+            f"split[fwd][rev];[rev]reverse[bwd];[fwd][bwd]concat=n=2:v=1:a=0,"
+            f"loop=loop=-1:size={frames * 2},setpts=N/{fps}/TB"
+        )
+    if mode == "stretch":
+        return f"setpts=PTS*{audio.duration / video.duration:.6f},fps={fps}"
+    return None
+
+
+def build_mux_command(
+    video_path: str | Path,
+    audio_path: str | Path,
+    output_path: str | Path,
+    video: MediaInfo,
+    audio: MediaInfo,
+    mode: MuxMode = "loop",
+    fragmented: bool = True,
+) -> list[str]:
+    if mode not in MUX_MODES:
+        raise ValueError(f"Unknown mux mode: {mode}")
+
+    extend = mode != "shortest" and video.duration > 0 and audio.duration > video.duration
+    video_filter = _video_filter(mode, video, audio) if extend else None
+    copy_video = can_copy_video(video) and (video_filter is None or mode == "loop")
+
+    cmd = ["ffmpeg", "-y", "-loglevel", "error"]
+    if extend and mode == "loop" and copy_video:
+        cmd += ["-stream_loop", "-1"]
+        video_filter = None
+    cmd += ["-i", str(video_path), "-i", str(audio_path)]
+
+    if video_filter:
+        cmd += ["-filter_complex", f"[0:v:0]{video_filter}[v]", "-map", "[v]"]
+    else:
+        cmd += ["-map", "0:v:0"]
+    cmd += ["-map", "1:a:0"]
+
+    if copy_video:
+        cmd += ["-c:v", "copy"]
+    else:
+        cmd += ["-c:v", "libx264", "-preset", "veryfast", "-crf", "20", "-pix_fmt", "yuv420p"]
+    cmd += ["-c:a", "copy"] if can_copy_audio(audio) else ["-c:a", "aac", "-b:a", "192k"]
+
+    if extend:
+        cmd += ["-t", f"{audio.duration:.3f}"]
+    else:
+        cmd += ["-shortest"]
+
+    if fragmented:
+        cmd += ["-movflags", "+frag_keyframe+empty_moov+default_base_moof"]
+    else:
+        cmd += ["-movflags", "+faststart"]
+    return cmd + [str(output_path)]
+
+
+def mux(
+    video_path: str | Path,
+    audio_path: str | Path,
+    output_path: str | Path,
+    mode: MuxMode | None = None,
+    fragmented: bool | None = None,
+    on_progress: ProgressCallback | None = None,
+) -> Path:
+    output_path = Path(output_path)
+    mode = mode or settings.mux_default_mode
+    with timed_span("ffmpeg.mux", mux_seconds, mode=mode):
+        cmd = build_mux_command(
+            video_path, audio_path, output_path,
+            probe_media(video_path), probe_media(audio_path),
+            mode,
+            settings.mux_fragmented if fragmented is None else fragmented,
+        )
+        media_runner.run_sync(cmd, timeout=settings.ffmpeg_timeout_seconds, on_progress=on_progress)
+    return output_path
+
+
+async def mux_async(
+    video_path: str | Path,
+    audio_path: str | Path,
+    output_path: str | Path,
+    mode: MuxMode | None = None,
+    fragmented: bool | None = None,
+    on_progress: ProgressCallback | None = None,
+) -> Path:
+    output_path = Path(output_path)
+    mode = mode or settings.mux_default_mode
+    with timed_span("ffmpeg.mux", mux_seconds, mode=mode):
+        cmd = build_mux_command(
+            video_path, audio_path, output_path,
+            await probe_media_async(video_path), await probe_media_async(audio_path),
+            mode,
+            settings.mux_fragmented if fragmented is None else fragmented,
+        )
+        await media_runner.run(cmd, timeout=settings.ffmpeg_timeout_seconds, on_progress=on_progress)
+    return output_path
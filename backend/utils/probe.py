@@ -0,0 +1,214 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+import json
+import threading
+import wave
+from backend.core.config import settings
+from backend.utils.ffmpeg import media_runner
+
+
+@dataclass(frozen=True)
+class StreamInfo:
+    index: int
+    codec_type: str
+    codec_name: str | None
+    duration: float | None
+    width: int | None = None
+    height: int | None = None
+    fps: float | None = None
+    frame_count: int | None = None
+    sample_rate: int | None = None
+    channels: int | None = None
+
+
+@dataclass(frozen=True)
+class MediaInfo:
+    path: str
+    duration: float
+    format_name: str | None
+    size: int
+    streams: tuple[StreamInfo, ...]
+
+    def _first(self, codec_type: str) -> StreamInfo | None:
+        return next((s for s in self.streams if s.codec_type == codec_type), None)
+
+    @property
+    def video(self) -> StreamInfo | None:
+        return self._first("video")
+
+    @property
+    def audio(self) -> StreamInfo | None:
+        return self._first("audio")
+
+
+def _probe_command(path: str | Path) -> list[str]:
+    return [
+        "ffprobe",
+        "-v", "quiet",
+        "-print_format", "json",
+        "-show_format",
+        "-show_streams",
+        str(path),
+    ]
+
+
+def _float(value: Any) -> float | None:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _int(value: Any) -> int | None:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _rate(value: str | None) -> float | None:
+    if not value or value == "0/0":
+        return None
+    numerator, _, denominator = value.partition("/")
+    try:
+        return float(numerator) / float(denominator or 1)
+    except (ValueError, ZeroDivisionError):
+        return None
+
+
+def parse_probe_output(data: dict[str, Any], path: str | Path) -> MediaInfo:
+    fmt = data.get("format", {})
+    streams = tuple(
+        StreamInfo(
+            index=stream.get("index", i),
+            codec_type=stream.get("codec_type", "unknown"),
+            codec_name=stream.get("codec_name"),
+            duration=_float(stream.get("duration")),
+            width=_int(stream.get("width")),
+            height=_int(stream.get("height")),
+            fps=_rate(stream.get("avg_frame_rate")) or _rate(stream.get("r_frame_rate")),
+            frame_count=_int(stream.get("nb_frames")),
+            sample_rate=_int(stream.get("sample_rate")),
+            channels=_int(stream.get("channels")),
+        )
+        for i, stream in enumerate(data.get("streams", []))
+    )
+
+    duration = _float(fmt.get("duration"))
+    if duration is None:
+        duration = max((s.duration for s in streams if s.duration is not None), default=0.0)
+
+    return MediaInfo(
+        path=str(path),
+        duration=duration,
+        format_name=fmt.get("format_name"),
+        size=_int(fmt.get("size")) or 0,
+        streams=streams,
+    )
+
+
+def probe_wav(path: str | Path) -> MediaInfo | None:
+    path = Path(path)
+    if path.suffix.lower() != ".wav":
+        return None
+    try:
+        with wave.open(str(path), "rb") as wav:
+            channels = wav.getnchannels()
+            sample_width = wav.getsampwidth()
+            sample_rate = wav.getframerate()
+            frames = wav.getnframes()
+    except (wave.Error, EOFError, OSError):
+        return None
+
+    size = path.stat().st_size
+    if sample_rate <= 0 or frames * channels * sample_width > size:
+        return None
+
+    duration = frames / sample_rate
+    stream = StreamInfo(
+        index=0,
+        codec_type="audio",
+        codec_name=f"pcm_s{sample_width * 8}le" if sample_width > 1 else "pcm_u8",
+        duration=duration,
+        sample_rate=sample_rate,
+        channels=channels,
+    )
+    return MediaInfo(path=str(path), duration=duration, format_name="wav", size=size, streams=(stream,))
+
+
+class MediaProbeCache:
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple[str, int, int], MediaInfo] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(path: str | Path) -> tuple[str, int, int]:
+        path = Path(path)
+        stat = path.stat()
+        return str(path.resolve()), stat.st_mtime_ns, stat.st_size
+
+    def get(self, key: tuple[str, int, int]) -> MediaInfo | None:
+        with self._lock:
+            info = self._entries.get(key)
+            if info is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return info
+
+    def put(self, key: tuple[str, int, int], info: MediaInfo) -> None:
+        with self._lock:
+            self._entries[key] = info
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+probe_cache = MediaProbeCache(settings.media_probe_cache_size)
+
+
+def probe_media(path: str | Path) -> MediaInfo:
+    key = probe_cache.key(path)
+    info = probe_cache.get(key)
+    if info is not None:
+        return info
+
+    info = probe_wav(path)
+    if info is None:
+        result = media_runner.run_sync(_probe_command(path), timeout=settings.ffprobe_timeout_seconds)
+        info = parse_probe_output(json.loads(result.stdout), path)
+    probe_cache.put(key, info)
+    return info
+
+
+async def probe_media_async(path: str | Path) -> MediaInfo:
+    key = probe_cache.key(path)
+    info = probe_cache.get(key)
+    if info is not None:
+        return info
+
+    info = probe_wav(path)
+    if info is None:
+        result = await media_runner.run(_probe_command(path), timeout=settings.ffprobe_timeout_seconds)
+        info = parse_probe_output(json.loads(result.stdout), path)
+    probe_cache.put(key, info)
+    return info
@@ -0,0 +1,134 @@
+from dataclasses import dataclass
+from pathlib import Path
+import hashlib
+import struct
+import time
+import aiofiles
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from backend.core.metrics import upload_bytes, upload_seconds
+
+WAV_HEADER_PROBE_BYTES = 4096
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class UploadLimitError(Exception):
+    pass
+
+
+class RequestSizeLimitMiddleware:
+    def __init__(self, app: ASGIApp, max_bytes: int) -> None:
+        self.app = app
+        self.max_bytes = max_bytes
+
+    def _too_large(self) -> HTTPException:
+        return HTTPException(status_code=413, detail=f"Upload exceeds {self.max_bytes} bytes")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        length = headers.get(b"content-length", b"")
+        if length.isdigit() and int(length) > self.max_bytes:
+            response = JSONResponse(status_code=413, content={"detail": self._too_large().detail})
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    raise self._too_large()
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+@dataclass
+class StoredUpload:
+    path: Path
+    size: int
+    sha256: str
+
+
+def parse_wav_byte_rate(header: bytes) -> tuple[int, int | None] | None:
+    if len(header) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+        return None
+
+    byte_rate = None
+    offset = 12
+    while offset + 8 <= len(header):
+        chunk_id = header[offset:offset + 4]
+        chunk_size = struct.unpack("<I", header[offset + 4:offset + 8])[0]
+        body = offset + 8
+        if chunk_id == b"fmt " and body + 12 <= len(header):
+            byte_rate = struct.unpack("<I", header[body + 8:body + 12])[0]
+        elif chunk_id == b"data":
+            if not byte_rate:
+                return None
+            declared = chunk_size if chunk_size not in (0, 0xFFFFFFFF) else None
+            return byte_rate, declared
+        offset = body + chunk_size + (chunk_size & 1)
+
+    return (byte_rate, None) if byte_rate else None
+
+
+async def stream_upload_to_disk(
+    file: UploadFile,
+    destination: str | Path,
+    max_bytes: int,
+    max_duration_seconds: float | None = None,
+    chunk_size: int = 1024 * 1024,
+) -> StoredUpload:
+    destination = Path(destination)
+
+    if file.size is not None and file.size > max_bytes:
+        raise UploadLimitError(f"Upload exceeds {max_bytes} bytes")
+
+    started = time.perf_counter()
+    digest = hashlib.sha256()
+    size = 0
+    limit = max_bytes
+    header = b""
+    header_checked = max_duration_seconds is None
+
+    try:
+        async with aiofiles.open(destination, "wb") as f:
+            while chunk := await file.read(chunk_size):
+                size += len(chunk)
+
+                if not header_checked:
+                    header += chunk[:WAV_HEADER_PROBE_BYTES - len(header)]
+                    if len(header) >= WAV_HEADER_PROBE_BYTES or len(chunk) < chunk_size:
+                        header_checked = True
+                        wav_info = parse_wav_byte_rate(header)
+                        if wav_info:
+                            byte_rate, declared = wav_info
+                            max_data = int(byte_rate * max_duration_seconds)
+                            if declared is not None and declared > max_data:
+                                raise UploadLimitError(
+                                    f"Audio exceeds {max_duration_seconds:g} seconds"
+                                )
+                            limit = min(limit, max_data + WAV_HEADER_PROBE_BYTES)
+
+                if size > limit:
+                    if limit < max_bytes:
+                        raise UploadLimitError(f"Audio exceeds {max_duration_seconds:g} seconds")
+                    raise UploadLimitError(f"Upload exceeds {max_bytes} bytes")
+
+                digest.update(chunk)
+                await f.write(chunk)
+    except BaseException:
+        destination.unlink(missing_ok=True)
+        raise
+
+    upload_seconds.observe(time.perf_counter() - started)
+    upload_bytes.observe(size)
+    return StoredUpload(path=destination, size=size, sha256=digest.hexdigest())
@@ -17,11 +17,13 @@ export interface JobStatus {
   progress: number;
   result: JobResult | null;
   error: string | null;
+  stages?: Record<string, "pending" | "running" | "completed" | "failed" | "skipped"> | null;
 }
 
 export interface JobResult {
   video_path: string;
   audio_path: string | null;
+  final_video_path?: string | null;
   prompt: string;
 }
 